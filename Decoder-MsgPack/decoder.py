@@ -1,46 +1,11 @@
-import subprocess, csv, os
-import binascii
-import json
-import msgpack
+import os, sys
 
-data = []
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Viewer-Proto"))
+from dlt_codecs import main
 
-dltpath = "../output.dlt"
-
-result = subprocess.run(['dlt-viewer', '-s', '-csv', '-c', dltpath, 'parsed.csv'])
-
-if result.returncode == 0:
-    print("Converting to CSV Success")
-    with open('parsed.csv', newline='') as file:
-        reader = csv.reader(file, delimiter=' ', quotechar='|')
-
-        for row in reader:
-            # print(row)
-
-            try:
-                if row and row[-1].startswith("Z9dX7pQ3"):  
-                    decoded_payload = row[-1][8:]
-                    binary_data = binascii.unhexlify(decoded_payload)
-
-                    try: 
-                        unpacked_data = msgpack.unpackb(binary_data, raw=False)
-                        # print(unpacked_data)
-                        data.append([row[2], unpacked_data])
-                    
-                    except Exception as e:
-                        print(f"Skipping due to error: {e}")
-
-            except Exception as e:
-                print(f"Incorrect data with pattern error: {e}")
-                
-    with open("sinewaveout.json", "w") as file:
-        json.dump(data, file, indent = 4)
-
-    if os.path.exists("parsed.csv"):
-        os.remove("parsed.csv")
-        print("Successfully removed temporary csv")
-    else:
-        print("File not found.")
-
-else:
-    print("Failed to Convert to csv")
\ No newline at end of file
+if __name__ == "__main__":
+    # Defaults: decode ../output.dlt to sinewaveout.json, extra arguments override
+    main(
+        sys.argv[1:] or ["../output.dlt", "-o", "sinewaveout.json"],
+        default_codecs=["msgpack:Z9dX7pQ3"]
+    )
\ No newline at end of file
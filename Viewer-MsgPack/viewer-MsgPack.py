@@ -1,10 +1,33 @@
 import sys
 import json
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.ticker import FuncFormatter
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from PyQt6.QtWidgets import QApplication, QWidget, QVBoxLayout, QPushButton, QComboBox, QFileDialog, QLabel, QSlider
 from PyQt6.QtCore import QTimer, Qt
 
+def parseTimestamps(timestamps):
+    # "HH:MM:SS.ffffff" strings to seconds of the day, parsed once at load
+    seconds = np.empty(len(timestamps))
+    for i, timestamp in enumerate(timestamps):
+        hours, minutes, secs = str(timestamp).split(":")
+        seconds[i] = int(hours) * 3600 + int(minutes) * 60 + float(secs)
+    return seconds
+
+def formatTimestamp(seconds, _pos=None):
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{secs:06.3f}"
+
+def toColumn(values):
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        column = np.empty(len(values), dtype=object)
+        column[:] = values
+        return column
+
 class JSONPlotter(QWidget):
     def __init__(self):
         super().__init__()
@@ -13,8 +36,12 @@ class JSONPlotter(QWidget):
         self.data = []
         self.timestamps = []
         self.fields = []
+        self.columns = {}  # field: NumPy array, "Timestamp" in seconds of the day
         self.animation_running = False
         self.current_index = 0
+        self.animLine = None
+        self.background = None
+        self.canvas.mpl_connect("draw_event", self.onDraw)
 
     def initUI(self):
         self.setWindowTitle("JSON Data Viewer & Plotter")
@@ -77,6 +104,13 @@ class JSONPlotter(QWidget):
 
             self.data = [entry[1] for entry in raw_data[1:]]
 
+            # Resolve per field columns once instead of per plotted point
+            self.cancelAnimation()
+            self.columns = {"Timestamp": parseTimestamps(self.timestamps)}
+            field_values = list(zip(*self.data)) if self.data else [[] for _ in self.fields]
+            for field, values in zip(self.fields, field_values):
+                self.columns.setdefault(field, toColumn(values))
+
             self.xAxisCombo.clear()
             self.yAxisCombo.clear()
             self.xAxisCombo.addItems(["Timestamp"] + self.fields)
@@ -93,48 +127,76 @@ class JSONPlotter(QWidget):
         y_field = self.yAxisCombo.currentText()
 
         if x_field and y_field:
-            x_values = self.timestamps if x_field == "Timestamp" else [entry[self.fields.index(x_field)] for entry in self.data]
-            y_values = self.timestamps if y_field == "Timestamp" else [entry[self.fields.index(y_field)] for entry in self.data]
-
-            self.ax.clear()
-            self.ax.plot(x_values, y_values, marker="o", linestyle="-")
-            self.ax.set_xlabel(x_field)
-            self.ax.set_ylabel(y_field)
-            self.ax.set_title(f"{x_field} vs {y_field}")
-            self.ax.grid()
-
+            self.cancelAnimation()
+            self.setupAxes(x_field, y_field, f"{x_field} vs {y_field}")
+            self.ax.plot(self.columns[x_field], self.columns[y_field], marker="o", linestyle="-")
             self.canvas.draw()
 
+    def setupAxes(self, x_field, y_field, title):
+        self.ax.clear()
+        self.ax.set_xlabel(x_field)
+        self.ax.set_ylabel(y_field)
+        self.ax.set_title(title)
+        self.ax.grid()
+        for field, axis in ((x_field, self.ax.xaxis), (y_field, self.ax.yaxis)):
+            if field == "Timestamp":
+                axis.set_major_formatter(FuncFormatter(formatTimestamp))
+
     def animateGraph(self):
         if not self.data:
             self.fileLabel.setText("No data to animate")
             return
         
+        # Fixed axes from the full data, the line is drawn with blitting
+        self.cancelAnimation()
+        y_field = self.yAxisCombo.currentText()
+        x_values = self.columns["Timestamp"]
+        y_values = self.columns[y_field]
+        self.setupAxes("Timestamp", y_field, f"Animated Graph: Timestamp vs {y_field}")
+        self.animLine, = self.ax.plot(x_values, y_values, marker="o", linestyle="-", animated=True)
+        self.animX = x_values
+        self.animY = y_values
+
         self.animation_running = True
         self.current_index = 0
+        self.canvas.draw()  # onDraw stores the empty background
         self.timer.start(self.speedSlider.value())
 
+    def onDraw(self, event):
+        # Full redraw (first frame or resize): store background and repaint shown points
+        if self.animLine is None:
+            return
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        if self.current_index:
+            self.animLine.set_data(self.animX[:self.current_index], self.animY[:self.current_index])
+            self.ax.draw_artist(self.animLine)
+            self.canvas.blit(self.ax.bbox)
+            self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+
     def updateAnimation(self):
         if not self.animation_running or self.current_index >= len(self.data):
-            self.timer.stop()
+            self.cancelAnimation()
             return
         
-        y_field = self.yAxisCombo.currentText()
-        y_values = self.timestamps[:self.current_index + 1] if y_field == "Timestamp" else [entry[self.fields.index(y_field)] for entry in self.data[:self.current_index + 1]]
-
-        self.ax.clear()
-        self.ax.plot(self.timestamps[:self.current_index + 1], y_values, marker="o", linestyle="-")
-        self.ax.set_xlabel("Timestamp")
-        self.ax.set_ylabel(y_field)
-        self.ax.set_title(f"Animated Graph: Timestamp vs {y_field}")
-        self.ax.grid()
-
-        self.canvas.draw()
+        # Draw only the newest segment on top of the points already shown
+        start = max(self.current_index - 1, 0)
+        self.canvas.restore_region(self.background)
+        self.animLine.set_data(self.animX[start:self.current_index + 1], self.animY[start:self.current_index + 1])
+        self.ax.draw_artist(self.animLine)
+        self.canvas.blit(self.ax.bbox)
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
         self.current_index += 1
 
     def cancelAnimation(self):
         self.animation_running = False
         self.timer.stop()
+        if self.animLine is not None:
+            # Keep the points shown so far as a regular line
+            self.animLine.set_data(self.animX[:self.current_index], self.animY[:self.current_index])
+            self.animLine.set_animated(False)
+            self.animLine = None
+            self.canvas.draw_idle()
+        self.background = None
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
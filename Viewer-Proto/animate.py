@@ -1,63 +1,243 @@
 """Animation controller for plotting time-series data."""
-from PyQt6.QtCore import QTimer
+import time
+import numpy as np
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
 import pyqtgraph as pg
+from lod import LODPyramid, sort_by_x
+
+# Time between animation frames (ms)
+FRAME_INTERVAL_MS = 33
+# Speed value replaying in real data time (speed is in tenths of it)
+REAL_TIME_SPEED = 10
+# Drawn points per horizontal pixel of the replayed prefix
+POINTS_PER_PIXEL = 4
+
+
+class PlaybackClock(QObject):
+    """Shared data time cursor replaying all graphs in lockstep.
+    
+    The cursor is a wall clock data time (seconds since epoch), so graphs
+    of different message types and files show the same moment. Every
+    tick moves it by the elapsed wall-clock time times the speed and
+    redraws all animators together, so Qt repaints each plot once per
+    frame. Animators of hidden plots only move their pointer, they are
+    drawn by redraw() when shown.
+    """
+    moved = pyqtSignal(float)  # Cursor (data time)
+
+    def __init__(self, parent=None):
+        """
+        Initialize clock.
+        
+        Args:
+            parent: QObject owning the clock
+        """
+        super().__init__(parent)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._tick)
+        self.animators = []
+        self.cursor = 0.0  # Data time reached
+        self.speed = REAL_TIME_SPEED
+        self.playing = False
+        self._last_tick = 0.0
+
+    def add(self, animator):
+        """Register an animator, it shows the data up to the cursor."""
+        self.animators.append(animator)
+        animator.update(self.cursor, draw=True)
+
+    def remove(self, animator):
+        """Unregister an animator, e.g. when its plot is deleted."""
+        if animator in self.animators:
+            self.animators.remove(animator)
+        if not self.animators:
+            self.pause()
+
+    def time_range(self):
+        """Return (first, last) data time of all animators, None without data."""
+        ranges = [animator.time_range() for animator in self.animators]
+        ranges = [time_range for time_range in ranges if time_range]
+        if not ranges:
+            return None
+        return min(first for first, _ in ranges), max(last for _, last in ranges)
+
+    def _tick(self):
+        """Move the cursor by the time since the last tick."""
+        now = time.monotonic()
+        elapsed = now - self._last_tick
+        self._last_tick = now
+        self._move(self.cursor + elapsed * self.speed / REAL_TIME_SPEED)
+        time_range = self.time_range()
+        if time_range is None or self.cursor >= time_range[1]:
+            self.pause()
+
+    def _move(self, cursor, draw=False):
+        """Move all animators to a data time."""
+        self.cursor = cursor
+        for animator in self.animators:
+            animator.update(cursor, draw)
+        self.moved.emit(cursor)
+
+    def play(self):
+        """Start or resume replay, from the start if the cursor is outside the data."""
+        time_range = self.time_range()
+        if time_range is None:
+            return
+        if not time_range[0] <= self.cursor < time_range[1]:
+            self._move(time_range[0], draw=True)
+        self.playing = True
+        if not self.timer.isActive():
+            self._last_tick = time.monotonic()
+            self.timer.start(FRAME_INTERVAL_MS)
+
+    def pause(self):
+        """Pause replay."""
+        self.playing = False
+        self.timer.stop()
+
+    def reset(self):
+        """Pause and move to the start of the data."""
+        self.pause()
+        time_range = self.time_range()
+        self._move(time_range[0] if time_range else 0.0, draw=True)
+
+    def seek(self, cursor):
+        """Show all graphs up to a data time.
+        
+        Args:
+            cursor: Wall clock data time (seconds since epoch)
+        """
+        self._move(cursor, draw=True)
+
+    def set_speed(self, speed: int):
+        """Set playback speed.
+        
+        Args:
+            speed: Data time per wall-clock time in tenths
+                (REAL_TIME_SPEED replays in real time)
+        """
+        self.speed = speed
+
+    def redraw(self):
+        """Draw visible animators that moved while their plot was hidden."""
+        for animator in self.animators:
+            animator.update(self.cursor)
 
 
 class PlotAnimator:
-    """Handles animation of plot data with play/pause/reset controls."""
+    """Replays one plot line up to the cursor of a PlaybackClock.
     
-    def __init__(self, plot_widget: pg.PlotWidget, x_data, y_data):
+    Each frame draws the replayed prefix through a min/max pyramid, so
+    the frame cost does not grow with the number of points replayed.
+    Plots on another x axis than wall clock, e.g. ECU uptime, map the
+    cursor through the wall clock times of their points.
+    """
+
+    def __init__(self, plot_widget: pg.PlotWidget, x_data, y_data, pyramid=None,
+                 clock=None, times=None):
         """
         Initialize animator with plot widget and data.
         
         Args:
             plot_widget: Target plot widget
-            x_data: X-axis data points
+            x_data: X-axis data points, replayed in x order
             y_data: Y-axis data points
+            pyramid: LODPyramid of the data if already built
+            clock: Shared PlaybackClock (a private one if None)
+            times: Wall clock times of the points if x is another axis
         """
         self.plot = plot_widget
-        self.x_data = x_data
-        self.y_data = y_data
-        self.speed = 50  # ms between updates
-        self.timer = QTimer(self.plot)
-        self.timer.timeout.connect(self._update)
+        self.clock = clock or PlaybackClock(self.plot)
         
         # Initialize plot line
         self.line = self.plot.plot([], [], pen='b', name='animation', width=4)
         self.plot.addLegend()
-        self.reset()
+        self.pointer = 0  # Number of points replayed
+        self.set_data(x_data, y_data, pyramid, times)
+        self.clock.add(self)
 
-    def _update(self):
-        """Timer callback to update plot with next data point."""
-        if self.pointer >= len(self.x_data):
-            self.timer.stop()
-            return
-        self.line.setData(self.x_data[:self.pointer], self.y_data[:self.pointer])
-        self.pointer += 1
+    @property
+    def pyramid(self):
+        """Min/max pyramid of the data, built on first use."""
+        if self._pyramid is None:
+            self._pyramid = LODPyramid(self.x_data, self.y_data)
+        return self._pyramid
 
-    def play(self):
-        """Start or resume animation."""
-        if self.pointer >= len(self.x_data):
-            self.reset()
-        if not self.timer.isActive():
-            self.timer.start(self.speed)
+    def time_range(self):
+        """Return (first, last) wall clock time of the data, None if empty."""
+        times = self.x_data if self._times is None else self._times
+        if not len(times):
+            return None
+        return float(times[0]), float(times[-1])
 
-    def pause(self):
-        """Pause animation."""
-        self.timer.stop()
+    def _pointer_at(self, cursor):
+        """Return the number of points (in x order) replayed at a data time."""
+        if self._times is None:
+            return int(np.searchsorted(self.x_data, cursor, "right"))
+        received = int(np.searchsorted(self._times, cursor, "right"))
+        if not received:
+            return 0
+        return int(np.searchsorted(self.x_data, self._reach[received - 1], "right"))
 
-    def reset(self):
-        """Reset animation to start position."""
-        self.timer.stop()
-        self.pointer = 0
-        self.line.setData([], [])
+    def update(self, cursor, draw=False):
+        """Move to a clock cursor and redraw the replayed prefix if it changed.
+        
+        Args:
+            cursor: Wall clock data time (seconds since epoch)
+            draw: Also draw if the plot is hidden
+        """
+        self.pointer = self._pointer_at(cursor)
+        if self.pointer != self._drawn and (draw or self.plot.isVisible()):
+            self._draw()
+
+    def _draw(self):
+        """Draw the replayed prefix at the detail of the visible range."""
+        self._drawn = self.pointer
+        if not self.pointer:
+            self.line.setData([], [])
+            return
+        view_box = self.plot.getViewBox()
+        x_min, x_max = view_box.viewRange()[0]
+        width = max(int(view_box.width()), 1)
+        x_values, y_values = self.pyramid.points(
+            x_min, x_max, POINTS_PER_PIXEL * width, self.pointer
+        )
+        self.line.setData(x_values, y_values)
 
-    def set_speed(self, ms: int):
-        """Set animation speed in milliseconds.
+    def set_data(self, x_data, y_data, pyramid=None, times=None):
+        """Replace animated data, e.g. with the live history of a followed file.
         
         Args:
-            ms: Time between updates (milliseconds)
+            x_data: X-axis data points
+            y_data: Y-axis data points
+            pyramid: LODPyramid of the data if already built
+            times: Wall clock times of the points if x is another axis
         """
-        self.speed = ms
-        if self.timer.isActive():
-            self.timer.start(self.speed)
\ No newline at end of file
+        x_data = np.ascontiguousarray(x_data, dtype=np.float64)
+        if times is None:
+            self._times = self._reach = None
+        else:
+            # Largest x received up to each time, points up to it are
+            # replayed (ECU resets replay approximately)
+            times = np.ascontiguousarray(times, dtype=np.float64)
+            order = np.argsort(times, kind="stable")
+            self._times = times[order]
+            self._reach = np.maximum.accumulate(x_data[order])
+        if pyramid is not None:
+            x_data, y_data = pyramid.x, pyramid.y  # Ordered by x
+        # The pointer is found by binary search, e.g. in ECU uptimes that
+        # restart on resets
+        self.x_data, self.y_data = sort_by_x(
+            x_data, np.ascontiguousarray(y_data, dtype=np.float64)
+        )
+        self._pyramid = pyramid
+        self._drawn = None  # Pointer of the drawn line, None redraws
+        self.update(self.clock.cursor)
+
+    def release(self):
+        """Stop animating and drop the data, e.g. when the plot is deleted."""
+        self.clock.remove(self)
+        self.plot.removeItem(self.line)
+        self.line.clear()
+        self.set_data([], [])
+        self.pointer = 0
\ No newline at end of file
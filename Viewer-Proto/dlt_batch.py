@@ -0,0 +1,300 @@
+"""Headless batch conversion of DLT files for scripted processing.
+
+Decodes many DLT files with the same decode path as the GUI worker
+(decode_dlt_file) and writes one export per capture (see dlt_export). Files are
+spread across processes, a single large file is split across them
+instead. Example:
+
+    python dlt_batch.py captures/*.dlt -p logger.proto -o out/ -j 8 -f npz
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+import tempfile
+import subprocess
+import multiprocessing
+from typing import NamedTuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dlt_codecs import DEFAULT_CODECS
+from dlt_decode import decode_dlt_file
+from dlt_index import save_index
+from dlt_export import EXPORT_FORMATS, export_file
+from dlt_filter import RecordFilter
+
+
+class FileResult(NamedTuple):
+    """Outcome of converting one DLT file."""
+    dlt_path: str
+    output_path: str
+    size: int  # Bytes of the DLT file
+    records: int  # Records indexed
+    messages: int  # Decoded messages
+    seconds: float
+    warnings: list  # Decoder messages, e.g. unknown message types
+    error: str = None  # Set if the file could not be converted
+
+
+def expand_inputs(patterns):
+    """Expand files, directories and glob patterns to DLT file paths.
+
+    Args:
+        patterns: Paths or glob patterns, directories add their *.dlt files
+
+    Returns:
+        Sorted list of unique absolute paths
+    """
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*.dlt")
+        matches = glob.glob(pattern, recursive=True) or [pattern]
+        paths.update(os.path.abspath(path) for path in matches if not os.path.isdir(path))
+    return sorted(paths)
+
+
+def compile_proto(proto_path, out_dir):
+    """Make a protobuf module importable.
+
+    Args:
+        proto_path: .proto file (compiled with protoc) or compiled _pb2.py
+        out_dir: Directory receiving the compiled module
+
+    Returns:
+        Tuple (module_name, search_path)
+
+    Raises:
+        ValueError: If protoc fails
+    """
+    proto_path = os.path.abspath(proto_path)
+    name = os.path.splitext(os.path.basename(proto_path))[0]
+    if proto_path.endswith(".py"):
+        return name, os.path.dirname(proto_path)
+    try:
+        subprocess.run(
+            [
+                'protoc',
+                f'--proto_path={os.path.dirname(proto_path)}',
+                f'--python_out={out_dir}',
+                proto_path
+            ],
+            check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+        )
+    except FileNotFoundError as e:
+        raise ValueError("protoc not found, pass a compiled _pb2.py instead") from e
+    except subprocess.CalledProcessError as e:
+        raise ValueError(f"Failed to compile {proto_path}:\n{e.stderr}") from e
+    return f"{name}_pb2", out_dir
+
+
+def output_paths(dlt_paths, output_dir, extension=EXPORT_FORMATS["ndjson"]):
+    """Map DLT files to output files keeping their relative layout.
+
+    Args:
+        dlt_paths: Absolute DLT file paths
+        output_dir: Output root directory
+        extension: Output file extension
+
+    Returns:
+        Dictionary {dlt_path: output_path}
+    """
+    if not dlt_paths:
+        return {}
+    root = os.path.commonpath([os.path.dirname(path) for path in dlt_paths])
+    return {
+        path: os.path.join(
+            output_dir, os.path.splitext(os.path.relpath(path, root))[0] + extension
+        )
+        for path in dlt_paths
+    }
+
+
+def convert_file(dlt_path, output_path, module_name, search_paths=(),
+                 codecs=DEFAULT_CODECS, max_workers=1, store_index=False,
+                 export_format="ndjson", record_filter=None):
+    """Decode one DLT file and write its output.
+
+    Args:
+        dlt_path: Path to DLT file
+        output_path: Path of the output file
+        module_name: Compiled protobuf module name
+        search_paths: Import paths of the protobuf module
+        codecs: Payload codec specs, see dlt_codecs
+        max_workers: Processes used to split the file
+        store_index: Also write the .dltidx sidecar so the GUI opens
+            the file without scanning it
+        export_format: Key of dlt_export.EXPORT_FORMATS
+        record_filter: RecordFilter of the records to convert
+
+    Returns:
+        FileResult, failures are reported in its error
+    """
+    started = time.perf_counter()
+    warnings = []
+    error = None
+    records = messages = 0
+    size = 0
+    try:
+        size = os.path.getsize(dlt_path)
+        result = decode_dlt_file(
+            dlt_path, module_name, warnings.append, search_paths,
+            codecs=codecs, max_workers=max_workers, record_filter=record_filter
+        )
+        struct_dict, index = result
+        records = len(index)
+        messages = sum(
+            len(columns)
+            for ctx_dict in struct_dict.values()
+            for message_dict in ctx_dict.values()
+            for columns in message_dict.values()
+        )
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        export_file(struct_dict, output_path, export_format)
+        if store_index and not record_filter:
+            save_index(index, dlt_path)  # Only complete indexes
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return FileResult(
+        dlt_path, output_path, size, records, messages,
+        time.perf_counter() - started, warnings, error
+    )
+
+
+def _init_batch_process(search_paths):
+    """Pool initializer: make the protobuf module importable."""
+    for path in reversed(search_paths):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+def convert_files(dlt_paths, output_dir, module_name, search_paths=(),
+                  codecs=DEFAULT_CODECS, jobs=None, store_index=False, on_result=None,
+                  export_format="ndjson", record_filter=None):
+    """Decode DLT files in parallel, one output file per input.
+
+    With at least as many files as jobs every process converts whole
+    files, otherwise the files are converted one after the other and
+    each is split across the processes.
+
+    Args:
+        dlt_paths: Absolute DLT file paths
+        output_dir: Output root directory
+        module_name: Compiled protobuf module name
+        search_paths: Import paths of the protobuf module
+        codecs: Payload codec specs, see dlt_codecs
+        jobs: Number of processes (defaults to CPU count)
+        store_index: Also write .dltidx sidecars
+        on_result: Callback receiving each FileResult when done
+        export_format: Key of dlt_export.EXPORT_FORMATS
+        record_filter: RecordFilter of the records to convert
+
+    Returns:
+        List of FileResult in input order
+    """
+    jobs = jobs or os.cpu_count() or 1
+    outputs = output_paths(dlt_paths, output_dir, EXPORT_FORMATS[export_format])
+    _init_batch_process(list(search_paths))
+    results = {}
+
+    def done(result):
+        results[result.dlt_path] = result
+        if on_result:
+            on_result(result)
+
+    if jobs == 1 or len(dlt_paths) < jobs:
+        for path in dlt_paths:
+            done(convert_file(
+                path, outputs[path], module_name, search_paths, codecs, jobs,
+                store_index, export_format, record_filter
+            ))
+    else:
+        # Spawned like the decode pool of dlt_decode
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=jobs, mp_context=context,
+            initializer=_init_batch_process, initargs=(list(search_paths),)
+        ) as pool:
+            futures = [
+                pool.submit(
+                    convert_file, path, outputs[path], module_name,
+                    list(search_paths), tuple(codecs), 1, store_index, export_format,
+                    record_filter
+                )
+                for path in dlt_paths
+            ]
+            for future in as_completed(futures):
+                done(future.result())
+    return [results[path] for path in dlt_paths]
+
+
+def format_result(result):
+    """Return a one line summary of a converted file."""
+    megabytes = result.size / 1e6
+    rate = megabytes / result.seconds if result.seconds > 0 else 0.0
+    if result.error:
+        status = f"FAILED: {result.error}"
+    elif result.warnings:
+        status = f"ok, {len(result.warnings)} warnings"
+    else:
+        status = "ok"
+    return (
+        f"{os.path.basename(result.dlt_path)}: {result.records} records, "
+        f"{result.messages} messages, {megabytes:.1f} MB in {result.seconds:.2f} s "
+        f"({rate:.1f} MB/s) {status}"
+    )
+
+
+def main(argv=None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Decode DLT files without the GUI")
+    parser.add_argument("inputs", nargs="+", help="DLT files, directories or globs")
+    parser.add_argument("-p", "--proto", required=True,
+                        help="logger.proto (needs protoc) or compiled logger_pb2.py")
+    parser.add_argument("-o", "--output-dir", required=True)
+    parser.add_argument("-f", "--format", choices=list(EXPORT_FORMATS), default="ndjson",
+                        help="Export format, see dlt_export (default: ndjson)")
+    parser.add_argument("-j", "--jobs", type=int, help="Processes (default: CPU count)")
+    parser.add_argument("-c", "--codec", action="append", dest="codecs",
+                        help="Payload codec spec, see dlt_codecs (default: proto-frame)")
+    parser.add_argument("--filter", default="",
+                        help='Records to convert, e.g. "app=SWAV ctx=SWC1,SWC2 '
+                             'start=\\"2025/06/09 07:58:00\\""')
+    parser.add_argument("--store-index", action="store_true",
+                        help="Write .dltidx sidecars for fast GUI loads "
+                             "(not with --filter)")
+    args = parser.parse_args(argv)
+    try:
+        record_filter = RecordFilter.parse(args.filter) or None
+    except ValueError as e:
+        parser.exit(1, f"{e}\n")
+
+    dlt_paths = expand_inputs(args.inputs)
+    if not dlt_paths:
+        parser.exit(1, "No DLT files found\n")
+    with tempfile.TemporaryDirectory(prefix="dlt_batch_") as temp_dir:
+        try:
+            module_name, search_path = compile_proto(args.proto, temp_dir)
+        except ValueError as e:
+            parser.exit(1, f"{e}\n")
+
+        started = time.perf_counter()
+        results = convert_files(
+            dlt_paths, args.output_dir, module_name, [search_path],
+            args.codecs or DEFAULT_CODECS, args.jobs, args.store_index,
+            on_result=lambda result: print(format_result(result), flush=True),
+            export_format=args.format, record_filter=record_filter
+        )
+        elapsed = time.perf_counter() - started
+
+    failed = [result for result in results if result.error]
+    total = sum(result.size for result in results) / 1e6
+    print(
+        f"{len(results) - len(failed)}/{len(results)} files, {total:.1f} MB in "
+        f"{elapsed:.2f} s ({total / max(elapsed, 1e-9):.1f} MB/s)"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,254 @@
+"""Persistent cache of decoded message columns.
+
+Decoded column stores are kept across sessions in the user cache
+directory, one file per app/ctx/message type. Entries are addressed by a
+decode key hashing everything the decoded values depend on:
+
+- the content of the DLT file
+- the serialized descriptors of the protobuf module (a changed .proto
+  yields another key)
+- DECODER_VERSION, the payload codecs and the record filter
+
+Old keys are never read again and age out: the cache is bounded in size
+and the least recently used entries are removed first.
+"""
+import os
+import json
+import hashlib
+import importlib
+import numpy as np
+from dlt_columns import MessageColumns
+from dlt_codecs import DEFAULT_CODECS
+from dlt_decode import DECODER_VERSION
+
+DECODE_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "proto_dashboard", "decoded"
+)
+# Cache size limit in bytes
+DECODE_CACHE_SIZE = 2 << 30
+CACHE_EXTENSION = ".npz"
+# Bytes hashed per read of a DLT file
+HASH_BLOCK_SIZE = 4 * 1024 * 1024
+
+# Content hashes of files by absolute path: (size, mtime_ns, hash)
+_content_hashes = {}
+
+
+def content_hash(dlt_path):
+    """Hash the complete content of a DLT file.
+
+    The hash is remembered for the session and only recomputed when the
+    size or mtime of the file changed.
+
+    Args:
+        dlt_path: Path to DLT file
+
+    Returns:
+        Hex digest
+    """
+    path = os.path.abspath(dlt_path)
+    stat = os.stat(path)
+    known = _content_hashes.get(path)
+    if known and known[:2] == (stat.st_size, stat.st_mtime_ns):
+        return known[2]
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    _content_hashes[path] = (stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def schema_hash(module_name):
+    """Hash the descriptors of a compiled protobuf module and its imports.
+
+    Args:
+        module_name: Protobuf module name or None
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha1()
+    if module_name:
+        pending = [importlib.import_module(module_name).DESCRIPTOR]
+        seen = set()
+        while pending:
+            file_descriptor = pending.pop()
+            if file_descriptor.name in seen:
+                continue
+            seen.add(file_descriptor.name)
+            digest.update(file_descriptor.name.encode("utf-8"))
+            digest.update(file_descriptor.serialized_pb)
+            pending.extend(file_descriptor.dependencies)
+    return digest.hexdigest()
+
+
+def decode_key(dlt_path, module_name, codecs=DEFAULT_CODECS, record_filter=None):
+    """Return the cache key of decoding a DLT file.
+
+    Args:
+        dlt_path: Path to DLT file
+        module_name: Protobuf module name
+        codecs: Payload codec specifications
+        record_filter: RecordFilter of the decoded records or None
+
+    Returns:
+        Hex digest
+    """
+    parts = {
+        "content": content_hash(dlt_path),
+        "schema": schema_hash(module_name),
+        "decoder": DECODER_VERSION,
+        "codecs": list(codecs),
+        "filter": str(record_filter) if record_filter else "",
+    }
+    return hashlib.sha1(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def save_columns(columns, file):
+    """Write a column store as NumPy archive.
+
+    Object columns are stored as JSON, so nothing needs pickle to load.
+
+    Args:
+        columns: MessageColumns
+        file: Writable binary file
+
+    Raises:
+        TypeError: If an object column holds values JSON cannot encode
+    """
+    arrays, meta = columns.to_arrays()
+    arrays["meta"] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+    np.savez(file, **arrays)
+
+
+def load_columns(path):
+    """Read a column store written by save_columns."""
+    with np.load(path, allow_pickle=False) as archive:
+        meta = json.loads(archive["meta"].tobytes().decode("utf-8"))
+        return MessageColumns.from_arrays(archive, meta)
+
+
+class DecodeCache:
+    """Decoded column stores on disk with least recently used eviction."""
+
+    def __init__(self, directory=DECODE_CACHE_DIR, max_bytes=DECODE_CACHE_SIZE):
+        """
+        Initialize cache.
+
+        Args:
+            directory: Cache directory, created on first store
+            max_bytes: Size limit, least recently used entries are
+                removed when a store exceeds it
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size = None  # Bytes stored, counted on first store
+
+    def entry_path(self, key, app_id, ctx_id, message_name):
+        """Return file of one decoded message type."""
+        name = hashlib.sha1(
+            "\0".join((app_id, ctx_id, message_name)).encode("utf-8")
+        ).hexdigest()
+        return os.path.join(self.directory, key, name + CACHE_EXTENSION)
+
+    def load(self, key, app_id, ctx_id, message_name):
+        """Return cached columns of a message type.
+
+        Returns:
+            MessageColumns or None if not cached or unreadable
+        """
+        path = self.entry_path(key, app_id, ctx_id, message_name)
+        try:
+            columns = load_columns(path)
+            os.utime(path)  # Mark as recently used
+        except (OSError, ValueError, KeyError, EOFError):
+            return None
+        return columns
+
+    def load_messages(self, key, app_id, ctx_id, message_names):
+        """Return cached columns of several message types of a context.
+
+        Returns:
+            Dictionary {message_name: MessageColumns} of the cached types
+        """
+        result = {}
+        for message_name in message_names:
+            columns = self.load(key, app_id, ctx_id, message_name)
+            if columns is not None:
+                result[message_name] = columns
+        return result
+
+    def store(self, key, app_id, ctx_id, message_name, columns):
+        """Store decoded columns of a message type.
+
+        Returns:
+            True if stored, False if the columns could not be written
+        """
+        path = self.entry_path(key, app_id, ctx_id, message_name)
+        tmp_path = path + ".tmp"
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as file:
+                save_columns(columns, file)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        else:
+            self._size += os.path.getsize(path) - replaced
+        if self._size > self.max_bytes:
+            self.evict()
+        return True
+
+    def store_struct_dict(self, key, struct_dict):
+        """Store every decoded message type of a file."""
+        for app_id, ctx_dict in struct_dict.items():
+            for ctx_id, messages in ctx_dict.items():
+                for message_name, columns in messages.items():
+                    if columns is not None:
+                        self.store(key, app_id, ctx_id, message_name, columns)
+
+    def _entries(self):
+        """Yield (mtime, size, path) of all cache entries."""
+        if not os.path.isdir(self.directory):
+            return
+        for key in os.listdir(self.directory):
+            key_dir = os.path.join(self.directory, key)
+            if not os.path.isdir(key_dir):
+                continue
+            for name in os.listdir(key_dir):
+                if not name.endswith(CACHE_EXTENSION):
+                    continue
+                path = os.path.join(key_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue  # Removed meanwhile by another process
+                yield stat.st_mtime, stat.st_size, path
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits."""
+        entries = sorted(self._entries())
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in entries:
+            if size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                size -= entry_size
+            except OSError:
+                continue
+            try:
+                os.rmdir(os.path.dirname(path))  # Only succeeds once empty
+            except OSError:
+                pass
+        self._size = size
\ No newline at end of file
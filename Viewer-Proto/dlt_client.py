@@ -0,0 +1,247 @@
+"""Asyncio DLT TCP client (dlt-receive replacement) and replay server.
+
+Messages read from a daemon socket carry no storage header. The client
+adds one with the receive time and appends the records to a capture
+file, which the viewer follows like a file written by dlt-receive.
+
+Usage:
+    python dlt_client.py receive HOST [--port 3490] -o capture.dlt
+    python dlt_client.py serve output.dlt [--port 3490] [--rate 1000]
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+from dlt_reader import (
+    DLT_STORAGE_MAGIC, STORAGE_HEADER, STANDARD_HEADER, parse_message
+)
+from dlt_index import MappedDLTFile
+
+DLT_DAEMON_PORT = 3490
+
+# Messages buffered between socket and capture file, a full queue stops
+# reading from the socket so TCP flow control throttles the daemon
+QUEUE_SIZE = 1024
+WRITE_BATCH = 256
+RECONNECT_DELAY = 2.0
+
+
+class DLTProtocolError(Exception):
+    """Stream does not contain valid DLT messages."""
+
+
+async def read_message(reader):
+    """Read one DLT message (standard header onwards) from a stream.
+
+    Args:
+        reader: asyncio.StreamReader
+
+    Returns:
+        Message bytes
+
+    Raises:
+        asyncio.IncompleteReadError: If the stream ends
+        DLTProtocolError: If the length field is invalid
+    """
+    header = await reader.readexactly(STANDARD_HEADER.size)
+    length = STANDARD_HEADER.unpack(header)[2]
+    if length < STANDARD_HEADER.size:
+        raise DLTProtocolError(f"Invalid message length {length}")
+    return header + await reader.readexactly(length - STANDARD_HEADER.size)
+
+
+def storage_record(message, timestamp, default_ecu=b"RECV"):
+    """Prefix a received message with a storage header.
+
+    Args:
+        message: Message bytes from the standard header onwards
+        timestamp: Receive time (seconds since epoch)
+        default_ecu: ECU id used if the message does not carry one
+
+    Returns:
+        Record bytes as written by dlt-receive
+    """
+    parsed = parse_message(message, 0)
+    ecu = parsed[2].encode("ascii", errors="replace") if parsed and parsed[2] else default_ecu
+    seconds = int(timestamp)
+    microseconds = int((timestamp - seconds) * 1e6)
+    return STORAGE_HEADER.pack(DLT_STORAGE_MAGIC, seconds, microseconds, ecu) + message
+
+
+class DLTClient:
+    """Receives DLT messages from a daemon and appends them to a capture file."""
+
+    def __init__(self, host, capture_path, port=DLT_DAEMON_PORT,
+                 queue_size=QUEUE_SIZE, on_status=None):
+        """
+        Initialize client.
+
+        Args:
+            host: Daemon host name or address
+            capture_path: DLT file the received records are appended to
+            port: Daemon TCP port
+            queue_size: Maximum number of buffered messages
+            on_status: Callback receiving status messages
+        """
+        self.host = host
+        self.port = port
+        self.capture_path = capture_path
+        self.queue_size = queue_size
+        self.on_status = on_status or (lambda message: None)
+        self.received = 0
+        self._loop = None
+        self._stopping = None
+        self._stop_requested = False
+
+    def stop(self):
+        """Stop receiving (thread safe, also before or after run)."""
+        self._stop_requested = True
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._stopping.set)
+            except RuntimeError:
+                pass  # Loop already closed
+
+    async def run(self, reconnect=True):
+        """Receive until stopped, reconnecting when the connection drops.
+
+        Args:
+            reconnect: Retry after connection errors instead of returning
+        """
+        self._stopping = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        if self._stop_requested:
+            self._stopping.set()
+        with open(self.capture_path, "ab") as capture:
+            while not self._stopping.is_set():
+                try:
+                    reader, writer = await asyncio.open_connection(self.host, self.port)
+                except OSError as e:
+                    self.on_status(f"Connection to {self.host}:{self.port} failed: {e}")
+                else:
+                    self.on_status(f"Connected to {self.host}:{self.port}")
+                    try:
+                        await self._receive_connection(reader, capture)
+                    finally:
+                        writer.close()
+                    if not self._stopping.is_set():
+                        self.on_status(f"Disconnected from {self.host}:{self.port}")
+                if not reconnect:
+                    break
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), RECONNECT_DELAY)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _receive_connection(self, reader, capture):
+        """Pump messages of one connection into the capture file."""
+        queue = asyncio.Queue(self.queue_size)
+        receive_task = asyncio.create_task(self._receive(reader, queue))
+        store_task = asyncio.create_task(self._store(queue, capture))
+        stop_task = asyncio.create_task(self._stopping.wait())
+        try:
+            await asyncio.wait(
+                (receive_task, store_task, stop_task),
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            receive_task.cancel()
+            # Store what was received before the connection ended
+            if not store_task.done():
+                await queue.join()
+        finally:
+            for task in (receive_task, store_task, stop_task):
+                task.cancel()
+            await asyncio.gather(receive_task, store_task, stop_task, return_exceptions=True)
+        if receive_task.done() and not receive_task.cancelled():
+            error = receive_task.exception()
+            if isinstance(error, DLTProtocolError):
+                self.on_status(str(error))
+
+    async def _receive(self, reader, queue):
+        """Read messages from the socket into the bounded queue."""
+        while True:
+            message = await read_message(reader)
+            await queue.put((time.time(), message))  # Waits while queue is full
+
+    async def _store(self, queue, capture):
+        """Append queued messages to the capture file in batches."""
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < WRITE_BATCH and not queue.empty():
+                batch.append(queue.get_nowait())
+            capture.write(b"".join(
+                storage_record(message, timestamp) for timestamp, message in batch
+            ))
+            capture.flush()
+            self.received += len(batch)
+            for _ in batch:
+                queue.task_done()
+
+
+async def replay_server(dlt_path, host="127.0.0.1", port=DLT_DAEMON_PORT,
+                        rate=None, ready=None):
+    """Serve the messages of a DLT file to every connecting client.
+
+    Stand-in for a DLT daemon, e.g. to test DLTClient over loopback.
+
+    Args:
+        dlt_path: DLT storage file to replay
+        host: Listen address
+        port: Listen port (0 picks a free port)
+        rate: Messages per second (None sends as fast as possible)
+        ready: Callback receiving the bound port once listening
+    """
+    async def serve(reader, writer):
+        try:
+            with MappedDLTFile(dlt_path) as dlt_file:
+                index = dlt_file.index
+                for i in range(len(index)):
+                    start = index.record_offsets[i] + STORAGE_HEADER.size
+                    end = index.payload_offsets[i] + index.payload_lengths[i]
+                    writer.write(dlt_file.buffer[start:end])
+                    if rate:
+                        await asyncio.sleep(1 / rate)
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(serve, host, port)
+    if ready:
+        ready(server.sockets[0].getsockname()[1])
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    receive = commands.add_parser("receive", help="Store messages of a DLT daemon")
+    receive.add_argument("host")
+    receive.add_argument("--port", type=int, default=DLT_DAEMON_PORT)
+    receive.add_argument("-o", "--output", required=True, help="Capture DLT file")
+    serve = commands.add_parser("serve", help="Replay a DLT file like a daemon")
+    serve.add_argument("dlt_file")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=DLT_DAEMON_PORT)
+    serve.add_argument("--rate", type=float, help="Messages per second")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "receive":
+            client = DLTClient(
+                args.host, os.path.abspath(args.output), args.port,
+                on_status=lambda message: print(message, file=sys.stderr)
+            )
+            asyncio.run(client.run())
+        else:
+            asyncio.run(replay_server(args.dlt_file, args.host, args.port, args.rate))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,468 @@
+"""Registry of payload codecs dispatching DLT records in a single pass.
+
+A codec recognizes its payloads by a byte prefix, names the message
+type carried by a payload and decodes it. New payload formats are added
+by subclassing PayloadCodec and decorating the class with
+register_codec, the index, scan and decode pipeline stays the same.
+
+Codecs are selected with spec strings "<codec>[:<option>...]", e.g.
+"proto-frame", "proto:Z9dX7pQ3:SineWavePoint" or "msgpack:Z9dX7pQ3".
+Run as a script to export the decoded payloads of a capture to JSON.
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import binascii
+import importlib
+from google.protobuf import symbol_database
+from google.protobuf.json_format import MessageToDict
+from dlt_columns import ColumnBuilder
+from dlt_index import MappedDLTFile
+from dlt_reader import format_timestamp
+from dlt_schema import MessageSchema, SchemaColumnBuilder
+
+# Codec classes by spec name
+CODECS = {}
+
+# Codecs of the viewer (framing written by the logger)
+DEFAULT_CODECS = ("proto-frame",)
+
+
+def register_codec(codec_class):
+    """Class decorator adding a PayloadCodec subclass to the registry."""
+    CODECS[codec_class.name] = codec_class
+    return codec_class
+
+
+class PayloadCodec:
+    """Base class of payload formats.
+
+    Attributes:
+        name: Registry name used in codec specs
+        prefix: Leading payload bytes identifying the format
+        message_name: Message type of all payloads, None if the payload
+            names its type
+        stateful: Decoding depends on earlier records (see state)
+    """
+    name = None
+    prefix = b""
+    message_name = None
+    stateful = False
+
+    def __init__(self, decoder, *options):
+        """
+        Initialize codec.
+
+        Args:
+            decoder: PayloadDecoder the codec belongs to
+            options: Spec options following the codec name
+        """
+        self.decoder = decoder
+
+    def match(self, payload):
+        """Return (message_name, data) of a payload or None if not ours.
+
+        Args:
+            payload: String payload (memoryview starting with prefix)
+        """
+        raise NotImplementedError
+
+    def decode(self, data, message_name):
+        """Decode payload data, returns None if it cannot be decoded."""
+        raise NotImplementedError
+
+    def schema(self, message_name):
+        """Return MessageSchema of a message type or None if unknown."""
+        return None
+
+    def column_builder(self, message_name):
+        """Return an empty column builder for decoded messages."""
+        return ColumnBuilder()
+
+    def to_python(self, message):
+        """Convert a decoded message to plain Python data (e.g. for JSON)."""
+        return message
+
+    def state(self):
+        """Return what earlier records left for decoding later ones."""
+        return None
+
+    def set_state(self, state):
+        """Continue after records that left state (None starts afresh)."""
+
+
+@register_codec
+class ProtoFrameCodec(PayloadCodec):
+    """Protobuf payloads framed as $%.&<message type>&*.%<hex data>."""
+    name = "proto-frame"
+    prefix = b"$%.&"
+    FRAME_RE = re.compile(rb"\$%\.&(.*?)&\*\.%", re.DOTALL)
+
+    def __init__(self, decoder, *options):
+        super().__init__(decoder, *options)
+        if decoder.module is None:
+            raise ValueError(f"Codec \"{self.name}\" needs a protobuf module")
+        self.message_classes = {}  # type name: message class or None
+        self.schemas = {}  # type name: MessageSchema or None
+
+    def match(self, payload):
+        match = self.FRAME_RE.match(payload)
+        if not match:
+            return None
+        message_name = match.group(1).decode("utf-8", errors="replace")
+        return message_name, payload[match.end():]
+
+    def message_class(self, type_name: str):
+        """Look up protobuf message class by type name.
+
+        Args:
+            type_name: Protobuf message type name
+
+        Returns:
+            Message class or None if the type is unknown
+        """
+        if type_name in self.message_classes:
+            return self.message_classes[type_name]
+
+        full_name = type_name if '.' in type_name else "logger." + type_name
+        try:
+            message_class = symbol_database.Default().GetSymbol(full_name)
+        except KeyError:
+            message_class = getattr(self.decoder.module, type_name, None)
+            if message_class is None:
+                self.decoder.report_missing_type(full_name)
+        self.message_classes[type_name] = message_class
+        return message_class
+
+    def decode(self, data, message_name):
+        message_class = self.message_class(message_name)
+        if message_class is None:
+            return None
+        message = message_class()
+        message.ParseFromString(binascii.unhexlify(data))
+        return message
+
+    def schema(self, message_name):
+        if message_name not in self.schemas:
+            message_class = self.message_class(message_name)
+            self.schemas[message_name] = (
+                MessageSchema(message_class.DESCRIPTOR) if message_class else None
+            )
+        return self.schemas[message_name]
+
+    def column_builder(self, message_name):
+        schema = self.schema(message_name)
+        return SchemaColumnBuilder(schema) if schema else ColumnBuilder()
+
+    def to_python(self, message):
+        return MessageToDict(message)
+
+
+@register_codec
+class ProtoPrefixCodec(ProtoFrameCodec):
+    """Hex encoded protobuf messages of one type behind a fixed prefix.
+
+    Spec: proto:<prefix>:<message type>
+    """
+    name = "proto"
+
+    def __init__(self, decoder, prefix, message_name):
+        super().__init__(decoder)
+        self.prefix = prefix.encode("ascii")
+        self.message_name = message_name
+
+    def match(self, payload):
+        return self.message_name, payload[len(self.prefix):]
+
+
+@register_codec
+class MsgPackCodec(PayloadCodec):
+    """Hex encoded MessagePack values behind a fixed prefix.
+
+    A list of strings is taken as field names of the following list
+    values. Spec: msgpack:<prefix>[:<message name>]
+    """
+    name = "msgpack"
+    stateful = True
+
+    def __init__(self, decoder, prefix, message_name="MsgPack"):
+        super().__init__(decoder)
+        try:
+            import msgpack
+        except ImportError as e:
+            raise ValueError("Codec \"msgpack\" needs the msgpack package") from e
+        self._unpackb = msgpack.unpackb
+        self.prefix = prefix.encode("ascii")
+        self.message_name = message_name
+        self.fields = None  # Field names from the header record
+
+    def match(self, payload):
+        return self.message_name, payload[len(self.prefix):]
+
+    def decode(self, data, message_name):
+        return self._unpackb(binascii.unhexlify(data), raw=False)
+
+    def column_builder(self, message_name):
+        return MsgPackColumnBuilder(self)
+
+    def state(self):
+        return self.fields
+
+    def set_state(self, state):
+        self.fields = state
+
+
+class MsgPackColumnBuilder(ColumnBuilder):
+    """Column builder naming MessagePack list values after their header."""
+
+    def __init__(self, codec):
+        super().__init__()
+        self.codec = codec
+
+    def append(self, timestamp, message, uptime=float("nan")):
+        if isinstance(message, list) and message and all(
+            isinstance(value, str) for value in message
+        ):
+            self.codec.fields = message  # Header record
+            return
+        if isinstance(message, list):
+            fields = self.codec.fields
+            if fields is None or len(fields) != len(message):
+                fields = [str(j) for j in range(len(message))]
+            message = dict(zip(fields, message))
+        elif not isinstance(message, dict):
+            message = {"value": message}
+        super().append(timestamp, message, uptime)
+
+
+def stateful_codecs(codecs):
+    """Check if decoding with codec specs depends on earlier records."""
+    return any(
+        getattr(CODECS.get(spec.split(":")[0]), "stateful", False) for spec in codecs
+    )
+
+
+class PayloadDecoder:
+    """Dispatches string payloads to the registered codec matching them."""
+
+    def __init__(self, module_name=None, on_missing_type=None, codecs=DEFAULT_CODECS):
+        """
+        Import protobuf module and create codecs.
+
+        Args:
+            module_name: Compiled protobuf module name (e.g. logger_pb2),
+                needed by protobuf codecs
+            on_missing_type: Callback receiving an error message the first
+                time an unknown message type is seen
+            codecs: Codec spec strings, tried in order
+
+        Raises:
+            ValueError: If a codec spec is invalid
+        """
+        self.module = importlib.import_module(module_name) if module_name else None
+        self.module_name = module_name
+        self.on_missing_type = on_missing_type
+        self.reported_missing_types = set()
+        self.codecs = [self._create_codec(spec) for spec in codecs]
+        self.codec_specs = tuple(codecs)
+        self._codec_of = {}  # message name: codec
+
+    def _create_codec(self, spec):
+        """Create a codec from a spec string."""
+        name, *options = spec.split(":")
+        codec_class = CODECS.get(name)
+        if codec_class is None:
+            raise ValueError(f"Unknown payload codec \"{name}\" (known: {', '.join(CODECS)})")
+        try:
+            return codec_class(self, *options)
+        except TypeError as e:
+            raise ValueError(f"Invalid codec spec \"{spec}\": {e}") from e
+
+    def codec_state(self):
+        """Return the codec state left by the records decoded so far.
+
+        Returns:
+            List of per codec states or None if no codec keeps state
+        """
+        state = [codec.state() for codec in self.codecs]
+        return state if any(value is not None for value in state) else None
+
+    def set_codec_state(self, state):
+        """Continue after records that left a codec_state (None resets)."""
+        for codec, value in zip(self.codecs, state or [None] * len(self.codecs)):
+            codec.set_state(value)
+
+    def report_missing_type(self, full_name):
+        """Report an unknown protobuf message type once."""
+        if full_name in self.reported_missing_types:
+            return
+        self.reported_missing_types.add(full_name)
+        display_name = full_name.replace("logger.", "")
+        if self.on_missing_type:
+            self.on_missing_type(
+                f"Message type \"{display_name}\" not found.\n"
+                "Please check if correct \".proto\" file is uploaded"
+            )
+
+    def codec(self, message_name):
+        """Return codec producing a message type.
+
+        Types not seen in this pass (e.g. names of a stored index) go to
+        the codec of that fixed type, else to the first naming codec.
+        """
+        codec = self._codec_of.get(message_name)
+        if codec is None:
+            fixed = [c for c in self.codecs if c.message_name == message_name]
+            naming = [c for c in self.codecs if c.message_name is None]
+            codec = (fixed or naming or [None])[0]
+            if codec is None:
+                raise ValueError(f"No payload codec produces \"{message_name}\"")
+            self._codec_of[message_name] = codec
+        return codec
+
+    def message_name(self, dlt_file, i):
+        """Return message type name of record i.
+
+        Args:
+            dlt_file: MappedDLTFile
+            i: Record number
+
+        Returns:
+            Tuple (message_name, data_view) or None for other payloads
+        """
+        payload = dlt_file.string_payload(i)
+        if payload is None:
+            return None
+        for codec in self.codecs:
+            if payload[:len(codec.prefix)] != codec.prefix:
+                continue
+            framed = codec.match(payload)
+            if framed:
+                self._codec_of.setdefault(framed[0], codec)
+                return framed
+        return None
+
+    def decode(self, data, message_name):
+        """Decode payload data of a message type.
+
+        Args:
+            data: Payload data (bytes or memoryview into the mapped file)
+            message_name: Message type name from message_name()
+
+        Returns:
+            Decoded message or None if the type is unknown
+        """
+        return self.codec(message_name).decode(data, message_name)
+
+    def schema(self, message_name):
+        """Return MessageSchema of a message type or None."""
+        return self.codec(message_name).schema(message_name)
+
+    def column_builder(self, message_name):
+        """Return an empty column builder for a message type."""
+        return self.codec(message_name).column_builder(message_name)
+
+    def to_python(self, message, message_name):
+        """Convert a decoded message to plain Python data."""
+        return self.codec(message_name).to_python(message)
+
+
+def decode_records(dlt_file, decoder):
+    """Decode all matching records of a mapped file in one pass.
+
+    Args:
+        dlt_file: MappedDLTFile
+        decoder: PayloadDecoder
+
+    Yields:
+        Tuples (record number, message name, decoded message)
+    """
+    for i in range(len(dlt_file)):
+        try:
+            framed = decoder.message_name(dlt_file, i)
+            if not framed:
+                continue
+            message = decoder.decode(framed[1], framed[0])
+        except Exception as e:
+            print(f"Skipping record {i}: {e}")
+            continue
+        if message is not None:
+            yield i, framed[0], message
+
+
+def export_json(dlt_path, output_path, decoder, timestamp_format="%H:%M:%S.%f"):
+    """Write decoded payloads of a DLT file as a JSON list.
+
+    Rows are [timestamp, data], or [timestamp, message_name, data] when
+    the decoder has several codecs so mixed captures stay apart. Rows are
+    written as they are decoded, the output matches json.dump(rows,
+    indent=4) without holding the list.
+
+    Args:
+        dlt_path: Path to DLT file
+        output_path: Path of the JSON file
+        decoder: PayloadDecoder
+        timestamp_format: strftime format of the row timestamps
+
+    Returns:
+        Dictionary {message_name: number of rows}
+    """
+    counts = {}
+    with MappedDLTFile(dlt_path) as dlt_file, \
+            open(output_path, "w", encoding="utf-8") as file:
+        timestamps = dlt_file.index.timestamps
+        separator = "[\n"
+        for i, message_name, message in decode_records(dlt_file, decoder):
+            timestamp = format_timestamp(timestamps[i], timestamp_format)
+            data = decoder.to_python(message, message_name)
+            if len(decoder.codecs) > 1:
+                row = [timestamp, message_name, data]
+            else:
+                row = [timestamp, data]
+            file.write(separator)
+            file.write("    " + json.dumps(row, indent=4).replace("\n", "\n    "))
+            separator = ",\n"
+            counts[message_name] = counts.get(message_name, 0) + 1
+        file.write("[]" if not counts else "\n]")
+    return counts
+
+
+def main(argv=None, default_codecs=DEFAULT_CODECS, default_module=None):
+    """Command line entry point.
+
+    Args:
+        argv: Arguments (defaults to sys.argv)
+        default_codecs: Codec specs used without --codec
+        default_module: Protobuf module used without --module
+    """
+    parser = argparse.ArgumentParser(description="Decode DLT payloads to JSON")
+    parser.add_argument("dlt_file")
+    parser.add_argument("-o", "--output", required=True, help="JSON file")
+    parser.add_argument(
+        "-c", "--codec", action="append", dest="codecs",
+        help=f"Payload codec spec, repeat to decode mixed captures "
+             f"(known: {', '.join(CODECS)})"
+    )
+    parser.add_argument("-m", "--module", default=default_module,
+                        help="Compiled protobuf module (e.g. logger_pb2)")
+    args = parser.parse_args(argv)
+
+    if args.module:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(args.module)))
+        args.module = os.path.splitext(os.path.basename(args.module))[0]
+    try:
+        decoder = PayloadDecoder(
+            args.module, lambda message: print(message, file=sys.stderr),
+            args.codecs or default_codecs
+        )
+        counts = export_json(args.dlt_file, args.output, decoder)
+    except (OSError, ValueError, ImportError) as e:
+        parser.exit(1, f"{e}\n")
+    for message_name, count in counts.items():
+        print(f"{message_name}: {count}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,663 @@
+"""Columnar storage of decoded messages."""
+import numpy as np
+from dlt_reader import format_timestamp
+
+# X axes of plotted series
+AXIS_WALL_CLOCK = "timestamp"  # Storage header time (seconds since epoch)
+AXIS_UPTIME = "uptime"  # ECU timestamp (seconds since ECU start)
+
+
+def typed_array(values):
+    """Convert decoded leaf values to the narrowest fitting NumPy array.
+
+    Doubles become float64, integers int64 (including the string encoded
+    64 bit integers produced by MessageToDict), bools bool and everything
+    else an object array.
+
+    Args:
+        values: List of leaf values
+
+    Returns:
+        NumPy array
+    """
+    if not values:
+        return np.array([], dtype=np.float64)
+    kinds = {type(value) for value in values}
+    try:
+        if kinds == {bool}:
+            return np.array(values, dtype=np.bool_)
+        if kinds <= {int}:
+            return np.array(values, dtype=np.int64)
+        if kinds <= {int, float}:
+            return np.array(values, dtype=np.float64)
+        if kinds == {str}:
+            return np.array([int(value) for value in values], dtype=np.int64)
+    except (ValueError, OverflowError):
+        pass
+    if kinds <= {int, float, str}:
+        try:
+            return np.array([float(value) for value in values], dtype=np.float64)
+        except ValueError:
+            pass
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def numeric_values(values):
+    """Return float64 values and mask of entries that are numeric.
+
+    Args:
+        values: NumPy array of any dtype
+
+    Returns:
+        Tuple (float64 array, boolean mask)
+    """
+    if values.dtype.kind in "biuf":
+        return values.astype(np.float64, copy=False), np.ones(len(values), dtype=np.bool_)
+    result = np.full(len(values), np.nan)
+    mask = np.zeros(len(values), dtype=np.bool_)
+    for i, value in enumerate(values):
+        try:
+            result[i] = float(value)
+            mask[i] = True
+        except (ValueError, TypeError):
+            continue
+    return result, mask
+
+
+def append_array(buffer, used, new):
+    """Append items after the first used items of a buffer.
+
+    The buffer is reallocated with geometric growth when it is full, so
+    repeated appends cost amortized O(len(new)). Spilled buffers (with a
+    grow method) are enlarged on disk instead of copied into memory.
+
+    Args:
+        buffer: NumPy array with spare capacity after used items
+        used: Number of valid items in buffer
+        new: Items to append
+
+    Returns:
+        Buffer holding used + len(new) valid items (possibly reallocated)
+    """
+    needed = used + len(new)
+    dtype = np.result_type(buffer.dtype, new.dtype)
+    if needed > len(buffer) or dtype != buffer.dtype:
+        capacity = max(needed, 2 * len(buffer), 16)
+        if dtype == buffer.dtype and hasattr(buffer, "grow"):
+            buffer = buffer.grow(capacity)
+        else:
+            grown = np.empty(capacity, dtype=dtype)
+            grown[:used] = buffer[:used]
+            buffer = grown
+    buffer[used:needed] = new
+    return buffer
+
+
+class Column:
+    """Values of one leaf field path.
+
+    offsets is None when every message holds exactly one value (never for
+    repeated fields and leaves of repeated messages), otherwise
+    values[offsets[i]:offsets[i + 1]] belong to message i.
+    """
+    __slots__ = ("values", "offsets", "repeated", "labels", "_buffers")
+
+    def __init__(self, values, offsets=None, repeated=False, labels=None):
+        self.values = values
+        self.offsets = offsets
+        self.repeated = repeated  # Leaf is a repeated scalar field
+        self.labels = labels  # Enum value names by number
+        self._buffers = (None, None)  # Spare capacity behind values/offsets
+
+    def counts(self, size):
+        """Return number of values per message."""
+        if self.offsets is None:
+            return np.ones(size, dtype=np.int64)
+        return np.diff(self.offsets)
+
+    def row(self, i):
+        """Return value (or slice of values) of message i."""
+        if self.offsets is None:
+            return self.values[i]
+        return self.values[self.offsets[i]:self.offsets[i + 1]]
+
+    def extend(self, other, size, other_size):
+        """Append values of following messages in place.
+
+        Args:
+            other: Column of the new messages or None if they lack the field
+            size: Number of messages already held
+            other_size: Number of new messages
+        """
+        if other is None:
+            counts = np.zeros(other_size, dtype=np.int64)
+        else:
+            counts = other.counts(other_size)
+            self.repeated = self.repeated or other.repeated
+            self.labels = self.labels or other.labels
+        ragged = other is not None and other.offsets is not None
+        if self.offsets is None and (self.repeated or ragged or not np.all(counts == 1)):
+            self.offsets = np.arange(size + 1, dtype=np.int64)
+
+        values_buffer, offsets_buffer = self._buffers
+        if other is not None and len(other.values):
+            values_buffer = append_array(
+                values_buffer if values_buffer is not None else self.values,
+                len(self.values), other.values
+            )
+            self.values = values_buffer[:len(self.values) + len(other.values)]
+        if self.offsets is not None:
+            offsets_buffer = append_array(
+                offsets_buffer if offsets_buffer is not None else self.offsets,
+                len(self.offsets), self.offsets[-1] + np.cumsum(counts)
+            )
+            self.offsets = offsets_buffer[:size + other_size + 1]
+        self._buffers = (values_buffer, offsets_buffer)
+
+    def python_values(self, values):
+        """Convert an array slice to Python values for export.
+
+        Enum numbers are replaced by their names and float32 values are
+        rounded to their shortest representation, like MessageToDict.
+        """
+        if values.dtype == np.float32:
+            result = [float(str(value)) for value in values]
+        else:
+            result = values.tolist()
+        if self.labels:
+            result = [self.labels.get(value, value) for value in result]
+        return result
+
+
+class MessageColumns:
+    """Decoded messages of one type stored as one array per leaf path."""
+
+    def __init__(self, timestamps=None, columns=None, groups=(), presence=None,
+                 uptimes=None):
+        """
+        Initialize column store.
+
+        Args:
+            timestamps: float64 array of storage timestamps
+            columns: Dictionary {path tuple: Column} in discovery order
+            groups: Paths of repeated message fields
+            presence: Dictionary {path tuple: bool Column} telling whether
+                optional nested messages are set
+            uptimes: float64 array of ECU timestamps in seconds, NaN for
+                messages sent without one (defaults to all NaN)
+        """
+        self.timestamps = (
+            timestamps if timestamps is not None else np.array([], dtype=np.float64)
+        )
+        self.uptimes = (
+            uptimes if uptimes is not None else np.full(len(self.timestamps), np.nan)
+        )
+        self.columns = columns or {}
+        self.groups = set(groups)
+        self.presence = presence or {}
+        self._timestamps_buffer = None
+        self._uptimes_buffer = None
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def key_paths(self):
+        """Return all field paths (including intermediate nodes) in order."""
+        paths = []
+        seen = set()
+        for path in self.columns:
+            for depth in range(1, len(path) + 1):
+                prefix = path[:depth]
+                if prefix not in seen:
+                    seen.add(prefix)
+                    paths.append(prefix)
+        return paths
+
+    def fields(self, prefix):
+        """Return leaf field names directly below a path.
+
+        Args:
+            prefix: Path tuple of the parent node
+
+        Returns:
+            List of field names
+        """
+        depth = len(prefix)
+        return [
+            path[-1] for path in self.columns
+            if len(path) == depth + 1 and path[:depth] == prefix
+        ]
+
+    def has_uptimes(self):
+        """Check whether any message carries an ECU timestamp."""
+        return bool(np.isfinite(self.uptimes).any())
+
+    def series(self, path, axis=AXIS_WALL_CLOCK, times=False):
+        """Return numeric plot data of a leaf field.
+
+        Args:
+            path: Path tuple of the leaf
+            axis: AXIS_WALL_CLOCK or AXIS_UPTIME
+            times: Also return the wall clock times of the points
+
+        Returns:
+            Tuple (x times, y values) as float64 arrays, plus the wall
+            clock times if requested, non numeric values and points
+            without a time on the axis are dropped
+        """
+        column = self.columns[path]
+        x_values = self.uptimes if axis == AXIS_UPTIME else self.timestamps
+        timestamps = self.timestamps
+        if column.offsets is not None:
+            counts = column.counts(len(self))
+            x_values = np.repeat(x_values, counts)
+            timestamps = np.repeat(timestamps, counts) if times else timestamps
+        y_values, mask = numeric_values(column.values)
+        if axis == AXIS_UPTIME:
+            mask &= np.isfinite(x_values)
+        if times:
+            return x_values[mask], y_values[mask], timestamps[mask]
+        return x_values[mask], y_values[mask]
+
+    def _is_present(self, path, i):
+        """Check that all messages above a path are set in row i."""
+        for depth in range(1, len(path)):
+            column = self.presence.get(path[:depth])
+            if column is None:
+                continue
+            value = column.row(i)
+            if column.offsets is not None:
+                value = len(value) and value[0]
+            if not value:
+                return False
+        return True
+
+    def _group_of(self, path):
+        """Return outermost repeated message path containing a leaf."""
+        for depth in range(1, len(path)):
+            if path[:depth] in self.groups:
+                return path[:depth]
+        return None
+
+    def rows(self, timestamp=True):
+        """Rebuild message dictionaries, e.g. for JSON export.
+
+        Repeated messages nested inside repeated messages are returned
+        with their leaves flattened into the outer elements.
+
+        Args:
+            timestamp: Add a formatted "timestamp" key (a field of the
+                same name replaces it)
+
+        Yields:
+            Dictionary per message
+        """
+        for i in range(len(self)):
+            row = {"timestamp": format_timestamp(self.timestamps[i])} if timestamp else {}
+            grouped = {}
+            for path, column in self.columns.items():
+                group = self._group_of(path)
+                if self.presence and not self._is_present(group or path, i):
+                    continue
+                if column.offsets is None:
+                    value = column.python_values(column.values[i:i + 1])[0]
+                else:
+                    value = column.python_values(column.row(i))
+
+                if group is not None and column.offsets is None:
+                    grouped.setdefault(group, {})[path[len(group):]] = [value]
+                elif group is not None:
+                    grouped.setdefault(group, {})[path[len(group):]] = value
+                elif column.offsets is None or column.repeated:
+                    _set_nested(row, path, value)
+                elif value:
+                    _set_nested(row, path, value[0])  # Absent otherwise
+
+            for group, leaves in grouped.items():
+                lengths = {len(values) for values in leaves.values()}
+                if len(lengths) == 1:
+                    elements = []
+                    for j in range(lengths.pop()):
+                        element = {}
+                        for sub_path, values in leaves.items():
+                            _set_nested(element, sub_path, values[j])
+                        elements.append(element)
+                else:
+                    elements = {}
+                    for sub_path, values in leaves.items():
+                        _set_nested(elements, sub_path, values)
+                _set_nested(row, group, elements)
+            yield row
+
+    def snapshot(self):
+        """Return the messages held now as a separate column store.
+
+        The arrays are shared, later extend calls only write behind the
+        snapshot views or reallocate, so a background export can read the
+        snapshot while a followed file keeps growing.
+        """
+        def copy(columns):
+            return {
+                path: Column(column.values, column.offsets, column.repeated, column.labels)
+                for path, column in columns.items()
+            }
+        return MessageColumns(
+            self.timestamps, copy(self.columns), set(self.groups),
+            copy(self.presence), self.uptimes
+        )
+
+    def _owned_arrays(self):
+        """Yield the distinct arrays owning the memory of the column store."""
+        arrays = [self.timestamps, self.uptimes, self._timestamps_buffer, self._uptimes_buffer]
+        for column in list(self.columns.values()) + list(self.presence.values()):
+            arrays.extend((column.values, column.offsets) + column._buffers)
+        seen = set()
+        for array in arrays:
+            if array is None:
+                continue
+            # Views share the buffer of their base array
+            owner = array.base if isinstance(array.base, np.ndarray) else array
+            if id(owner) not in seen:
+                seen.add(id(owner))
+                yield owner
+
+    def resident_nbytes(self, objects=True):
+        """Return bytes held in memory, memory mapped arrays excluded.
+
+        Spare capacity of growing (followed) columns is included, object
+        columns count their pointers only.
+
+        Args:
+            objects: Include object columns, which cannot be spilled
+        """
+        return sum(
+            array.nbytes for array in self._owned_arrays()
+            if not isinstance(array, np.memmap) and (objects or array.dtype != object)
+        )
+
+    def mapped_nbytes(self):
+        """Return bytes of memory mapped (spilled) arrays, spare capacity included."""
+        return sum(
+            array.nbytes for array in self._owned_arrays() if isinstance(array, np.memmap)
+        )
+
+    def to_arrays(self):
+        """Split the column store into flat arrays and a description.
+
+        Used to store or transfer decoded data without pickle: numeric
+        values go to arrays, object columns (mixed or text values) are
+        kept as lists in the description.
+
+        Returns:
+            Tuple (arrays, meta), arrays {name: NumPy array}, meta a JSON
+            compatible dictionary
+        """
+        arrays = {"timestamps": self.timestamps, "uptimes": self.uptimes}
+        fields = []
+        for kind, column_dict in (("columns", self.columns), ("presence", self.presence)):
+            for path, column in column_dict.items():
+                name = str(len(fields))
+                field = {
+                    "kind": kind,
+                    "path": list(path),
+                    "repeated": column.repeated,
+                    "labels": sorted(column.labels.items()) if column.labels else None,
+                }
+                if column.values.dtype == object:
+                    field["objects"] = column.values.tolist()
+                else:
+                    arrays[name] = column.values
+                if column.offsets is not None:
+                    arrays[name + ".offsets"] = column.offsets
+                fields.append(field)
+        meta = {"groups": [list(group) for group in self.groups], "fields": fields}
+        return arrays, meta
+
+    @staticmethod
+    def from_arrays(arrays, meta):
+        """Rebuild a column store from the output of to_arrays.
+
+        Args:
+            arrays: Mapping {name: NumPy array}
+            meta: Description returned by to_arrays
+
+        Returns:
+            MessageColumns
+        """
+        column_dicts = {"columns": {}, "presence": {}}
+        for number, field in enumerate(meta["fields"]):
+            name = str(number)
+            if "objects" in field:
+                objects = field["objects"]
+                values = np.fromiter(objects, dtype=object, count=len(objects))
+            else:
+                values = arrays[name]
+            offsets = arrays[name + ".offsets"] if name + ".offsets" in arrays else None
+            labels = dict(field["labels"]) if field["labels"] else None
+            column_dicts[field["kind"]][tuple(field["path"])] = Column(
+                values, offsets, field["repeated"], labels
+            )
+        return MessageColumns(
+            arrays["timestamps"], column_dicts["columns"],
+            [tuple(group) for group in meta["groups"]],
+            column_dicts["presence"], arrays["uptimes"]
+        )
+
+    def extend(self, other):
+        """Append the messages of a following column store in place.
+
+        Args:
+            other: MessageColumns of later messages of the same type
+        """
+        size = len(self)
+        other_size = len(other)
+        if not other_size:
+            return
+        self._timestamps_buffer = append_array(
+            self._timestamps_buffer if self._timestamps_buffer is not None
+            else self.timestamps,
+            size, other.timestamps
+        )
+        self.timestamps = self._timestamps_buffer[:size + other_size]
+        self._uptimes_buffer = append_array(
+            self._uptimes_buffer if self._uptimes_buffer is not None
+            else self.uptimes,
+            size, other.uptimes
+        )
+        self.uptimes = self._uptimes_buffer[:size + other_size]
+        self.groups |= other.groups
+
+        for own, new in ((self.columns, other.columns), (self.presence, other.presence)):
+            for path, column in new.items():
+                if path not in own:
+                    own[path] = Column(
+                        column.values[:0], np.zeros(size + 1, dtype=np.int64),
+                        column.repeated, column.labels
+                    )
+            for path, column in own.items():
+                column.extend(new.get(path), size, other_size)
+
+    @staticmethod
+    def concat(parts):
+        """Concatenate column stores of consecutive file ranges.
+
+        Args:
+            parts: List of MessageColumns in file order
+
+        Returns:
+            Combined MessageColumns
+        """
+        parts = [part for part in parts if part is not None]
+        if len(parts) == 1:
+            return parts[0]
+
+        groups = set()
+        for part in parts:
+            groups |= part.groups
+        sizes = [len(part) for part in parts]
+        timestamps = np.concatenate([part.timestamps for part in parts])
+        return MessageColumns(
+            timestamps,
+            _concat_columns([part.columns for part in parts], sizes),
+            groups,
+            _concat_columns([part.presence for part in parts], sizes),
+            np.concatenate([part.uptimes for part in parts])
+        )
+
+
+def _concat_columns(part_columns, sizes):
+    """Concatenate {path: Column} dictionaries of consecutive parts.
+
+    Args:
+        part_columns: List of column dictionaries in file order
+        sizes: Number of messages of each part
+
+    Returns:
+        Combined column dictionary
+    """
+    paths = []
+    for columns in part_columns:
+        for path in columns:
+            if path not in paths:
+                paths.append(path)
+
+    merged_columns = {}
+    for path in paths:
+        values = []
+        counts = []
+        repeated = False
+        ragged = False
+        labels = None
+        empty = None
+        for columns, size in zip(part_columns, sizes):
+            column = columns.get(path)
+            if column is None:
+                counts.append(np.zeros(size, dtype=np.int64))
+                continue
+            repeated = repeated or column.repeated
+            ragged = ragged or column.offsets is not None
+            labels = labels or column.labels
+            empty = column.values[:0]
+            if len(column.values):
+                values.append(column.values)
+            counts.append(column.counts(size))
+        counts = np.concatenate(counts)
+        merged = np.concatenate(values) if values else empty
+        offsets = None
+        if repeated or ragged or not np.all(counts == 1):
+            offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        merged_columns[path] = Column(merged, offsets, repeated, labels)
+    return merged_columns
+
+
+def in_group(path, groups):
+    """Return whether a leaf path lies below a repeated message path."""
+    return any(path[:depth] in groups for depth in range(1, len(path)))
+
+
+def _set_nested(target, path, value):
+    """Set value in nested dictionaries following a path."""
+    for key in path[:-1]:
+        target = target.setdefault(key, {})
+    target[path[-1]] = value
+
+
+class ColumnBuilder:
+    """Accumulates decoded messages and produces MessageColumns."""
+
+    def __init__(self):
+        self.timestamps = []
+        self.uptimes = []
+        self.values = {}  # path: flattened leaf values
+        self.counts = {}  # path: number of values per message
+        self.repeated = set()
+        self.groups = set()
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def append(self, timestamp, message, uptime=np.nan):
+        """Add one decoded message.
+
+        Args:
+            timestamp: Storage timestamp (seconds since epoch)
+            message: Message dictionary as produced by MessageToDict
+            uptime: ECU timestamp in seconds (NaN if not sent)
+        """
+        size = len(self.timestamps)
+        self.timestamps.append(timestamp)
+        self.uptimes.append(uptime)
+        leaves = {}
+        self._flatten(message, (), leaves)
+
+        for path, values in leaves.items():
+            if path not in self.values:
+                self.values[path] = []
+                self.counts[path] = [0] * size
+            self.values[path].extend(values)
+            self.counts[path].append(len(values))
+        for path, counts in self.counts.items():
+            if len(counts) == size:
+                counts.append(0)  # Field absent in this message
+
+    def _flatten(self, node, path, leaves):
+        """Collect leaf values of a message dictionary by path."""
+        for key, val in node.items():
+            if key.startswith('@'):
+                continue
+            new_path = path + (key,)
+            if isinstance(val, dict):
+                self._flatten(val, new_path, leaves)
+            elif isinstance(val, list):
+                if val and all(isinstance(elem, dict) for elem in val):
+                    self.groups.add(new_path)
+                    for elem in val:
+                        self._flatten(elem, new_path, leaves)
+                else:
+                    self.repeated.add(new_path)
+                    leaves.setdefault(new_path, []).extend(val)
+            else:
+                leaves.setdefault(new_path, []).append(val)
+
+    def build(self):
+        """Convert accumulated values to typed arrays.
+
+        Returns:
+            MessageColumns
+        """
+        columns = {}
+        for path, values in self.values.items():
+            if path in self.groups and not values:
+                continue  # Empty list later seen as repeated message
+            counts = np.array(self.counts[path], dtype=np.int64)
+            repeated = path in self.repeated and path not in self.groups
+            offsets = None
+            # Leaves of repeated messages keep offsets even with one element each
+            if repeated or in_group(path, self.groups) or not np.all(counts == 1):
+                offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+            columns[path] = Column(typed_array(values), offsets, repeated)
+        return MessageColumns(
+            np.array(self.timestamps, dtype=np.float64), columns, self.groups,
+            uptimes=np.array(self.uptimes, dtype=np.float64)
+        )
+
+
+def column_keys(messages):
+    """Return " > " joined key labels of decoded messages of one context.
+
+    Args:
+        messages: Dictionary {message_name: MessageColumns}
+
+    Returns:
+        List of labels in discovery order
+    """
+    labels = []
+    for message_name, columns in messages.items():
+        labels.append(message_name)
+        if columns is None:
+            continue
+        for path in columns.key_paths():
+            labels.append(" > ".join((message_name,) + path))
+    return labels
\ No newline at end of file
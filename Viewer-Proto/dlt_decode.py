@@ -0,0 +1,474 @@
+"""Payload decoding shared by the GUI worker and deferred loads."""
+import os
+import sys
+import mmap
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dlt_index import DLTIndex, MappedDLTFile, split_records
+from dlt_columns import MessageColumns, column_keys
+from dlt_codecs import DEFAULT_CODECS, PayloadDecoder, stateful_codecs
+
+# Version of the decoded columns, bump when the same payload decodes differently
+DECODER_VERSION = 2
+
+# Files smaller than this are decoded in the calling thread
+PARALLEL_MIN_SIZE = 32 * 1024 * 1024
+CHUNKS_PER_PROCESS = 4
+
+# Bytes indexed between progress reports / cancellation checks
+SCAN_WINDOW = 4 * 1024 * 1024
+# Records decoded between cancellation checks
+STOP_CHECK_INTERVAL = 4096
+
+# Per-process decoder state of pool workers
+_process_decoder = None
+_process_filter = None
+_process_errors = []
+
+
+def decode_file(dlt_file, decoder, should_stop=None, record_filter=None):
+    """Decode every payload of a mapped DLT file matching a codec.
+
+    Fills the message type codes, message lists and key labels of the
+    file index so it can be stored for later loads.
+
+    Args:
+        dlt_file: MappedDLTFile
+        decoder: PayloadDecoder
+        should_stop: Callable returning True to cancel decoding
+        record_filter: RecordFilter, rejected records are not decoded
+
+    Returns:
+        Nested dictionary {app_id: {ctx_id: {message_name: MessageColumns}}}
+        or None if cancelled
+    """
+    builders = {}
+    index = dlt_file.index
+    records = range(len(index))
+    if record_filter:
+        records = np.flatnonzero(record_filter.record_mask(index)).tolist()
+    for count, i in enumerate(records):
+        if should_stop and count % STOP_CHECK_INTERVAL == 0 and should_stop():
+            return None
+        try:
+            app_id = index.app_id(i)
+            ctx_id = index.ctx_id(i)
+
+            # Initialize data structure
+            if app_id not in builders:
+                builders[app_id] = {}
+            if ctx_id not in builders[app_id]:
+                builders[app_id][ctx_id] = {}
+
+            # Dispatch payload to its codec
+            framed = decoder.message_name(dlt_file, i)
+            if not framed:
+                continue
+            message_name, hex_data = framed
+            if record_filter and not record_filter.accepts_message(message_name):
+                continue
+            index.set_message_name(i, message_name)
+
+            # Initialize column builder
+            if message_name not in builders[app_id][ctx_id]:
+                builders[app_id][ctx_id][message_name] = decoder.column_builder(message_name)
+
+            message = decoder.decode(hex_data, message_name)
+            if message is None:
+                continue
+
+            # Store parsed data
+            builders[app_id][ctx_id][message_name].append(
+                index.timestamps[i], message, index.uptime(i)
+            )
+        except Exception as e:
+            print(f"[DLTWorker] Skipping record: {e}")
+            continue
+
+    struct_dict = build_columns(builders)
+    update_index_metadata(index, struct_dict)
+    return struct_dict
+
+
+def build_columns(builders):
+    """Convert nested column builders to column stores.
+
+    Args:
+        builders: Nested dictionary of ColumnBuilder
+
+    Returns:
+        Same nesting with MessageColumns values
+    """
+    return {
+        app_id: {
+            ctx_id: {name: builder.build() for name, builder in messages.items()}
+            for ctx_id, messages in ctx_dict.items()
+        }
+        for app_id, ctx_dict in builders.items()
+    }
+
+
+def update_index_metadata(index, struct_dict):
+    """Store message type names and key labels per app/ctx in the index.
+
+    Args:
+        index: DLTIndex of the decoded file
+        struct_dict: Decoded data of the file
+    """
+    index.messages = {
+        app_id: {ctx_id: list(messages) for ctx_id, messages in ctx_dict.items()}
+        for app_id, ctx_dict in struct_dict.items()
+    }
+    index.keys = {
+        app_id: {ctx_id: column_keys(messages) for ctx_id, messages in ctx_dict.items()}
+        for app_id, ctx_dict in struct_dict.items()
+    }
+
+
+def _init_decode_process(module_name, search_paths, codecs, record_filter):
+    """Pool initializer: import the protobuf module once per process."""
+    global _process_decoder, _process_filter
+    for path in reversed(search_paths):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    _process_decoder = PayloadDecoder(module_name, _process_errors.append, codecs)
+    _process_filter = record_filter
+
+
+def _decode_chunk(dlt_path, start, end, codec_state=None):
+    """Decode one record aligned range of a DLT file in a pool worker.
+
+    Args:
+        dlt_path: Path to DLT file
+        start: Offset of the first record
+        end: Offset after the last record
+        codec_state: Codec state left by the records before start, e.g.
+            MessagePack field names of a header record
+
+    Returns:
+        Tuple (struct_dict, index, error_messages, codec_state at end)
+    """
+    _process_decoder.set_codec_state(codec_state)
+    with MappedDLTFile(dlt_path, start=start, end=end) as dlt_file:
+        struct_dict = decode_file(dlt_file, _process_decoder, record_filter=_process_filter)
+        index = dlt_file.index
+    errors = list(_process_errors)
+    _process_errors.clear()
+    return struct_dict, index, errors, _process_decoder.codec_state()
+
+
+def decode_file_parallel(dlt_path, module_name, on_missing_type=None,
+                         max_workers=None, search_paths=(), should_stop=None,
+                         codecs=DEFAULT_CODECS, record_filter=None):
+    """Decode a DLT file across a process pool.
+
+    The file is split into record aligned ranges which are indexed and
+    decoded by separate processes. Results are merged in file order so
+    they match the serial decoder exactly. With stateful codecs (e.g.
+    MessagePack header records) the first range is decoded first and
+    the others start from the state it leaves; a range is decoded again
+    if an earlier one changed that state.
+
+    Args:
+        dlt_path: Path to DLT file
+        module_name: Compiled protobuf module name
+        on_missing_type: Callback for unknown message type errors
+        max_workers: Number of processes (defaults to CPU count)
+        search_paths: Extra import paths for the protobuf module
+        should_stop: Callable returning True to cancel decoding, ranges
+            already being decoded are finished first
+        codecs: Payload codec specs, see dlt_codecs
+        record_filter: RecordFilter, rejected records are not decoded
+
+    Returns:
+        Tuple (struct_dict, index) or None if cancelled
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    with open(dlt_path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            ranges = split_records(buf, max_workers * CHUNKS_PER_PROCESS)
+
+    parts = {}
+    index = DLTIndex()
+    reported = set()
+    # Spawned processes do not inherit Qt thread state
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=min(max_workers, len(ranges)),
+        mp_context=context,
+        initializer=_init_decode_process,
+        initargs=(module_name, list(search_paths), tuple(codecs), record_filter)
+    ) as pool:
+        def submit(chunk, codec_state):
+            return codec_state, pool.submit(_decode_chunk, dlt_path, *chunk, codec_state)
+
+        # Header records usually come first, so later ranges rarely repeat
+        futures = [submit(ranges[0], None)]
+        first_state = futures[0][1].result()[3] if stateful_codecs(codecs) else None
+        futures += [submit(chunk, first_state) for chunk in ranges[1:]]
+        codec_state = None  # Left by the ranges merged so far
+        for chunk, (assumed_state, future) in zip(ranges, futures):
+            if should_stop and should_stop():
+                for _, pending in futures:
+                    pending.cancel()
+                return None
+            result = future.result()
+            if assumed_state != codec_state:
+                result = submit(chunk, codec_state)[1].result()
+            chunk_dict, chunk_index, errors, codec_state = result
+            index.extend(chunk_index)
+            for app_id, ctx_dict in chunk_dict.items():
+                app_dict = parts.setdefault(app_id, {})
+                for ctx_id, messages in ctx_dict.items():
+                    ctx_messages = app_dict.setdefault(ctx_id, {})
+                    for message_name, columns in messages.items():
+                        ctx_messages.setdefault(message_name, []).append(columns)
+            for message in errors:
+                if message not in reported and on_missing_type:
+                    reported.add(message)
+                    on_missing_type(message)
+
+    struct_dict = {
+        app_id: {
+            ctx_id: {name: MessageColumns.concat(chunks) for name, chunks in messages.items()}
+            for ctx_id, messages in ctx_dict.items()
+        }
+        for app_id, ctx_dict in parts.items()
+    }
+    update_index_metadata(index, struct_dict)
+    return struct_dict, index
+
+
+def decode_dlt_file(dlt_path, module_name, on_missing_type=None, search_paths=(),
+                    should_stop=None, codecs=DEFAULT_CODECS, max_workers=None,
+                    record_filter=None):
+    """Decode a DLT file, in parallel when it is large enough.
+
+    Args:
+        dlt_path: Path to DLT file
+        module_name: Compiled protobuf module name
+        on_missing_type: Callback for unknown message type errors
+        search_paths: Extra import paths for the protobuf module
+        should_stop: Callable returning True to cancel decoding
+        codecs: Payload codec specs, see dlt_codecs
+        max_workers: Processes for large files (defaults to CPU count,
+            1 always decodes in the calling thread)
+        record_filter: RecordFilter, rejected records are not decoded
+
+    Returns:
+        Tuple (struct_dict, index) or None if cancelled
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    if os.path.getsize(dlt_path) >= PARALLEL_MIN_SIZE and max_workers > 1:
+        return decode_file_parallel(
+            dlt_path, module_name, on_missing_type, max_workers,
+            search_paths=search_paths, should_stop=should_stop, codecs=codecs,
+            record_filter=record_filter
+        )
+
+    decoder = PayloadDecoder(module_name, on_missing_type, codecs)
+    with MappedDLTFile(dlt_path) as dlt_file:
+        struct_dict = decode_file(dlt_file, decoder, should_stop, record_filter)
+        if struct_dict is None:
+            return None
+        return struct_dict, dlt_file.index
+
+
+def deferred_struct_dict(index, record_filter=None):
+    """Build data structure of an indexed file without decoding payloads.
+
+    Args:
+        index: DLTIndex with message metadata
+        record_filter: RecordFilter limiting the contexts and message types
+            (to those with records in its time window, like a filtered scan)
+
+    Returns:
+        Nested dictionary with None in place of undecoded message lists
+    """
+    messages = (
+        record_filter.select(index.messages, index) if record_filter else index.messages
+    )
+    return {
+        app_id: {
+            ctx_id: {message_name: None for message_name in names}
+            for ctx_id, names in ctx_dict.items()
+        }
+        for app_id, ctx_dict in messages.items()
+    }
+
+
+def scan_records(dlt_file, decoder, messages, first=0, record_filter=None):
+    """Record message types of indexed records without decoding payloads.
+
+    Sets the message type code of every decodable record from first on.
+    Records rejected by the filter keep no message type, so they are
+    never decoded later.
+
+    Args:
+        dlt_file: MappedDLTFile
+        decoder: PayloadDecoder
+        messages: Dictionary {app_id: {ctx_id: {message_name: None}}} of
+            known message types, updated in place
+        first: Number of the first record to scan
+        record_filter: RecordFilter, rejected records are skipped after
+            their header
+
+    Returns:
+        Dictionary {app_id: {ctx_id: {message_name: key labels}}} of the
+        contexts and message types seen for the first time
+    """
+    index = dlt_file.index
+    new = {}
+    records = range(first, len(index))
+    if record_filter:
+        records = (first + np.flatnonzero(record_filter.record_mask(index, first))).tolist()
+    for i in records:
+        app_id = index.app_id(i)
+        ctx_id = index.ctx_id(i)
+        app_messages = messages.setdefault(app_id, {})
+        if ctx_id not in app_messages:
+            app_messages[ctx_id] = {}
+            new.setdefault(app_id, {})[ctx_id] = {}
+
+        framed = decoder.message_name(dlt_file, i)
+        if not framed:
+            continue
+        message_name = framed[0]
+        if record_filter and not record_filter.accepts_message(message_name):
+            continue
+        index.set_message_name(i, message_name)
+        if message_name not in app_messages[ctx_id]:
+            app_messages[ctx_id][message_name] = None
+            new.setdefault(app_id, {}).setdefault(ctx_id, {})[message_name] = (
+                schema_keys(decoder, [message_name])
+            )
+    return new
+
+
+def schema_keys(decoder, message_names):
+    """Return " > " joined key labels of message types from their schemas.
+
+    Args:
+        decoder: PayloadDecoder
+        message_names: Message type names of one context
+
+    Returns:
+        List of labels, same as column_keys of the decoded messages
+    """
+    labels = []
+    for message_name in message_names:
+        labels.append(message_name)
+        schema = decoder.schema(message_name)
+        if schema is None:
+            continue
+        for path in schema.key_paths():
+            labels.append(" > ".join((message_name,) + path))
+    return labels
+
+
+def scan_dlt_file(dlt_path, module_name, on_missing_type=None,
+                  on_progress=None, should_stop=None, codecs=DEFAULT_CODECS,
+                  record_filter=None):
+    """Index a DLT file and record its message types for lazy decoding.
+
+    The file is processed in windows of SCAN_WINDOW bytes so progress
+    can be reported and the scan cancelled in between.
+
+    Args:
+        dlt_path: Path to DLT file
+        module_name: Compiled protobuf module name
+        on_missing_type: Callback for unknown message type errors
+        on_progress: Callback receiving (records, bytes_done, total_bytes,
+            new_messages) after every window, see scan_records
+        should_stop: Callable returning True to cancel the scan
+        codecs: Payload codec specs, see dlt_codecs
+        record_filter: RecordFilter, rejected records are only indexed
+
+    Returns:
+        DLTIndex with message metadata or None if cancelled
+    """
+    decoder = PayloadDecoder(module_name, on_missing_type, codecs)
+    messages = {}
+    with MappedDLTFile(dlt_path, DLTIndex()) as dlt_file:
+        index = dlt_file.index
+        total = len(dlt_file.buffer)
+        end = 0
+        while True:
+            if should_stop and should_stop():
+                return None
+            end = min(total, end + SCAN_WINDOW)
+            first = dlt_file.index_more(end)
+            new = scan_records(dlt_file, decoder, messages, first, record_filter)
+            if on_progress:
+                on_progress(len(index), end, total, new)
+            if end >= total:
+                break
+
+        index.messages = {
+            app_id: {ctx_id: list(names) for ctx_id, names in ctx_dict.items()}
+            for app_id, ctx_dict in messages.items()
+        }
+        index.keys = {
+            app_id: {
+                ctx_id: schema_keys(decoder, names) for ctx_id, names in ctx_dict.items()
+            }
+            for app_id, ctx_dict in messages.items()
+        }
+        return index
+
+
+def decode_messages(dlt_file, decoder, app_id, ctx_id, message_names=None,
+                    record_filter=None, first=0):
+    """Decode payloads of a single app/ctx pair.
+
+    Only records of the requested message types are visited, they are
+    selected from the index arrays without touching other payloads.
+
+    Args:
+        dlt_file: MappedDLTFile with a scanned index
+        decoder: PayloadDecoder
+        app_id: Application id
+        ctx_id: Context id
+        message_names: Message types to decode (defaults to all of the
+            context)
+        record_filter: RecordFilter, e.g. to skip records outside its
+            time window
+        first: First record to visit, e.g. of records indexed after an
+            earlier decode
+
+    Returns:
+        Dictionary {message_name: MessageColumns}
+    """
+    index = dlt_file.index
+    if message_names is None:
+        message_names = index.messages.get(app_id, {}).get(ctx_id, [])
+    builders = {name: decoder.column_builder(name) for name in message_names}
+    app_code = index.code_of(app_id)
+    ctx_code = index.code_of(ctx_id)
+    message_codes = [
+        code for code in map(index.message_code_of, message_names) if code is not None
+    ]
+    if app_code is None or ctx_code is None or not message_codes:
+        return {name: builder.build() for name, builder in builders.items()}
+
+    selected = first + np.flatnonzero(
+        (np.frombuffer(index.app_codes, dtype=np.uint16)[first:] == app_code)
+        & (np.frombuffer(index.ctx_codes, dtype=np.uint16)[first:] == ctx_code)
+        & np.isin(np.frombuffer(index.message_codes, dtype=np.int16)[first:], message_codes)
+        & (record_filter.record_mask(index, first) if record_filter else True)
+    )
+    for i in selected.tolist():
+        try:
+            framed = decoder.message_name(dlt_file, i)
+            if not framed:
+                continue
+            message_name, hex_data = framed
+            message = decoder.decode(hex_data, message_name)
+            if message is None:
+                continue
+            builders[message_name].append(index.timestamps[i], message, index.uptime(i))
+        except Exception as e:
+            print(f"[DLTWorker] Skipping record: {e}")
+            continue
+    return {name: builder.build() for name, builder in builders.items()}
\ No newline at end of file
@@ -0,0 +1,305 @@
+"""Export of decoded DLT data shared by the GUI and the batch converter.
+
+Decoded data is exported as one table per app/ctx/message type with
+numeric timestamps and one typed column per leaf field:
+
+- ndjson: one JSON object per message, written line by line, with the
+  message fields under "data"
+- npz: NumPy arrays in one uncompressed archive, keys
+  "<app>/<ctx>/<message>/<column>"
+- parquet / arrow: a directory with "<app>/<ctx>/<message>" files
+  (needs pyarrow)
+
+Repeated leaves are stored as values plus message offsets (list columns
+in Arrow). load_tables reads the columnar exports back.
+"""
+import os
+import re
+import json
+import zipfile
+import numpy as np
+from dlt_reader import format_timestamp
+
+# Export format: file extension
+EXPORT_FORMATS = {
+    "ndjson": ".ndjson",
+    "npz": ".npz",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+# Messages written between progress reports / cancellation checks
+EXPORT_PROGRESS_ROWS = 4096
+# Table metadata entry of NPZ exports
+NPZ_META = ".meta"
+
+
+def export_format_of(file_path):
+    """Return export format of a file name by its extension.
+
+    Raises:
+        ValueError: If the extension is not an export format
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    for name, format_extension in EXPORT_FORMATS.items():
+        if extension == format_extension:
+            return name
+    raise ValueError(
+        f"Unknown export format \"{extension}\" "
+        f"(known: {', '.join(EXPORT_FORMATS.values())})"
+    )
+
+
+def export_tables(struct_dict):
+    """Return decoded message types of a file as export tables.
+
+    Args:
+        struct_dict: Decoded data {app_id: {ctx_id: {message_name: MessageColumns}}}
+
+    Returns:
+        List of ((app_id, ctx_id, message_name), MessageColumns), message
+        types not decoded yet are skipped
+    """
+    return [
+        ((app_id, ctx_id, message_name), columns)
+        for app_id, ctx_dict in struct_dict.items()
+        for ctx_id, messages in ctx_dict.items()
+        for message_name, columns in messages.items()
+        if columns is not None
+    ]
+
+
+def table_columns(columns):
+    """Flatten a column store to named typed arrays.
+
+    Args:
+        columns: MessageColumns of one message type
+
+    Returns:
+        Tuple (entries, metadata), entries are (name, values, offsets)
+        with offsets None for one value per message, metadata holds enum
+        labels and repeated message groups
+    """
+    entries = [
+        ("timestamp", columns.timestamps, None),
+        ("uptime", columns.uptimes, None),
+    ]
+    labels = {}
+    for suffix, column_dict in (("", columns.columns), (".present", columns.presence)):
+        for path, column in column_dict.items():
+            name = ".".join(path) + suffix
+            if name in ("timestamp", "uptime"):
+                name = "field." + name
+            values = column.values
+            if values.dtype == object:
+                values = values.astype(str)
+            entries.append((name, values, column.offsets))
+            if column.labels:
+                labels[name] = {str(number): label for number, label in column.labels.items()}
+    metadata = {
+        "labels": labels,
+        "groups": sorted(".".join(group) for group in columns.groups),
+    }
+    return entries, metadata
+
+
+def _file_name(text):
+    """Return text usable as a file or archive entry name."""
+    return re.sub(r"[^\w.-]", "_", text) or "_"
+
+
+def _table_path(key):
+    """Return relative path parts of an export table."""
+    return [_file_name(part) for part in key]
+
+
+class _Progress:
+    """Counts exported messages and checks for cancellation."""
+
+    def __init__(self, tables, on_progress, should_stop):
+        self.total = sum(len(columns) for _, columns in tables)
+        self.done = 0
+        self.on_progress = on_progress
+        self.should_stop = should_stop
+
+    def add(self, count):
+        """Count exported messages, returns False if cancelled."""
+        self.done += count
+        if self.on_progress:
+            self.on_progress(self.done, self.total)
+        return not (self.should_stop and self.should_stop())
+
+
+def write_ndjson(tables, file_path, progress):
+    """Write one JSON object per message, never holding the document.
+
+    Each line holds app_id, ctx_id, message and the formatted storage
+    timestamp, the fields of the message are nested under "data" so they
+    cannot replace these keys.
+    """
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for (app_id, ctx_id, message_name), columns in tables:
+            count = 0
+            for timestamp, row in zip(columns.timestamps, columns.rows(timestamp=False)):
+                line = {
+                    "app_id": app_id, "ctx_id": ctx_id, "message": message_name,
+                    "timestamp": format_timestamp(timestamp), "data": row,
+                }
+                f.write(json.dumps(line, ensure_ascii=False))
+                f.write("\n")
+                count += 1
+                if count == EXPORT_PROGRESS_ROWS:
+                    if not progress.add(count):
+                        return False
+                    count = 0
+            if not progress.add(count):
+                return False
+    return True
+
+
+def _write_npy(archive, name, array):
+    """Write one array as .npy entry of an open zip archive."""
+    with archive.open(name + ".npy", "w", force_zip64=True) as f:
+        np.lib.format.write_array(f, np.ascontiguousarray(array), allow_pickle=False)
+
+
+def write_npz(tables, file_path, progress):
+    """Write all tables into one NumPy archive, one entry per column."""
+    with zipfile.ZipFile(file_path, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for key, columns in tables:
+            prefix = "/".join(_table_path(key))
+            entries, metadata = table_columns(columns)
+            for name, values, offsets in entries:
+                _write_npy(archive, f"{prefix}/{name}", values)
+                if offsets is not None:
+                    _write_npy(archive, f"{prefix}/{name}.offsets", offsets)
+            _write_npy(archive, f"{prefix}/{NPZ_META}", np.array(json.dumps(metadata)))
+            if not progress.add(len(columns)):
+                return False
+    return True
+
+
+def _pyarrow():
+    """Import pyarrow, which is only needed for Arrow and Parquet exports."""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ValueError("Arrow and Parquet exports need the pyarrow package") from e
+    return pyarrow
+
+
+def arrow_table(columns):
+    """Convert a column store to a pyarrow Table."""
+    pa = _pyarrow()
+    entries, metadata = table_columns(columns)
+    arrays = []
+    for _, values, offsets in entries:
+        array = pa.array(values)
+        if offsets is not None:
+            array = pa.LargeListArray.from_arrays(pa.array(offsets, pa.int64()), array)
+        arrays.append(array)
+    return pa.Table.from_arrays(
+        arrays, names=[name for name, _, _ in entries],
+        metadata={"dlt": json.dumps(metadata)}
+    )
+
+
+def write_table_files(tables, dir_path, progress, export_format):
+    """Write one Parquet or Arrow IPC file per table below a directory."""
+    pa = _pyarrow()
+    extension = EXPORT_FORMATS[export_format]
+    for key, columns in tables:
+        file_path = os.path.join(dir_path, *_table_path(key)) + extension
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        table = arrow_table(columns)
+        if export_format == "parquet":
+            pa.parquet.write_table(table, file_path)
+        else:
+            with pa.ipc.new_file(file_path, table.schema) as writer:
+                writer.write_table(table)
+        if not progress.add(len(columns)):
+            return False
+    return True
+
+
+def export_file(struct_dict, file_path, export_format=None, on_progress=None,
+                should_stop=None):
+    """Export decoded data of a DLT file.
+
+    Args:
+        struct_dict: Decoded data of a DLT file
+        file_path: Output file (directory for parquet and arrow)
+        export_format: Key of EXPORT_FORMATS (defaults to the extension)
+        on_progress: Callback receiving (messages_done, messages_total)
+        should_stop: Callable returning True to cancel, the partial
+            output is removed
+
+    Returns:
+        True if written, False if cancelled
+
+    Raises:
+        ValueError: If the format is unknown or unavailable
+    """
+    export_format = export_format or export_format_of(file_path)
+    tables = export_tables(struct_dict)
+    progress = _Progress(tables, on_progress, should_stop)
+    if export_format == "ndjson":
+        completed = write_ndjson(tables, file_path, progress)
+    elif export_format == "npz":
+        completed = write_npz(tables, file_path, progress)
+    elif export_format in ("parquet", "arrow"):
+        completed = write_table_files(tables, file_path, progress, export_format)
+    else:
+        raise ValueError(f"Unknown export format \"{export_format}\"")
+
+    if not completed:
+        if os.path.isdir(file_path):
+            extension = EXPORT_FORMATS[export_format]
+            for key, _ in tables:
+                path = os.path.join(file_path, *_table_path(key)) + extension
+                if os.path.exists(path):
+                    os.remove(path)
+        elif os.path.exists(file_path):
+            os.remove(file_path)
+    return completed
+
+
+def load_tables(file_path):
+    """Load a columnar export.
+
+    Args:
+        file_path: .npz file or Parquet/Arrow export directory
+
+    Returns:
+        Dictionary {(app_id, ctx_id, message_name): table}, tables of NPZ
+        exports are dictionaries {column: array} (repeated leaves with a
+        "<column>.offsets" array), others pyarrow Tables (Arrow files are
+        memory mapped)
+    """
+    tables = {}
+    if os.path.isfile(file_path):
+        with np.load(file_path, allow_pickle=False) as archive:
+            for name in archive.files:
+                app_id, ctx_id, message_name, column = name.split("/", 3)
+                if column == NPZ_META:
+                    continue
+                tables.setdefault((app_id, ctx_id, message_name), {})[column] = archive[name]
+        return tables
+
+    pa = _pyarrow()
+    for root, _, files in os.walk(file_path):
+        for name in sorted(files):
+            message_name, extension = os.path.splitext(name)
+            relative = os.path.relpath(root, file_path).split(os.sep)
+            if len(relative) != 2:
+                continue
+            path = os.path.join(root, name)
+            if extension == EXPORT_FORMATS["parquet"]:
+                table = pa.parquet.read_table(path)
+            elif extension == EXPORT_FORMATS["arrow"]:
+                table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+            else:
+                continue
+            tables[(relative[0], relative[1], message_name)] = table
+    return tables
\ No newline at end of file
@@ -0,0 +1,193 @@
+"""Record filters applied to DLT header fields before payload decoding."""
+import re
+from datetime import datetime
+import numpy as np
+from dlt_reader import TIMESTAMP_FORMAT, format_timestamp
+
+# Accepted spellings of filter times besides seconds since epoch
+TIME_FORMATS = (TIMESTAMP_FORMAT, "%Y/%m/%d %H:%M:%S", "%Y-%m-%d %H:%M:%S.%f",
+                "%Y-%m-%d %H:%M:%S")
+# Filter text: "key=value[,value...]" terms separated by spaces
+FILTER_TERM_RE = re.compile(r"(\w+)\s*=\s*(\"[^\"]*\"|\S+)")
+
+
+class RecordFilter:
+    """Selects records by app id, ctx id, message type and time window.
+
+    App id, ctx id and storage timestamp are checked on the index built
+    from the headers, so rejected records are never decoded. The message
+    type is checked on the payload framing before any hex or protobuf
+    decoding. Empty criteria accept everything.
+    """
+
+    def __init__(self, app_ids=(), ctx_ids=(), message_names=(), start=None, end=None):
+        """
+        Initialize filter.
+
+        Args:
+            app_ids: Accepted application ids (all if empty)
+            ctx_ids: Accepted context ids (all if empty)
+            message_names: Accepted message types (all if empty)
+            start: Earliest storage timestamp (seconds since epoch)
+            end: Latest storage timestamp (seconds since epoch)
+        """
+        self.app_ids = frozenset(app_ids)
+        self.ctx_ids = frozenset(ctx_ids)
+        self.message_names = frozenset(message_names)
+        self.start = start
+        self.end = end
+
+    def __bool__(self):
+        return bool(
+            self.app_ids or self.ctx_ids or self.message_names
+            or self.start is not None or self.end is not None
+        )
+
+    def __str__(self):
+        terms = []
+        for key, values in (("app", self.app_ids), ("ctx", self.ctx_ids),
+                            ("message", self.message_names)):
+            if values:
+                terms.append(f"{key}={','.join(sorted(values))}")
+        for key, value in (("start", self.start), ("end", self.end)):
+            if value is not None:
+                terms.append(f"{key}=\"{format_timestamp(value)}\"")
+        return " ".join(terms)
+
+    @classmethod
+    def parse(cls, text):
+        """Create a filter from text like 'app=SWAV,ABCD ctx=SWC1 start="..."'.
+
+        Keys are app, ctx, message, start and end. Times are seconds since
+        epoch or local "YYYY/MM/DD HH:MM:SS[.ffffff]".
+
+        Raises:
+            ValueError: If the text contains unknown keys or bad times
+        """
+        values = {}
+        position = 0
+        text = text.strip()
+        for match in FILTER_TERM_RE.finditer(text):
+            if text[position:match.start()].strip():
+                break
+            key, value = match.group(1).lower(), match.group(2).strip('"')
+            if key not in ("app", "ctx", "message", "start", "end"):
+                raise ValueError(f"Unknown filter key \"{key}\"")
+            values[key] = value
+            position = match.end()
+        if text[position:].strip():
+            raise ValueError(f"Invalid filter near \"{text[position:].strip()}\"")
+
+        def ids(key):
+            return [value for value in values.get(key, "").split(",") if value]
+        return cls(
+            ids("app"), ids("ctx"), ids("message"),
+            parse_time(values["start"]) if "start" in values else None,
+            parse_time(values["end"]) if "end" in values else None
+        )
+
+    def accepts_ids(self, app_id, ctx_id):
+        """Check app and ctx id of a record."""
+        return ((not self.app_ids or app_id in self.app_ids)
+                and (not self.ctx_ids or ctx_id in self.ctx_ids))
+
+    def accepts_message(self, message_name):
+        """Check the message type of a record."""
+        return not self.message_names or message_name in self.message_names
+
+    def record_mask(self, index, first=0):
+        """Return which indexed records pass the header criteria.
+
+        Args:
+            index: DLTIndex
+            first: Number of the first record to check
+
+        Returns:
+            Boolean array for records first..len(index)-1
+        """
+        count = len(index) - first
+        mask = np.ones(count, dtype=np.bool_)
+        for ids, codes in ((self.app_ids, index.app_codes), (self.ctx_ids, index.ctx_codes)):
+            if ids:
+                accepted = [index.code_of(id_str) for id_str in ids]
+                accepted = [code for code in accepted if code is not None]
+                mask &= np.isin(
+                    np.frombuffer(codes, dtype=np.uint16, count=count, offset=2 * first),
+                    accepted
+                )
+        if self.start is not None or self.end is not None:
+            timestamps = np.frombuffer(
+                index.timestamps, dtype=np.float64, count=count, offset=8 * first
+            )
+            if self.start is not None:
+                mask &= timestamps >= self.start
+            if self.end is not None:
+                mask &= timestamps <= self.end
+        return mask
+
+    def select(self, messages, index=None):
+        """Filter a nested {app_id: {ctx_id: message names}} dictionary.
+
+        Args:
+            messages: Message types per context, e.g. DLTIndex.messages
+            index: DLTIndex of the records, contexts and message types
+                without records in the time window are removed as well
+
+        Returns:
+            Same nesting with rejected contexts and types removed
+        """
+        present = None
+        if index is not None and (self.start is not None or self.end is not None):
+            present = self._present_codes(index)
+        selected = {}
+        for app_id, ctx_dict in messages.items():
+            for ctx_id, names in ctx_dict.items():
+                if not self.accepts_ids(app_id, ctx_id):
+                    continue
+                if present is not None:
+                    context = (index.code_of(app_id), index.code_of(ctx_id))
+                    if context not in present:
+                        continue
+                    names = [name for name in names
+                             if index.message_code_of(name) in present[context]]
+                selected.setdefault(app_id, {})[ctx_id] = [
+                    name for name in names if self.accepts_message(name)
+                ]
+        return selected
+
+    def _present_codes(self, index):
+        """Return {(app code, ctx code): message codes} of accepted records."""
+        mask = self.record_mask(index)
+        app_codes = np.frombuffer(index.app_codes, dtype=np.uint16)[mask]
+        ctx_codes = np.frombuffer(index.ctx_codes, dtype=np.uint16)[mask]
+        message_codes = np.frombuffer(index.message_codes, dtype=np.int16)[mask]
+        # Distinct (app, ctx, message type) code triples
+        keys = np.unique(
+            (app_codes.astype(np.int64) << 32) | (ctx_codes.astype(np.int64) << 16)
+            | (message_codes.astype(np.int64) & 0xFFFF)
+        )
+        present = {}
+        for key in keys.tolist():
+            codes = present.setdefault((key >> 32, (key >> 16) & 0xFFFF), set())
+            message_code = key & 0xFFFF
+            if message_code < 0x8000:  # Negative codes: no message type
+                codes.add(message_code)
+        return present
+
+
+def parse_time(text):
+    """Parse a filter time to seconds since epoch.
+
+    Raises:
+        ValueError: If the text is no known time format
+    """
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    for time_format in TIME_FORMATS:
+        try:
+            return datetime.strptime(text, time_format).timestamp()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid time \"{text}\" (use YYYY/MM/DD HH:MM:SS)")
\ No newline at end of file
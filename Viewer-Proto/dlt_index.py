@@ -0,0 +1,472 @@
+"""Memory-mapped DLT file access with a compact record index."""
+import os
+import sys
+import mmap
+import json
+import struct
+import hashlib
+from array import array
+from dlt_reader import (
+    DLT_STORAGE_MAGIC, STORAGE_HEADER, HTYP_MSBF, HTYP_WTMS, MSIN_VERB, ECU_TICK,
+    TYPE_STRG, TYPE_VARI, parse_message, find_storage_magic, needs_resync
+)
+
+# Sidecar index file layout: magic, header length, JSON header, raw arrays
+INDEX_MAGIC = b"DLTIDX"
+INDEX_VERSION = 2
+INDEX_EXTENSION = ".dltidx"
+INDEX_HEADER = struct.Struct("<6sHI")
+INDEX_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "proto_dashboard", "index"
+)
+HASH_SAMPLE_SIZE = 1 << 20
+
+
+class DLTIndex:
+    """Per-file record index stored in typed arrays.
+
+    One entry per record: storage header offset, payload offset/length,
+    storage timestamp, ECU timestamp ticks, interned app/ctx id codes,
+    header flags and the code of the encoded message type carried in the
+    payload.
+    """
+    ARRAYS = (
+        ("record_offsets", "q"),
+        ("payload_offsets", "q"),
+        ("payload_lengths", "I"),
+        ("timestamps", "d"),
+        ("ecu_ticks", "I"),
+        ("app_codes", "H"),
+        ("ctx_codes", "H"),
+        ("flags", "H"),
+        ("message_codes", "h"),
+    )
+
+    def __init__(self):
+        for name, typecode in self.ARRAYS:
+            setattr(self, name, array(typecode))
+        self.ids = []  # code -> id string
+        self._codes = {}  # id string -> code
+        self.message_names = []  # message code -> type name (-1 for none)
+        self._message_codes = {}
+        self.messages = {}  # app_id: {ctx_id: [message type names]}
+        self.keys = {}  # app_id: {ctx_id: [key labels]}
+        self.end_offset = 0  # File offset after the last indexed record
+
+    def __len__(self):
+        return len(self.record_offsets)
+
+    def intern(self, id_str):
+        """Return code for an app/ctx id, assigning a new one if needed.
+
+        Args:
+            id_str: App or context id
+
+        Returns:
+            Integer code
+        """
+        code = self._codes.get(id_str)
+        if code is None:
+            code = len(self.ids)
+            self.ids.append(id_str)
+            self._codes[id_str] = code
+        return code
+
+    def code_of(self, id_str):
+        """Return code for an id or None if unknown."""
+        return self._codes.get(id_str)
+
+    def append(self, record_offset, payload_offset, payload_length,
+               timestamp, app_id, ctx_id, htyp, msin, ecu_ticks=None):
+        """Add a record to the index."""
+        self.record_offsets.append(record_offset)
+        self.payload_offsets.append(payload_offset)
+        self.payload_lengths.append(payload_length)
+        self.timestamps.append(timestamp)
+        self.ecu_ticks.append(ecu_ticks or 0)  # Presence given by HTYP_WTMS
+        self.app_codes.append(self.intern(app_id))
+        self.ctx_codes.append(self.intern(ctx_id))
+        self.flags.append((htyp << 8) | msin)
+        self.message_codes.append(-1)
+
+    def intern_message_name(self, message_name):
+        """Return code for a message type name, assigning a new one if needed."""
+        code = self._message_codes.get(message_name)
+        if code is None:
+            code = len(self.message_names)
+            self.message_names.append(message_name)
+            self._message_codes[message_name] = code
+        return code
+
+    def message_code_of(self, message_name):
+        """Return code for a message type name or None if unknown."""
+        return self._message_codes.get(message_name)
+
+    def set_message_name(self, i, message_name):
+        """Record the encoded message type name of record i."""
+        self.message_codes[i] = self.intern_message_name(message_name)
+
+    def extend(self, other):
+        """Append records of an index built for a following file range.
+
+        Args:
+            other: DLTIndex whose records come after the ones in self
+        """
+        id_codes = [self.intern(id_str) for id_str in other.ids]
+        name_codes = [self.intern_message_name(name) for name in other.message_names]
+
+        self.record_offsets.extend(other.record_offsets)
+        self.payload_offsets.extend(other.payload_offsets)
+        self.payload_lengths.extend(other.payload_lengths)
+        self.timestamps.extend(other.timestamps)
+        self.ecu_ticks.extend(other.ecu_ticks)
+        self.flags.extend(other.flags)
+        self.app_codes.extend(array('H', (id_codes[c] for c in other.app_codes)))
+        self.ctx_codes.extend(array('H', (id_codes[c] for c in other.ctx_codes)))
+        self.message_codes.extend(array('h', (
+            name_codes[c] if c >= 0 else -1 for c in other.message_codes
+        )))
+        self.end_offset = other.end_offset
+
+    def message_name(self, i):
+        """Return encoded message type name of record i or None."""
+        code = self.message_codes[i]
+        return self.message_names[code] if code >= 0 else None
+
+    def app_id(self, i):
+        """Return app id of record i."""
+        return self.ids[self.app_codes[i]]
+
+    def ctx_id(self, i):
+        """Return ctx id of record i."""
+        return self.ids[self.ctx_codes[i]]
+
+    def uptime(self, i):
+        """Return ECU timestamp of record i in seconds (NaN if not sent)."""
+        if self.flags[i] >> 8 & HTYP_WTMS:
+            return self.ecu_ticks[i] * ECU_TICK
+        return float("nan")
+
+    def htyp(self, i):
+        """Return standard header type of record i."""
+        return self.flags[i] >> 8
+
+    def msin(self, i):
+        """Return extended header message info of record i."""
+        return self.flags[i] & 0xFF
+
+
+def index_buffer(buf, index, start=0, end=None):
+    """Index all complete records in a buffer in a single pass.
+
+    Args:
+        buf: Buffer holding DLT storage data (bytes or mmap)
+        index: DLTIndex to append records to
+        start: Offset to start parsing from
+        end: Limit of valid data in buf
+
+    Returns:
+        Offset of the first byte not consumed (start of a truncated record)
+    """
+    if end is None:
+        end = len(buf)
+    unpack_storage = STORAGE_HEADER.unpack_from
+    pos = start
+    while pos + STORAGE_HEADER.size <= end:
+        magic, seconds, microseconds, _ = unpack_storage(buf, pos)
+        parsed = None
+        if magic == DLT_STORAGE_MAGIC:
+            parsed = parse_message(buf, pos + STORAGE_HEADER.size, end)
+
+        if parsed:
+            htyp, msin, _, ecu_ticks, app_id, ctx_id, payload_start, message_end = parsed
+            index.append(
+                pos, payload_start, message_end - payload_start,
+                seconds + microseconds / 1e6, app_id, ctx_id, htyp, msin, ecu_ticks
+            )
+            pos = message_end
+            continue
+
+        if not needs_resync(buf, pos, end):
+            break  # Truncated record
+
+        next_pos = find_storage_magic(buf, pos + 1, end)
+        if next_pos < 0:
+            return max(pos + 1, end - len(DLT_STORAGE_MAGIC) + 1)
+        pos = next_pos
+    return pos
+
+
+def find_record_start(buf, start, end=None):
+    """Find the first real record start at or after an offset.
+
+    A storage magic only counts if its message parses and is followed by
+    another storage magic (or the end of data), which rejects magic bytes
+    that happen to occur inside payloads.
+
+    Args:
+        buf: Buffer holding DLT storage data
+        start: Offset to start searching from
+        end: Limit of valid data in buf
+
+    Returns:
+        Offset of the record or -1
+    """
+    if end is None:
+        end = len(buf)
+    pos = start
+    while True:
+        pos = find_storage_magic(buf, pos, end)
+        if pos < 0:
+            return -1
+        parsed = parse_message(buf, pos + STORAGE_HEADER.size, end)
+        if parsed:
+            message_end = parsed[-1]
+            if message_end == end or buf[message_end:message_end + 4] == DLT_STORAGE_MAGIC:
+                return pos
+        pos += 1
+
+
+def split_records(buf, count):
+    """Split a buffer into record aligned ranges.
+
+    Args:
+        buf: Buffer holding DLT storage data
+        count: Desired number of ranges
+
+    Returns:
+        List of (start, end) offsets covering the whole buffer
+    """
+    size = len(buf)
+    bounds = [0]
+    for k in range(1, count):
+        pos = find_record_start(buf, size * k // count)
+        if pos > bounds[-1]:
+            bounds.append(pos)
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+class MappedDLTFile:
+    """Memory-mapped DLT file with zero-copy payload access."""
+
+    def __init__(self, dlt_path, index=None, start=0, end=None):
+        """
+        Map DLT file and build its record index.
+
+        Args:
+            dlt_path: Path to DLT file
+            index: Previously built DLTIndex to reuse instead of scanning
+            start: Offset of the first record to index
+            end: Limit of the indexed range (defaults to end of file)
+        """
+        self.dlt_path = dlt_path
+        self._file = open(dlt_path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._mm = None  # Empty file cannot be mapped
+        self.buffer = memoryview(self._mm) if self._mm is not None else memoryview(b"")
+        if index is not None:
+            self.index = index
+        else:
+            self.index = DLTIndex()
+            self.index.end_offset = start
+            self.index_more(end)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.index)
+
+    def index_more(self, end=None):
+        """Index complete records following the indexed part of the file.
+
+        Args:
+            end: Limit of the indexed range (defaults to end of mapping)
+
+        Returns:
+            Record number of the first newly indexed record
+        """
+        first = len(self.index)
+        self.index.end_offset = index_buffer(
+            self._mm if self._mm is not None else b"", self.index,
+            self.index.end_offset, end
+        )
+        return first
+
+    def payload(self, i):
+        """Return raw payload of record i as memoryview."""
+        start = self.index.payload_offsets[i]
+        return self.buffer[start:start + self.index.payload_lengths[i]]
+
+    def string_payload(self, i):
+        """Return first verbose string argument of record i.
+
+        Args:
+            i: Record number
+
+        Returns:
+            memoryview over the string bytes (without NUL terminator)
+            or None if the record does not start with a string argument
+        """
+        index = self.index
+        if not index.msin(i) & MSIN_VERB:
+            return None
+        start = index.payload_offsets[i]
+        end = start + index.payload_lengths[i]
+        if start + 6 > end:
+            return None
+
+        prefix = ">" if index.htyp(i) & HTYP_MSBF else "<"
+        type_info, size = struct.unpack_from(prefix + "IH", self.buffer, start)
+        if not type_info & TYPE_STRG or type_info & TYPE_VARI:
+            return None
+        data_end = min(start + 6 + size, end)
+        if data_end > start + 6 and self.buffer[data_end - 1] == 0:
+            data_end -= 1
+        return self.buffer[start + 6:data_end]
+
+    def close(self):
+        """Release mapping and file handle."""
+        self.buffer.release()
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                pass  # Payload views still alive, mapping freed with them
+        self._file.close()
+
+
+def index_path(dlt_path):
+    """Return sidecar index path next to a DLT file."""
+    return os.path.splitext(dlt_path)[0] + INDEX_EXTENSION
+
+
+def _cache_index_path(dlt_path):
+    """Return fallback index path in the user cache directory."""
+    key = hashlib.sha1(os.path.abspath(dlt_path).encode("utf-8")).hexdigest()
+    return os.path.join(INDEX_CACHE_DIR, key + INDEX_EXTENSION)
+
+
+def file_signature(dlt_path):
+    """Compute signature used to validate a stored index.
+
+    Size and mtime catch ordinary rewrites, the hash of the first and last
+    megabyte catches copies with a preserved mtime.
+
+    Args:
+        dlt_path: Path to DLT file
+
+    Returns:
+        Dictionary with size, mtime_ns and sample hash
+    """
+    stat = os.stat(dlt_path)
+    digest = hashlib.sha1()
+    with open(dlt_path, "rb") as file:
+        digest.update(file.read(HASH_SAMPLE_SIZE))
+        if stat.st_size > HASH_SAMPLE_SIZE:
+            file.seek(max(HASH_SAMPLE_SIZE, stat.st_size - HASH_SAMPLE_SIZE))
+            digest.update(file.read(HASH_SAMPLE_SIZE))
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "hash": digest.hexdigest()
+    }
+
+
+def save_index(index, dlt_path):
+    """Write index as sidecar file, falling back to the cache directory.
+
+    Args:
+        index: DLTIndex to store
+        dlt_path: Path to indexed DLT file
+
+    Returns:
+        Path of the written index or None on failure
+    """
+    header = {
+        "version": INDEX_VERSION,
+        "byteorder": sys.byteorder,
+        "signature": file_signature(dlt_path),
+        "count": len(index),
+        "end_offset": index.end_offset,
+        "ids": index.ids,
+        "message_names": index.message_names,
+        "messages": index.messages,
+        "keys": index.keys
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+
+    for path in (index_path(dlt_path), _cache_index_path(dlt_path)):
+        tmp_path = path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(tmp_path, "wb") as file:
+                file.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(header_bytes)))
+                file.write(header_bytes)
+                for name, _ in DLTIndex.ARRAYS:
+                    getattr(index, name).tofile(file)
+            os.replace(tmp_path, path)
+            return path
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return None
+
+
+def _read_index_file(path, signature):
+    """Read an index file if it matches the given file signature."""
+    with open(path, "rb") as file:
+        raw = file.read(INDEX_HEADER.size)
+        if len(raw) != INDEX_HEADER.size:
+            return None
+        magic, version, header_size = INDEX_HEADER.unpack(raw)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            return None
+        header = json.loads(file.read(header_size).decode("utf-8"))
+        if header.get("byteorder") != sys.byteorder or header.get("signature") != signature:
+            return None
+
+        index = DLTIndex()
+        count = header["count"]
+        for name, _ in DLTIndex.ARRAYS:
+            getattr(index, name).fromfile(file, count)
+        for id_str in header["ids"]:
+            index.intern(id_str)
+        index.message_names = header["message_names"]
+        index._message_codes = {
+            name: code for code, name in enumerate(index.message_names)
+        }
+        index.messages = header["messages"]
+        index.keys = header["keys"]
+        index.end_offset = header["end_offset"]
+        return index
+
+
+def load_index(dlt_path):
+    """Load a stored index if it is still valid for the DLT file.
+
+    Args:
+        dlt_path: Path to DLT file
+
+    Returns:
+        DLTIndex or None if missing, stale or unreadable
+    """
+    signature = None
+    for path in (index_path(dlt_path), _cache_index_path(dlt_path)):
+        if not os.path.exists(path):
+            continue
+        try:
+            if signature is None:
+                signature = file_signature(dlt_path)
+            index = _read_index_file(path, signature)
+        except (OSError, ValueError, EOFError, KeyError):
+            index = None
+        if index is not None:
+            return index
+    return None
\ No newline at end of file
@@ -0,0 +1,336 @@
+"""Native reader for DLT storage files."""
+import struct
+from datetime import datetime
+from typing import NamedTuple
+
+# Storage header: "DLT\x01" + seconds + microseconds + ECU id
+DLT_STORAGE_MAGIC = b"DLT\x01"
+STORAGE_HEADER = struct.Struct("<4sIi4s")
+
+# Standard header: HTYP, MCNT, LEN (always big endian)
+STANDARD_HEADER = struct.Struct(">BBH")
+
+# ECU timestamp (uptime) following ECU/session id, in 0.1 ms ticks
+ECU_TIMESTAMP = struct.Struct(">I")
+ECU_TICK = 1e-4
+
+# Extended header: MSIN, NOAR, APID, CTID
+EXTENDED_HEADER = struct.Struct(">BB4s4s")
+
+# HTYP flags
+HTYP_UEH = 0x01   # Use extended header
+HTYP_MSBF = 0x02  # Payload is big endian
+HTYP_WEID = 0x04  # With ECU id
+HTYP_WSID = 0x08  # With session id
+HTYP_WTMS = 0x10  # With timestamp
+
+# MSIN flags
+MSIN_VERB = 0x01  # Verbose payload
+
+# Verbose argument type info
+TYPE_LENGTH_MASK = 0x0F
+TYPE_BOOL = 0x10
+TYPE_SINT = 0x20
+TYPE_UINT = 0x40
+TYPE_FLOA = 0x80
+TYPE_STRG = 0x200
+TYPE_RAWD = 0x400
+TYPE_VARI = 0x800
+TYPE_LENGTHS = {1: 1, 2: 2, 3: 4, 4: 8, 5: 16}
+
+READ_CHUNK_SIZE = 1 << 20
+TIMESTAMP_FORMAT = "%Y/%m/%d %H:%M:%S.%f"
+
+
+class DLTRecord(NamedTuple):
+    """Single message read from a DLT storage file."""
+    offset: int  # Offset of the storage header in the file
+    timestamp: float  # Storage header time (seconds since epoch)
+    ecu: str
+    app_id: str
+    ctx_id: str
+    htyp: int
+    msin: int
+    payload: bytes  # Or a memoryview into the read buffer
+    uptime: float = None  # ECU timestamp in seconds (None if not sent)
+
+
+def _decode_id(raw):
+    """Decode a 4 byte DLT id padded with NUL bytes."""
+    return raw.rstrip(b"\x00").decode("ascii", errors="replace")
+
+
+def parse_message(buf, offset, end=None):
+    """Parse standard and extended header of a DLT message.
+
+    Args:
+        buf: Buffer holding the message (bytes, bytearray, mmap, memoryview)
+        offset: Offset of the standard header in buf
+        end: Limit of valid data in buf (defaults to len(buf))
+
+    Returns:
+        Tuple (htyp, msin, ecu, ecu_ticks, app_id, ctx_id, payload_start,
+        message_end) or None if the message is incomplete or malformed,
+        ecu_ticks is None if the message carries no ECU timestamp
+    """
+    if end is None:
+        end = len(buf)
+    if offset + STANDARD_HEADER.size > end:
+        return None
+
+    htyp, _, length = STANDARD_HEADER.unpack_from(buf, offset)
+    message_end = offset + length
+    if length < STANDARD_HEADER.size or message_end > end:
+        return None
+
+    pos = offset + STANDARD_HEADER.size
+    ecu = ""
+    if htyp & HTYP_WEID:
+        ecu = _decode_id(buf[pos:pos + 4])
+        pos += 4
+    if htyp & HTYP_WSID:
+        pos += 4
+    ecu_ticks = None
+    if htyp & HTYP_WTMS:
+        if pos + ECU_TIMESTAMP.size > message_end:
+            return None
+        ecu_ticks = ECU_TIMESTAMP.unpack_from(buf, pos)[0]
+        pos += ECU_TIMESTAMP.size
+
+    msin = 0
+    app_id = ""
+    ctx_id = ""
+    if htyp & HTYP_UEH:
+        if pos + EXTENDED_HEADER.size > message_end:
+            return None
+        msin, _, raw_app, raw_ctx = EXTENDED_HEADER.unpack_from(buf, pos)
+        app_id = _decode_id(raw_app)
+        ctx_id = _decode_id(raw_ctx)
+        pos += EXTENDED_HEADER.size
+
+    if pos > message_end:
+        return None
+    return htyp, msin, ecu, ecu_ticks, app_id, ctx_id, pos, message_end
+
+
+def find_storage_magic(buf, start, end=None):
+    """Locate next storage header magic.
+
+    Args:
+        buf: Buffer to search
+        start: Offset to start searching from
+        end: Limit of the search
+
+    Returns:
+        Offset of the magic or -1
+    """
+    if end is None:
+        end = len(buf)
+    return buf.find(DLT_STORAGE_MAGIC, start, end)
+
+
+def parse_stored_record(buf, offset, end=None):
+    """Parse one record (storage header + message) from a buffer.
+
+    Args:
+        buf: Buffer holding DLT storage data
+        offset: Offset of the storage header
+        end: Limit of valid data in buf
+
+    Returns:
+        Tuple (DLTRecord, next_offset) or None if the record is incomplete
+        or malformed, the payload is a slice of buf (no copy if buf is a
+        memoryview)
+    """
+    if end is None:
+        end = len(buf)
+    if offset + STORAGE_HEADER.size > end:
+        return None
+
+    magic, seconds, microseconds, raw_ecu = STORAGE_HEADER.unpack_from(buf, offset)
+    if magic != DLT_STORAGE_MAGIC:
+        return None
+
+    parsed = parse_message(buf, offset + STORAGE_HEADER.size, end)
+    if not parsed:
+        return None
+    htyp, msin, ecu, ecu_ticks, app_id, ctx_id, payload_start, message_end = parsed
+
+    record = DLTRecord(
+        offset=offset,
+        timestamp=seconds + microseconds / 1e6,
+        ecu=ecu or _decode_id(raw_ecu),
+        app_id=app_id,
+        ctx_id=ctx_id,
+        htyp=htyp,
+        msin=msin,
+        payload=buf[payload_start:message_end],
+        uptime=ecu_ticks * ECU_TICK if ecu_ticks is not None else None
+    )
+    return record, message_end
+
+
+def read_dlt_records(dlt_path, chunk_size=READ_CHUNK_SIZE):
+    """Stream records from a DLT storage file.
+
+    Corrupt data is skipped by resyncing on the next storage magic,
+    a truncated record at the end of the file is ignored.
+
+    Args:
+        dlt_path: Path to DLT file
+        chunk_size: Number of bytes read from disk at once
+
+    Yields:
+        DLTRecord for every message in the file, its payload is a
+        memoryview into the read chunk (bytes() copies payloads kept
+        longer than the chunk should be)
+    """
+    with open(dlt_path, "rb") as file:
+        buf = b""
+        view = memoryview(buf)  # Payloads are sliced without copies
+        base = 0  # File offset of buf[0]
+        pos = 0
+        eof = False
+        while True:
+            parsed = parse_stored_record(view, pos)
+            if parsed:
+                record, pos = parsed
+                yield record._replace(offset=base + record.offset)
+                continue
+
+            if needs_resync(buf, pos):
+                next_pos = find_storage_magic(buf, pos + 1)
+                if next_pos < 0:
+                    # Keep a possible partial magic at the end
+                    next_pos = max(pos + 1, len(buf) - len(DLT_STORAGE_MAGIC) + 1)
+                pos = next_pos
+                continue
+
+            if eof:
+                return  # Truncated record at end of file
+
+            # Need more data
+            chunk = file.read(chunk_size)
+            if not chunk:
+                eof = True
+            base += pos
+            buf = buf[pos:] + chunk
+            view = memoryview(buf)
+            pos = 0
+
+
+def needs_resync(buf, pos, end=None):
+    """Check whether data at pos can never become a valid record.
+
+    Args:
+        buf: Buffer holding DLT storage data
+        pos: Offset where a record failed to parse
+        end: Limit of valid data in buf
+
+    Returns:
+        True if the reader must skip to the next storage magic
+    """
+    if end is None:
+        end = len(buf)
+    available = end - pos
+    if available < len(DLT_STORAGE_MAGIC):
+        return False
+    if buf[pos:pos + len(DLT_STORAGE_MAGIC)] != DLT_STORAGE_MAGIC:
+        return True
+    if available < STORAGE_HEADER.size + STANDARD_HEADER.size:
+        return False
+
+    length = STANDARD_HEADER.unpack_from(buf, pos + STORAGE_HEADER.size)[2]
+    if length < STANDARD_HEADER.size:
+        return True
+    # Complete message that still failed to parse is malformed
+    return STORAGE_HEADER.size + length <= available
+
+
+def _unpack_number(payload, pos, size, kind, fmt_prefix):
+    """Unpack a verbose numeric argument."""
+    if kind == TYPE_FLOA:
+        code = {2: "e", 4: "f", 8: "d"}.get(size)
+    elif kind == TYPE_SINT:
+        code = {1: "b", 2: "h", 4: "i", 8: "q"}.get(size)
+    else:
+        code = {1: "B", 2: "H", 4: "I", 8: "Q"}.get(size)
+    if not code:
+        return None
+    return struct.unpack_from(fmt_prefix + code, payload, pos)[0]
+
+
+def verbose_arguments(payload, big_endian=False):
+    """Decode verbose payload arguments.
+
+    Args:
+        payload: Raw verbose payload bytes
+        big_endian: Whether the payload uses big endian byte order
+
+    Returns:
+        List of decoded argument values (str, int, float, bool or hex str)
+    """
+    fmt_prefix = ">" if big_endian else "<"
+    args = []
+    pos = 0
+    end = len(payload)
+    while pos + 4 <= end:
+        type_info = struct.unpack_from(fmt_prefix + "I", payload, pos)[0]
+        pos += 4
+        if type_info & TYPE_VARI:
+            break  # Named arguments are not supported
+
+        if type_info & (TYPE_STRG | TYPE_RAWD):
+            if pos + 2 > end:
+                break
+            size = struct.unpack_from(fmt_prefix + "H", payload, pos)[0]
+            pos += 2
+            data = payload[pos:pos + size]
+            pos += size
+            if type_info & TYPE_STRG:
+                args.append(bytes(data).rstrip(b"\x00").decode("utf-8", errors="replace"))
+            else:
+                args.append(bytes(data).hex())
+            continue
+
+        size = TYPE_LENGTHS.get(type_info & TYPE_LENGTH_MASK)
+        if not size or pos + size > end:
+            break
+        if type_info & TYPE_BOOL:
+            args.append(bool(payload[pos]))
+        else:
+            kind = type_info & (TYPE_SINT | TYPE_UINT | TYPE_FLOA)
+            value = _unpack_number(payload, pos, size, kind, fmt_prefix)
+            if value is None:
+                break
+            args.append(value)
+        pos += size
+    return args
+
+
+def payload_text(record):
+    """Render record payload as text, like dlt-viewer does.
+
+    Args:
+        record: DLTRecord
+
+    Returns:
+        Space joined verbose arguments, or hex for non-verbose payloads
+    """
+    if record.msin & MSIN_VERB:
+        args = verbose_arguments(record.payload, bool(record.htyp & HTYP_MSBF))
+        return " ".join(str(arg) for arg in args)
+    return record.payload.hex()
+
+
+def format_timestamp(timestamp, fmt=TIMESTAMP_FORMAT):
+    """Format storage header time as local date/time string.
+
+    Args:
+        timestamp: Seconds since epoch
+        fmt: strftime format
+
+    Returns:
+        Formatted timestamp string
+    """
+    return datetime.fromtimestamp(timestamp).strftime(fmt)
\ No newline at end of file
@@ -0,0 +1,123 @@
+"""Scheduling of DLT load workers."""
+import os
+from PyQt6.QtCore import QObject, pyqtSignal
+
+# Loads running at once, more compete for the GIL and the disk
+LOAD_CONCURRENCY = max(1, min(4, (os.cpu_count() or 2) // 2))
+# Priority of loads the user is waiting for
+PRIORITY_SELECTED = 1
+
+
+class LoadScheduler(QObject):
+    """Runs a bounded number of DLT load workers and queues the rest.
+
+    Workers are started in priority order (first come first within a
+    priority) and kept referenced until their thread has finished, so a
+    running QThread is never garbage collected.
+    """
+    changed = pyqtSignal()  # Queue or running loads changed
+
+    def __init__(self, max_workers=LOAD_CONCURRENCY, parent=None):
+        """
+        Initialize scheduler.
+
+        Args:
+            max_workers: Maximum number of loads running at once
+            parent: Owning QObject
+        """
+        super().__init__(parent)
+        self.max_workers = max(1, max_workers)
+        self.running = {}  # dlt_path: started DLTWorker
+        self._queue = []  # [priority, sequence, DLTWorker] waiting to start
+        self._sequence = 0
+
+    def submit(self, worker, priority=0):
+        """Queue a load worker and start it if a slot is free.
+
+        Args:
+            worker: DLTWorker not started yet
+            priority: Higher priorities start first
+        """
+        worker.finished.connect(lambda *_, w=worker: self._on_done(w))
+        worker.cancelled.connect(lambda _, w=worker: self._on_done(w))
+        worker.failed.connect(lambda _, w=worker: self._on_done(w))
+        self._sequence += 1
+        self._queue.append([priority, self._sequence, worker])
+        self._start_next()
+        self.changed.emit()
+
+    def queued(self):
+        """Return paths of waiting loads in start order."""
+        return [worker.dlt_path for _, _, worker in self._ordered()]
+
+    def prioritize(self, dlt_path, priority=PRIORITY_SELECTED):
+        """Move a waiting load ahead of loads with lower priority.
+
+        Returns:
+            True if the load was waiting
+        """
+        for entry in self._queue:
+            if entry[2].dlt_path == dlt_path:
+                self._sequence += 1
+                entry[0] = max(entry[0], priority)
+                entry[1] = -self._sequence  # Ahead of earlier prioritized loads
+                self.changed.emit()
+                return True
+        return False
+
+    def cancel(self, dlt_path):
+        """Drop a waiting load or ask a running one to stop.
+
+        A running worker still emits cancelled (or finished) once it
+        stopped, a waiting one is never started.
+
+        Returns:
+            True if the load was waiting or running
+        """
+        worker = self.running.get(dlt_path)
+        if worker is not None:
+            worker.cancel()
+            return True
+        for entry in self._queue:
+            if entry[2].dlt_path == dlt_path:
+                self._queue.remove(entry)
+                entry[2].deleteLater()
+                self.changed.emit()
+                return True
+        return False
+
+    def clear(self):
+        """Drop all waiting loads, running loads are left to the caller."""
+        for _, _, worker in self._queue:
+            worker.deleteLater()
+        self._queue.clear()
+        self.changed.emit()
+
+    def set_max_workers(self, max_workers):
+        """Change the number of concurrent loads."""
+        self.max_workers = max(1, max_workers)
+        self._start_next()
+        self.changed.emit()
+
+    def _ordered(self):
+        """Return waiting entries in start order."""
+        return sorted(self._queue, key=lambda entry: (-entry[0], entry[1]))
+
+    def _start_next(self):
+        """Start waiting loads while slots are free."""
+        while self._queue and len(self.running) < self.max_workers:
+            entry = self._ordered()[0]
+            self._queue.remove(entry)
+            worker = entry[2]
+            self.running[worker.dlt_path] = worker
+            worker.start()
+
+    def _on_done(self, worker):
+        """Release the slot of a worker that stopped and start the next."""
+        if self.running.get(worker.dlt_path) is not worker:
+            return  # Already released (finished after cancel)
+        del self.running[worker.dlt_path]
+        worker.wait()  # Signal is emitted at the end of run()
+        worker.deleteLater()
+        self._start_next()
+        self.changed.emit()
\ No newline at end of file
@@ -0,0 +1,257 @@
+"""Protobuf message descriptors compiled into flat leaf accessors."""
+import base64
+from typing import NamedTuple
+import numpy as np
+from google.protobuf.descriptor import FieldDescriptor
+from dlt_columns import Column, MessageColumns
+
+# NumPy dtype of each protobuf scalar type
+FIELD_DTYPES = {
+    FieldDescriptor.CPPTYPE_INT32: np.int32,
+    FieldDescriptor.CPPTYPE_INT64: np.int64,
+    FieldDescriptor.CPPTYPE_UINT32: np.uint32,
+    FieldDescriptor.CPPTYPE_UINT64: np.uint64,
+    FieldDescriptor.CPPTYPE_DOUBLE: np.float64,
+    FieldDescriptor.CPPTYPE_FLOAT: np.float32,
+    FieldDescriptor.CPPTYPE_BOOL: np.bool_,
+    FieldDescriptor.CPPTYPE_ENUM: np.int32,
+    FieldDescriptor.CPPTYPE_STRING: object,
+}
+
+# Accessor step kinds
+STEP_SCALAR = 0  # Singular scalar, always present
+STEP_OPTIONAL = 1  # Singular scalar with presence (oneof member)
+STEP_REPEATED = 2  # Repeated scalar
+STEP_MESSAGE = 3  # Singular message, present when set
+STEP_GROUP = 4  # Repeated message
+
+
+class SchemaLeaf(NamedTuple):
+    """Scalar field reachable from the root message."""
+    path: tuple  # JSON field names from the root message
+    dtype: object
+    repeated: bool  # Repeated scalar field
+    ragged: bool  # Number of values per message may differ from one
+    grouped: bool  # Below a repeated message, values always keep offsets
+    labels: dict  # Enum value names by number (None for other types)
+
+
+def _bytes_to_text(value):
+    """Render bytes like MessageToDict does."""
+    return base64.b64encode(value).decode("utf-8")
+
+
+class MessageSchema:
+    """Flat leaf layout of one protobuf message type.
+
+    The descriptor is compiled once into nested accessor steps which
+    read field values straight from parsed messages. Values match
+    MessageToDict with including_default_value_fields=True, except that
+    enums stay numeric (with names in SchemaLeaf.labels) and 64 bit
+    integers are not rendered as strings. Map fields and recursive
+    message types have no fixed layout and are left out.
+    """
+
+    def __init__(self, descriptor):
+        """
+        Compile message descriptor.
+
+        Args:
+            descriptor: Protobuf message Descriptor
+        """
+        self.name = descriptor.name
+        self.leaves = []
+        self.groups = set()  # Paths of repeated message fields
+        self.messages = []  # (path, ragged) of singular nested messages
+        self._steps = self._compile(descriptor, (), (descriptor.full_name,), False, False)
+        self.ragged = [j for j, leaf in enumerate(self.leaves) if leaf.ragged]
+
+    @property
+    def slots(self):
+        """Number of value lists needed by extract (leaves + presence)."""
+        return len(self.leaves) + len(self.messages)
+
+    def _compile(self, descriptor, path, stack, optional, grouped):
+        """Build accessor steps of a (nested) message type.
+
+        Args:
+            descriptor: Descriptor of the message at path
+            path: Path tuple of the message
+            stack: Full names of enclosing message types
+            optional: Whether the message may be absent
+            grouped: Whether the message lies inside a repeated message
+
+        Returns:
+            List of (kind, attribute, target, option) tuples, option is the
+            value converter of leaves and the presence slot of messages
+        """
+        steps = []
+        for field in descriptor.fields:
+            field_path = path + (field.json_name,)
+            repeated = field.label == FieldDescriptor.LABEL_REPEATED
+
+            if field.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE:
+                message_type = field.message_type
+                if message_type.GetOptions().map_entry or message_type.full_name in stack:
+                    continue
+                children = self._compile(
+                    message_type, field_path, stack + (message_type.full_name,), True,
+                    grouped or repeated
+                )
+                if repeated:
+                    self.groups.add(field_path)
+                    steps.append((STEP_GROUP, field.name, children, None))
+                else:
+                    self.messages.append((field_path, optional))
+                    steps.append((STEP_MESSAGE, field.name, children, -len(self.messages)))
+                continue
+
+            labels = None
+            convert = None
+            if field.cpp_type == FieldDescriptor.CPPTYPE_ENUM:
+                labels = {
+                    value.number: value.name for value in field.enum_type.values
+                }
+            elif field.type == FieldDescriptor.TYPE_BYTES:
+                convert = _bytes_to_text
+
+            if repeated:
+                kind = STEP_REPEATED
+            elif field.containing_oneof is not None:
+                kind = STEP_OPTIONAL
+            else:
+                kind = STEP_SCALAR
+
+            self.leaves.append(SchemaLeaf(
+                path=field_path,
+                dtype=FIELD_DTYPES[field.cpp_type],
+                repeated=repeated,
+                ragged=optional or kind != STEP_SCALAR,
+                grouped=grouped,
+                labels=labels
+            ))
+            steps.append((kind, field.name, len(self.leaves) - 1, convert))
+        return steps
+
+    def key_paths(self):
+        """Return all field paths (including intermediate nodes) in order."""
+        paths = []
+        seen = set()
+        for leaf in self.leaves:
+            for depth in range(1, len(leaf.path) + 1):
+                prefix = leaf.path[:depth]
+                if prefix not in seen:
+                    seen.add(prefix)
+                    paths.append(prefix)
+        return paths
+
+    def extract(self, message, values):
+        """Append leaf values of a parsed message.
+
+        Args:
+            message: Parsed protobuf message of this type
+            values: List with one value list per leaf
+        """
+        _extract(self._steps, message, values)
+
+
+def _extract(steps, message, values):
+    """Run compiled accessor steps on a message.
+
+    Presence flags of nested messages are stored from the end of values.
+    """
+    for kind, attr, target, convert in steps:
+        if kind == STEP_SCALAR:
+            value = getattr(message, attr)
+            values[target].append(convert(value) if convert else value)
+        elif kind == STEP_MESSAGE:
+            present = message.HasField(attr)
+            values[convert].append(present)
+            if present:
+                _extract(target, getattr(message, attr), values)
+        elif kind == STEP_REPEATED:
+            items = getattr(message, attr)
+            values[target].extend(map(convert, items) if convert else items)
+        elif kind == STEP_GROUP:
+            for element in getattr(message, attr):
+                _extract(target, element, values)
+        elif message.HasField(attr):
+            value = getattr(message, attr)
+            values[target].append(convert(value) if convert else value)
+
+
+class SchemaColumnBuilder:
+    """Accumulates parsed messages of one type into MessageColumns."""
+
+    def __init__(self, schema):
+        """
+        Initialize builder.
+
+        Args:
+            schema: MessageSchema of the message type
+        """
+        self.schema = schema
+        self.timestamps = []
+        self.uptimes = []
+        self.values = [[] for _ in range(schema.slots)]
+        ragged = schema.ragged + [
+            -j for j, (_, optional) in enumerate(schema.messages, 1) if optional
+        ]
+        self.counts = {j: [] for j in ragged}  # Values per message
+        self._totals = {j: 0 for j in ragged}
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def append(self, timestamp, message, uptime=np.nan):
+        """Add one parsed message.
+
+        Args:
+            timestamp: Storage timestamp (seconds since epoch)
+            message: Parsed protobuf message
+            uptime: ECU timestamp in seconds (NaN if not sent)
+        """
+        self.timestamps.append(timestamp)
+        self.uptimes.append(uptime)
+        values = self.values
+        self.schema.extract(message, values)
+        totals = self._totals
+        for j, counts in self.counts.items():
+            total = len(values[j])
+            counts.append(total - totals[j])
+            totals[j] = total
+
+    def build(self):
+        """Convert accumulated values to arrays of the schema dtypes.
+
+        Returns:
+            MessageColumns
+        """
+        columns = {}
+        for j, leaf in enumerate(self.schema.leaves):
+            values = self.values[j]
+            if leaf.dtype is object:
+                array = np.empty(len(values), dtype=object)
+                array[:] = values
+            else:
+                array = np.array(values, dtype=leaf.dtype)
+
+            offsets = None
+            if leaf.ragged:
+                counts = np.array(self.counts[j], dtype=np.int64)
+                if leaf.repeated or leaf.grouped or not np.all(counts == 1):
+                    offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+            columns[leaf.path] = Column(array, offsets, leaf.repeated, leaf.labels)
+
+        presence = {}
+        for j, (path, optional) in enumerate(self.schema.messages, 1):
+            offsets = None
+            if optional:
+                counts = np.array(self.counts[-j], dtype=np.int64)
+                offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+            presence[path] = Column(np.array(self.values[-j], dtype=np.bool_), offsets)
+        return MessageColumns(
+            np.array(self.timestamps, dtype=np.float64), columns,
+            self.schema.groups, presence,
+            np.array(self.uptimes, dtype=np.float64)
+        )
\ No newline at end of file
@@ -0,0 +1,333 @@
+"""Payload decoding in a separate service process.
+
+Protobuf parsing holds the GIL for the whole decode loop and a malformed
+payload can crash the interpreter, so the GUI hands decode requests to a
+long running child process. Index records and decoded columns travel as
+typed arrays in shared memory blocks, only the small layout (array
+offsets, dtypes, id tables) goes through the pipe. Index records are
+sent once, later requests only add the records appended since.
+"""
+import os
+import sys
+import weakref
+import multiprocessing
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+from dlt_index import DLTIndex, MappedDLTFile
+from dlt_codecs import DEFAULT_CODECS, PayloadDecoder
+from dlt_decode import decode_messages
+from dlt_columns import MessageColumns
+
+# Alignment of arrays in the shared memory block
+ARRAY_ALIGNMENT = 64
+
+
+class DecodeServiceError(RuntimeError):
+    """The decode process stopped while handling a request."""
+
+
+def _create_block(size):
+    """Create a shared memory block that the receiving process frees."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(create=True, size=size, track=False)
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    if os.name == "posix":
+        # The tracker knows the block by its POSIX name (leading slash)
+        resource_tracker.unregister("/" + shm.name, "shared_memory")
+    return shm
+
+
+def share_arrays(arrays):
+    """Copy arrays into one new shared memory block.
+
+    Args:
+        arrays: List of (name, array), names are any picklable keys
+
+    Returns:
+        Tuple (shared memory name, layout), layout is
+        [(name, dtype, shape, offset)]
+    """
+    layout = []
+    entries = []
+    size = 0
+    for name, array in arrays:
+        array = np.ascontiguousarray(array)
+        size = -(-size // ARRAY_ALIGNMENT) * ARRAY_ALIGNMENT
+        layout.append((name, array.dtype.str, array.shape, size))
+        entries.append((size, array))
+        size += array.nbytes
+
+    shm = _create_block(max(size, 1))
+    try:
+        for offset, array in entries:
+            shm.buf[offset:offset + array.nbytes] = array.reshape(-1).view(np.uint8)
+        return shm.name, layout
+    finally:
+        shm.close()
+
+
+def receive_arrays(shm_name, layout):
+    """Copy shared arrays into this process and free the block.
+
+    Returns:
+        Dictionary {name: array}
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        arrays = {}
+        for name, dtype, shape, offset in layout:
+            if not np.prod(shape):
+                arrays[name] = np.empty(shape, dtype=np.dtype(dtype))
+                continue
+            view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            arrays[name] = view.copy()
+            del view  # Release the buffer export before close
+        return arrays
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def share_columns(results):
+    """Copy the arrays of decoded column stores into shared memory.
+
+    Args:
+        results: Dictionary {message_name: MessageColumns}
+
+    Returns:
+        Tuple (shared memory name, layout, tables), tables are
+        [(message_name, meta, [array names])]
+    """
+    tables = []
+    arrays = []
+    for message_name, columns in results.items():
+        column_arrays, meta = columns.to_arrays()
+        tables.append((message_name, meta, list(column_arrays)))
+        arrays.extend(((message_name, name), array) for name, array in column_arrays.items())
+    return share_arrays(arrays) + (tables,)
+
+
+def receive_columns(shm_name, layout, tables):
+    """Copy shared column arrays into this process and free the block.
+
+    Returns:
+        Dictionary {message_name: MessageColumns}
+    """
+    arrays = receive_arrays(shm_name, layout)
+    return {
+        message_name: MessageColumns.from_arrays(
+            {name: arrays[(message_name, name)] for name in names}, meta
+        )
+        for message_name, meta, names in tables
+    }
+
+
+def share_index(index, first=0):
+    """Copy index records from first on into shared memory.
+
+    Returns:
+        Tuple (shared memory name, layout, meta), meta holds the id
+        tables and the end offset
+    """
+    arrays = [
+        (name, np.frombuffer(getattr(index, name), dtype=typecode)[first:])
+        for name, typecode in DLTIndex.ARRAYS
+    ]
+    meta = {
+        "first": first,
+        "ids": list(index.ids),
+        "message_names": list(index.message_names),
+        "end_offset": index.end_offset,
+    }
+    return share_arrays(arrays) + (meta,)
+
+
+def receive_index(index, shm_name, layout, meta):
+    """Add shared index records to an index holding the records before them.
+
+    Args:
+        index: DLTIndex with meta["first"] records (a new one if None)
+
+    Returns:
+        Updated DLTIndex
+    """
+    arrays = receive_arrays(shm_name, layout)
+    if index is None or meta["first"] == 0:
+        index = DLTIndex()
+    for name, _ in DLTIndex.ARRAYS:
+        getattr(index, name).frombytes(arrays[name].tobytes())
+    # Id tables only grow, codes stay valid
+    for id_str in meta["ids"][len(index.ids):]:
+        index.intern(id_str)
+    for message_name in meta["message_names"][len(index.message_names):]:
+        index.intern_message_name(message_name)
+    index.end_offset = meta["end_offset"]
+    return index
+
+
+def _serve(conn, search_paths):
+    """Handle decode requests of the GUI process until the pipe closes."""
+    sys.path[:0] = [path for path in search_paths if path not in sys.path]
+    indexes = {}  # dlt_path: DLTIndex sent by the GUI
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            return
+        if request[0] == "index":
+            _, dlt_path, shm_name, layout, meta = request
+            indexes[dlt_path] = receive_index(indexes.get(dlt_path), shm_name, layout, meta)
+            continue
+        if request[0] == "forget":
+            indexes.pop(request[1], None)
+            continue
+
+        _, dlt_path, module_name, codecs, app_id, ctx_id, message_names, record_filter = request
+        errors = []
+        try:
+            decoder = PayloadDecoder(module_name, errors.append, codecs)
+            with MappedDLTFile(dlt_path, indexes[dlt_path]) as dlt_file:
+                results = decode_messages(
+                    dlt_file, decoder, app_id, ctx_id, message_names, record_filter
+                )
+            conn.send(("result",) + share_columns(results) + (errors,))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class DecodeService:
+    """Client of the decode process, started on first use.
+
+    A request is sent with request and its result collected with reply,
+    which may block in another thread while the GUI keeps running. One
+    request is handled at a time. A crashed process is reported as
+    DecodeServiceError and replaced by a new one on the next request.
+    """
+
+    def __init__(self, search_paths=()):
+        """
+        Initialize service client.
+
+        Args:
+            search_paths: Directories with compiled protobuf modules
+        """
+        self.search_paths = list(search_paths)
+        self._process = None
+        self._conn = None
+        self._sent = {}  # dlt_path: (DLTIndex reference, records, end_offset) sent
+        self._forgotten = []  # dlt_paths to drop in the process with the next request
+
+    def start(self):
+        """Start the decode process if it is not running."""
+        if self._process is not None and self._process.is_alive():
+            return
+        self.stop()
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(
+            target=_serve, args=(child_conn, self.search_paths),
+            name="dlt-decode", daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+
+    def stop(self):
+        """Stop the decode process (no reply may be awaited)."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self._process is not None:
+            self._process.join(1)
+            if self._process.is_alive():
+                self._process.kill()
+            self._process = None
+        self._sent.clear()
+        self._forgotten.clear()
+
+    def kill(self):
+        """Kill the decode process, an awaited reply fails with DecodeServiceError."""
+        if self._process is not None and self._process.is_alive():
+            self._process.kill()
+
+    def forget(self, dlt_path):
+        """Drop the index of a DLT file in the decode process."""
+        if self._sent.pop(dlt_path, None) is not None:
+            self._forgotten.append(dlt_path)
+
+    def request(self, dlt_path, index, module_name, app_id, ctx_id,
+                message_names=None, record_filter=None, codecs=DEFAULT_CODECS):
+        """Send a request to decode message types of a context.
+
+        The process decodes like dlt_decode.decode_messages, the result
+        is collected with reply.
+
+        Args:
+            dlt_path: Path to DLT file
+            index: DLTIndex of the file, only records appended since the
+                last request are sent
+            module_name: Protobuf module name
+            app_id: Application id
+            ctx_id: Context id
+            message_names: Message types to decode (all of the context if None)
+            record_filter: RecordFilter of the loaded records
+            codecs: Payload codec specifications
+
+        Raises:
+            DecodeServiceError: If the decode process cannot be reached
+        """
+        self.start()
+        try:
+            for forgotten in self._forgotten:
+                self._conn.send(("forget", forgotten))
+            self._forgotten.clear()
+            self._send_index(dlt_path, index)
+            self._conn.send((
+                "decode", dlt_path, module_name, tuple(codecs), app_id, ctx_id,
+                message_names, record_filter
+            ))
+        except OSError as e:
+            self.stop()
+            raise DecodeServiceError(f"Decode process not reachable ({e})")
+
+    def reply(self, on_missing_type=None):
+        """Wait for the result of the request sent last.
+
+        Args:
+            on_missing_type: Callback receiving decode error messages
+
+        Returns:
+            Dictionary {message_name: MessageColumns}
+
+        Raises:
+            DecodeServiceError: If the decode process stopped, it is
+                replaced on the next request
+            RuntimeError: If decoding failed in the process
+        """
+        try:
+            reply = self._conn.recv()
+        except (EOFError, OSError):
+            self._process.join(1)
+            raise DecodeServiceError(
+                f"Decode process stopped unexpectedly (exit code {self._process.exitcode})"
+            )
+
+        if reply[0] == "error":
+            raise RuntimeError(reply[1])
+        _, shm_name, layout, tables, errors = reply
+        if on_missing_type:
+            for message in errors:
+                on_missing_type(message)
+        return receive_columns(shm_name, layout, tables)
+
+    def _send_index(self, dlt_path, index):
+        """Send the records of an index the decode process lacks."""
+        sent = self._sent.get(dlt_path)
+        if sent is None or sent[0]() is not index or sent[1] > len(index):
+            first = 0  # New, replaced or rebuilt index
+        elif sent[1:] != (len(index), index.end_offset):
+            first = sent[1]
+        else:
+            return
+        self._sent.pop(dlt_path, None)
+        self._conn.send(("index", dlt_path) + share_index(index, first))
+        self._sent[dlt_path] = (weakref.ref(index), len(index), index.end_offset)
\ No newline at end of file
@@ -0,0 +1,279 @@
+"""Out-of-core storage of decoded message columns.
+
+Decoded column stores beyond a memory budget are written to raw array
+files and replaced by memory maps of them. Memory mapped arrays are
+ordinary NumPy arrays to graphs and exports, the operating system pages
+in only the ranges that are read and drops them again under pressure.
+Object columns (text or mixed values) stay in memory. Spilled columns of
+followed files keep growing on disk.
+
+Beyond a second, larger budget for all decoded data (in memory and
+spilled), message types of files that are not in use are evicted
+altogether and decoded again from the index when needed.
+"""
+import os
+import shutil
+import hashlib
+import weakref
+import itertools
+import threading
+import numpy as np
+from dlt_columns import MessageColumns
+
+# Bytes of decoded columns kept in memory before spilling to disk
+MEMORY_BUDGET = 4 << 30
+# Bytes of decoded columns (in memory and spilled) before evicting
+DECODED_BUDGET = 16 << 30
+
+
+class SpillArray(np.memmap):
+    """Memory map of a spill file that grows on disk when appended to."""
+
+    def __array_finalize__(self, obj):
+        super().__array_finalize__(obj)
+        self.store = getattr(obj, "store", None)
+
+    def grow(self, capacity):
+        """Return a map of the same file enlarged to capacity items.
+
+        The items mapped so far are kept in place, so only the appended
+        range is written; maps of the shorter file stay valid.
+        """
+        with open(self.filename, "r+b") as f:
+            f.truncate(capacity * self.itemsize)
+        return self.store.map_file(self.filename, self.dtype, capacity)
+
+
+class SpillStore:
+    """Keeps resident decoded columns within a memory budget.
+
+    Message types are spilled and evicted least recently used first.
+    Every spill writes a new version directory, which is removed once no
+    array (of the column store or of snapshots taken from it) maps its
+    files any more.
+    """
+
+    def __init__(self, directory, budget=MEMORY_BUDGET, decoded_budget=DECODED_BUDGET):
+        """
+        Initialize spill store.
+
+        Args:
+            directory: Directory for spilled columns (session scoped)
+            budget: Resident bytes allowed before spilling
+            decoded_budget: Resident and spilled bytes allowed before
+                evicting message types of inactive files
+        """
+        self.directory = directory
+        self.budget = budget
+        self.decoded_budget = decoded_budget
+        self._used = {}  # (dlt, app, ctx, message): use counter
+        self._clock = 0
+        self._versions = itertools.count()
+        self._lock = threading.Lock()  # Arrays may be released on any thread
+        self._maps = {}  # version directory: number of live maps
+        self._garbage = []  # Version directories no longer mapped
+
+    def touch(self, key):
+        """Mark a message type (dlt, app, ctx, message) as just used."""
+        self._clock += 1
+        self._used[key] = self._clock
+
+    def _file_dir(self, dlt_path):
+        """Return spill directory of a DLT file."""
+        name = hashlib.sha1(os.path.abspath(dlt_path).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, name)
+
+    def _key_dir(self, key):
+        """Return spill directory of a message type."""
+        name = hashlib.sha1("\0".join(key[1:]).encode("utf-8")).hexdigest()
+        return os.path.join(self._file_dir(key[0]), name)
+
+    def spill(self, key, columns):
+        """Write a column store to disk and return it memory mapped.
+
+        Args:
+            key: (dlt_path, app_id, ctx_id, message_name)
+            columns: MessageColumns to spill
+
+        Returns:
+            MessageColumns backed by memory maps
+        """
+        self.collect()
+        path = os.path.join(self._key_dir(key), str(next(self._versions)))
+        os.makedirs(path)
+        arrays, meta = columns.to_arrays()
+        mapped = {}
+        for array_name, array in arrays.items():
+            # Empty arrays cannot be mapped
+            mapped[array_name] = (
+                self.map_file(os.path.join(path, array_name), array.dtype, len(array), array)
+                if len(array) else array
+            )
+        if not self._maps.get(path):
+            self._garbage.append(path)
+        return MessageColumns.from_arrays(mapped, meta)
+
+    def map_file(self, file_path, dtype, count, values=None):
+        """Map count items of a spill file.
+
+        Args:
+            file_path: Raw array file in a version directory
+            dtype: Item type
+            count: Number of items
+            values: Items to create the file from, None to map it as is
+
+        Returns:
+            SpillArray
+        """
+        array = SpillArray(
+            file_path, dtype=dtype, mode="r+" if values is None else "w+", shape=(count,)
+        )
+        array.store = self
+        if values is not None:
+            array[:] = values
+        path = os.path.dirname(file_path)
+        with self._lock:
+            self._maps[path] = self._maps.get(path, 0) + 1
+        weakref.finalize(array, self._unmapped, path)
+        return array
+
+    def _unmapped(self, path):
+        """Count a released map of a version directory."""
+        with self._lock:
+            self._maps[path] -= 1
+            if not self._maps[path]:
+                del self._maps[path]
+                self._garbage.append(path)
+
+    def collect(self):
+        """Remove version directories whose files are no longer mapped."""
+        with self._lock:
+            garbage, self._garbage = self._garbage, []
+        kept = []
+        for path in garbage:
+            shutil.rmtree(path, ignore_errors=True)
+            if os.path.exists(path):
+                kept.append(path)  # Windows closes the map after the finalizer
+                continue
+            parent = os.path.dirname(path)
+            while len(parent) > len(self.directory):  # Empty message type and file directories
+                try:
+                    os.rmdir(parent)
+                except OSError:
+                    break
+                parent = os.path.dirname(parent)
+        with self._lock:
+            self._garbage.extend(kept)
+
+    def balance(self, struct_dictionary):
+        """Spill least recently used message types until the budget holds.
+
+        Args:
+            struct_dictionary: {dlt_path: {app_id: {ctx_id: {message_name:
+                MessageColumns}}}}, spilled entries are replaced in place
+
+        Returns:
+            Number of spilled message types
+        """
+        self.collect()
+        resident = []
+        total = 0
+        for dlt_path, app_dict in struct_dictionary.items():
+            for app_id, ctx_dict in app_dict.items():
+                for ctx_id, messages in ctx_dict.items():
+                    for message_name, columns in messages.items():
+                        if columns is None:
+                            continue
+                        total += columns.resident_nbytes()
+                        nbytes = columns.resident_nbytes(objects=False)
+                        if nbytes:  # Not spilled or grown in memory since
+                            key = (dlt_path, app_id, ctx_id, message_name)
+                            resident.append((self._used.get(key, 0), key, nbytes))
+        spilled = 0
+        for _, key, nbytes in sorted(resident):
+            if total <= self.budget:
+                break
+            messages = struct_dictionary[key[0]][key[1]][key[2]]
+            messages[key[3]] = self.spill(key, messages[key[3]])
+            total -= nbytes - messages[key[3]].resident_nbytes(objects=False)
+            spilled += 1
+        return spilled
+
+    def evict(self, struct_dictionary, keep=()):
+        """Drop least recently used message types until the decoded budget holds.
+
+        Evicted entries become None placeholders again, so they are
+        decoded anew (or read from the decode cache) on their next use.
+
+        Args:
+            struct_dictionary: {dlt_path: {app_id: {ctx_id: {message_name:
+                MessageColumns}}}}, evicted entries are replaced in place
+            keep: DLT paths whose message types stay (visible, followed,
+                loading or exporting files)
+
+        Returns:
+            Number of evicted message types
+        """
+        self.collect()
+        usage = self.usage(struct_dictionary)
+        total = sum(resident + spilled for resident, spilled in usage.values())
+        if total <= self.decoded_budget:
+            return 0
+        candidates = []
+        for dlt_path, app_dict in struct_dictionary.items():
+            if dlt_path in keep:
+                continue
+            for app_id, ctx_dict in app_dict.items():
+                for ctx_id, messages in ctx_dict.items():
+                    for message_name, columns in messages.items():
+                        if columns is not None:
+                            key = (dlt_path, app_id, ctx_id, message_name)
+                            candidates.append((self._used.get(key, 0), key, columns))
+        evicted = 0
+        for _, key, columns in sorted(candidates, key=lambda item: item[0]):
+            if total <= self.decoded_budget:
+                break
+            total -= columns.resident_nbytes() + columns.mapped_nbytes()
+            struct_dictionary[key[0]][key[1]][key[2]][key[3]] = None
+            evicted += 1
+        return evicted
+
+    def usage(self, struct_dictionary):
+        """Return decoded bytes per context.
+
+        Returns:
+            Dictionary {(dlt_path, app_id, ctx_id): (resident bytes,
+            spilled bytes)}
+        """
+        usage = {}
+        for dlt_path, app_dict in struct_dictionary.items():
+            for app_id, ctx_dict in app_dict.items():
+                for ctx_id, messages in ctx_dict.items():
+                    resident = spilled = 0
+                    for columns in messages.values():
+                        if columns is None:
+                            continue
+                        resident += columns.resident_nbytes()
+                        spilled += columns.mapped_nbytes()
+                    usage[(dlt_path, app_id, ctx_id)] = (resident, spilled)
+        return usage
+
+    def resident_nbytes(self, struct_dictionary):
+        """Return resident bytes of all decoded columns."""
+        return sum(
+            columns.resident_nbytes()
+            for app_dict in struct_dictionary.values()
+            for ctx_dict in app_dict.values()
+            for messages in ctx_dict.values()
+            for columns in messages.values()
+            if columns is not None
+        )
+
+    def release(self, dlt_path):
+        """Forget a DLT file.
+
+        Its spilled columns are removed once the dropped column stores
+        (and snapshots of them) are released.
+        """
+        self._used = {key: used for key, used in self._used.items() if key[0] != dlt_path}
+        self.collect()
\ No newline at end of file
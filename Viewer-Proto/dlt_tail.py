@@ -0,0 +1,171 @@
+"""Follow DLT files that are still being written (e.g. by dlt-receive)."""
+import os
+import numpy as np
+from dlt_index import MappedDLTFile
+from dlt_codecs import PayloadDecoder
+from dlt_decode import decode_messages, scan_records, schema_keys
+
+# Points kept per live plot line
+LIVE_HISTORY = 10000
+
+
+class TailUpdate:
+    """Result of one poll of a followed file."""
+
+    def __init__(self):
+        self.records = 0  # Number of new records
+        self.new_messages = {}  # app_id: {ctx_id: {message_name: key labels}}
+        self.columns = {}  # (app_id, ctx_id, message_name): MessageColumns
+
+
+class DLTFollower:
+    """Incrementally indexes and decodes records appended to a DLT file.
+
+    Each poll maps the file at its current size and only parses records
+    after the last indexed offset. A record still being written stays
+    unindexed until it is complete.
+    """
+
+    def __init__(self, dlt_path, index, module_name, on_missing_type=None,
+                 record_filter=None):
+        """
+        Initialize follower.
+
+        Args:
+            dlt_path: Path to DLT file
+            index: DLTIndex of the loaded file, extended in place
+            module_name: Compiled protobuf module name
+            on_missing_type: Callback for unknown message type errors
+            record_filter: RecordFilter of the loaded records
+        """
+        self.dlt_path = dlt_path
+        self.index = index
+        self.decoder = PayloadDecoder(module_name, on_missing_type)
+        self.record_filter = record_filter
+        self.messages = {
+            app_id: {
+                ctx_id: dict.fromkeys(names) for ctx_id, names in ctx_dict.items()
+            }
+            for app_id, ctx_dict in index.messages.items()
+        }
+
+    def poll(self, struct_dict):
+        """Process records appended since the last poll.
+
+        Records of message types already decoded in struct_dict are
+        decoded right away, other types stay lazy.
+
+        Args:
+            struct_dict: Decoded data of the file {app_id: {ctx_id: {...}}}
+
+        Returns:
+            TailUpdate
+
+        Raises:
+            OSError: If the file shrank (rotated or truncated)
+        """
+        update = TailUpdate()
+        size = os.path.getsize(self.dlt_path)
+        if size < self.index.end_offset:
+            raise OSError(f"{os.path.basename(self.dlt_path)} was truncated")
+        if size == self.index.end_offset:
+            return update
+
+        index = self.index
+        with MappedDLTFile(self.dlt_path, index) as dlt_file:
+            first = dlt_file.index_more()
+            update.records = len(index) - first
+            update.new_messages = scan_records(
+                dlt_file, self.decoder, self.messages, first, self.record_filter
+            )
+            self._update_index_metadata(update.new_messages)
+
+            builders = {}
+            for i in range(first, len(index)):
+                message_name = index.message_name(i)
+                if message_name is None:
+                    continue
+                app_id = index.app_id(i)
+                ctx_id = index.ctx_id(i)
+                if struct_dict.get(app_id, {}).get(ctx_id, {}).get(message_name) is None:
+                    continue  # Not decoded yet, ensure_decoded will pick it up
+                try:
+                    hex_data = self.decoder.message_name(dlt_file, i)[1]
+                    message = self.decoder.decode(hex_data, message_name)
+                    if message is None:
+                        continue
+                    key = (app_id, ctx_id, message_name)
+                    if key not in builders:
+                        builders[key] = self.decoder.column_builder(message_name)
+                    builders[key].append(index.timestamps[i], message, index.uptime(i))
+                except Exception as e:
+                    print(f"[DLTFollower] Skipping record: {e}")
+                    continue
+            update.columns = {key: builder.build() for key, builder in builders.items()}
+        return update
+
+    def decode_since(self, first, app_id, ctx_id, message_names):
+        """Decode records of message types indexed from record first on.
+
+        Polls skip message types that are not decoded yet, this covers
+        the records they indexed while those types were being decoded.
+
+        Returns:
+            Dictionary {message_name: MessageColumns}
+        """
+        with MappedDLTFile(self.dlt_path, self.index) as dlt_file:
+            return decode_messages(
+                dlt_file, self.decoder, app_id, ctx_id, message_names,
+                self.record_filter, first
+            )
+
+    def _update_index_metadata(self, new_messages):
+        """Add newly seen contexts and message types to the index."""
+        for app_id, ctx_dict in new_messages.items():
+            for ctx_id, messages in ctx_dict.items():
+                names = self.index.messages.setdefault(app_id, {}).setdefault(ctx_id, [])
+                keys = self.index.keys.setdefault(app_id, {}).setdefault(ctx_id, [])
+                for message_name in messages:
+                    names.append(message_name)
+                    keys.extend(schema_keys(self.decoder, [message_name]))
+
+
+class RingBuffer:
+    """Fixed capacity history of parallel arrays with contiguous zero-copy views.
+
+    Every point is stored twice, capacity apart, so the latest capacity
+    points are always one contiguous slice of the storage.
+    """
+
+    def __init__(self, capacity=LIVE_HISTORY, arrays=2):
+        self.capacity = capacity
+        self._data = [np.empty(2 * capacity, dtype=np.float64) for _ in range(arrays)]
+        self._end = 0  # Position after the newest point (in first half)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def extend(self, *arrays):
+        """Append points, dropping the oldest beyond capacity.
+
+        Args:
+            arrays: Values of each array (e.g. x and y) of same length
+        """
+        if len(arrays[0]) > self.capacity:
+            arrays = [values[-self.capacity:] for values in arrays]
+        count = len(arrays[0])
+        capacity = self.capacity
+        first = min(count, capacity - self._end)
+        for data, values in zip(self._data, arrays):
+            data[self._end:self._end + first] = values[:first]
+            data[self._end + capacity:self._end + capacity + first] = values[:first]
+            data[:count - first] = values[first:]
+            data[capacity:capacity + count - first] = values[first:]
+        self._end = (self._end + count) % capacity
+        self._size = min(self._size + count, capacity)
+
+    def view(self):
+        """Return views of the stored points of each array, oldest first."""
+        end = self._end if self._end >= self._size else self._end + self.capacity
+        return tuple(data[end - self._size:end] for data in self._data)
\ No newline at end of file
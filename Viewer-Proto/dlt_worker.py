@@ -1,173 +1,307 @@
 """Background worker for processing DLT files."""
-import os
-import csv
 import sys
-import binascii
+import time
+import asyncio
 import importlib
-from utils import APP_TEMP_DIR, run_command
-from google.protobuf.json_format import MessageToDict
-from google.protobuf import symbol_database
+from typing import NamedTuple
+from utils import APP_TEMP_DIR
+from dlt_index import load_index, save_index
+from dlt_decode import decode_dlt_file, scan_dlt_file, deferred_struct_dict
+from dlt_client import DLTClient
+from dlt_export import export_file
+from dlt_cache import decode_key
 from PyQt6.QtCore import QThread, pyqtSignal
 
+# Minimum time between progress/partial signals (about one UI frame)
+EMIT_INTERVAL = 1 / 30
+
+
+class LoadProgress(NamedTuple):
+    """Progress of a DLT file load."""
+    records: int  # Records indexed so far
+    bytes_done: int
+    total_bytes: int
+    rate: float  # Bytes per second
+    eta: float  # Estimated seconds remaining
+
 
 class DLTWorker(QThread):
     """Worker thread for converting DLT files to structured data."""
-    finished = pyqtSignal(str, dict)  # (dltpath, parsed_data)
+    finished = pyqtSignal(str, dict, object)  # (dltpath, parsed_data, index)
+    partial = pyqtSignal(str, dict)  # (dltpath, {app_id: {ctx_id: {message_name: key labels}}})
+    progress = pyqtSignal(str, object)  # (dltpath, LoadProgress)
+    cancelled = pyqtSignal(str)  # dltpath
+    failed = pyqtSignal(str)  # dltpath, load stopped after an error
     error = pyqtSignal(str)  # error_message
 
-    def __init__(self, dlt_path, module_name):
+    def __init__(self, dlt_path, module_name, lazy=True, record_filter=None, cache=None):
         """
         Initialize DLT worker.
         
         Args:
             dlt_path: Path to DLT file
             module_name: Protobuf module name
+            lazy: Only index message types, payloads are decoded per
+                message type when first needed
+            record_filter: RecordFilter, rejected records are skipped
+                after their header
+            cache: DecodeCache reused for and filled by decoded payloads
         """
         super().__init__()
         self.dlt_path = dlt_path
         self.module_name = module_name
-        self.reported_missing_types = set()
+        self.lazy = lazy
+        self.record_filter = record_filter
+        self.cache = cache
+        self._started = 0.0
+        self._last_emit = 0.0
+        self._pending = {}  # Message types not yet sent as partial batch
 
-    def create_message_by_type(self, type_name: str):
-        """Create protobuf message instance by type name.
-        
-        Args:
-            type_name: Protobuf message type name
-            
-        Returns:
-            Protobuf message instance or None
-        """
-        if '.' not in type_name:
-            type_name = "logger." + type_name
+    def cancel(self):
+        """Request the worker to stop at the next window boundary."""
+        self.requestInterruption()
+
+    def run(self):
+        """Main processing logic executed in worker thread."""
         try:
-            sym_db = symbol_database.Default()
-            message_class = sym_db.GetSymbol(type_name)
-            return message_class()
-        except KeyError:
-            if type_name not in self.reported_missing_types:
-                self.reported_missing_types.add(type_name)
-                display_name = type_name.replace("logger.", "")
-                self.error.emit(
-                    f"Message type \"{display_name}\" not found.\n"
-                    "Please check if correct \".proto\" file is uploaded"
+            # Ensure temp directory is in Python path
+            if APP_TEMP_DIR not in sys.path:
+                sys.path.insert(0, APP_TEMP_DIR)
+            
+            # Import protobuf module
+            importlib.import_module(self.module_name)
+
+            # Only full decodes use the cache here, hashing a large file
+            # would delay reopening it from its stored index
+            cache_key = None if self.lazy else self._cache_key()
+
+            # Reuse stored index, payloads are decoded when plotted
+            index = load_index(self.dlt_path)
+            if index is not None:
+                struct_dict = deferred_struct_dict(index, self.record_filter)
+                if not self.lazy and cache_key:
+                    for app_id, ctx_dict in struct_dict.items():
+                        for ctx_id, messages in ctx_dict.items():
+                            messages.update(self.cache.load_messages(
+                                cache_key, app_id, ctx_id, list(messages)
+                            ))
+                self.finished.emit(self.dlt_path, struct_dict, index)
+                return
+
+            self._started = time.monotonic()
+            if self.lazy:
+                # Record message types only
+                index = scan_dlt_file(
+                    self.dlt_path, self.module_name, self.error.emit,
+                    self._on_progress, self.isInterruptionRequested,
+                    record_filter=self.record_filter
                 )
+                if index is None:
+                    self.cancelled.emit(self.dlt_path)
+                    return
+                if not self.record_filter:
+                    save_index(index, self.dlt_path)  # Only complete indexes
+                self.finished.emit(self.dlt_path, deferred_struct_dict(index), index)
+                return
+
+            # Decode all payloads (across processes for large files)
+            result = decode_dlt_file(
+                self.dlt_path, self.module_name, self.error.emit,
+                search_paths=[APP_TEMP_DIR],
+                should_stop=self.isInterruptionRequested,
+                record_filter=self.record_filter
+            )
+            if result is None:
+                self.cancelled.emit(self.dlt_path)
+                return
+            struct_dict, index = result
+            if not self.record_filter:
+                save_index(index, self.dlt_path)
+            if cache_key:
+                self.cache.store_struct_dict(cache_key, struct_dict)
+
+            self.finished.emit(self.dlt_path, struct_dict, index)
+
+        except Exception as e:
+            self.error.emit(f"DLT processing failed: {str(e)}")
+            self.failed.emit(self.dlt_path)
+
+    def _cache_key(self):
+        """Return decode cache key of the file or None without cache."""
+        if self.cache is None:
             return None
+        try:
+            return decode_key(
+                self.dlt_path, self.module_name, record_filter=self.record_filter
+            )
+        except OSError:
+            return None
+
+    def _on_progress(self, records, bytes_done, total_bytes, new_messages):
+        """Collect scan results and emit them at most once per frame."""
+        for app_id, ctx_dict in new_messages.items():
+            for ctx_id, messages in ctx_dict.items():
+                self._pending.setdefault(app_id, {}).setdefault(ctx_id, {}).update(messages)
+
+        now = time.monotonic()
+        if now - self._last_emit < EMIT_INTERVAL and bytes_done < total_bytes:
+            return
+        self._last_emit = now
+
+        if self._pending:
+            self.partial.emit(self.dlt_path, self._pending)
+            self._pending = {}
+
+        elapsed = max(now - self._started, 1e-6)
+        rate = bytes_done / elapsed
+        eta = (total_bytes - bytes_done) / rate if rate else 0.0
+        self.progress.emit(
+            self.dlt_path,
+            LoadProgress(records, bytes_done, total_bytes, rate, eta)
+        )
 
-    @staticmethod
-    def parse_dlt_line(line):
-        """Parse DLT log line into components.
+
+class DLTClientWorker(QThread):
+    """Worker thread receiving messages of a DLT daemon into a capture file."""
+    status = pyqtSignal(str, str)  # (dltpath, status_message)
+    error = pyqtSignal(str)  # error_message
+
+    def __init__(self, dlt_path, host, port):
+        """
+        Initialize client worker.
         
         Args:
-            line: Raw log line
-            
-        Returns:
-            Parsed components dictionary or None
+            dlt_path: Capture file the received records are appended to
+            host: Daemon host name or address
+            port: Daemon TCP port
         """
-        if isinstance(line, list) and all(isinstance(item, str) for item in line):
-            line = ' '.join(line)
+        super().__init__()
+        self.dlt_path = dlt_path
+        self.client = DLTClient(
+            host, dlt_path, port,
+            on_status=lambda message: self.status.emit(self.dlt_path, message)
+        )
 
-        if not isinstance(line, str):
-            return None
+    def stop(self):
+        """Disconnect and let the event loop finish."""
+        self.client.stop()
+
+    def run(self):
+        """Run the asyncio client until stopped."""
+        try:
+            asyncio.run(self.client.run())
+        except Exception as e:
+            self.error.emit(f"DLT client failed: {str(e)}")
 
-        parts = line.split()
-        if len(parts) < 14:
-            return None
 
-        app_id = parts[5]
-        ctx_id = parts[6]
-        payload = ' '.join(parts[13:])
-        return {
-            'APPID': app_id,
-            'CNTXID': ctx_id,
-            'Payload': payload
+class DLTExportWorker(QThread):
+    """Worker thread exporting decoded data of a DLT file."""
+    progress = pyqtSignal(str, int, int)  # (dltpath, messages_done, messages_total)
+    finished = pyqtSignal(str, str)  # (dltpath, output_path)
+    cancelled = pyqtSignal(str)  # dltpath
+    error = pyqtSignal(str)  # error_message
+
+    def __init__(self, dlt_path, struct_dict, output_path, export_format=None):
+        """
+        Initialize export worker.
+        
+        Args:
+            dlt_path: Path to the exported DLT file
+            struct_dict: Decoded data, column stores are snapshotted so a
+                followed file can keep growing meanwhile
+            output_path: Export file (directory for parquet and arrow)
+            export_format: Key of dlt_export.EXPORT_FORMATS (defaults to
+                the extension of output_path)
+        """
+        super().__init__()
+        self.dlt_path = dlt_path
+        self.struct_dict = {
+            app_id: {
+                ctx_id: {
+                    name: columns.snapshot() for name, columns in messages.items()
+                    if columns is not None
+                }
+                for ctx_id, messages in ctx_dict.items()
+            }
+            for app_id, ctx_dict in struct_dict.items()
         }
+        self.output_path = output_path
+        self.export_format = export_format
+        self._last_emit = 0.0
+
+    def cancel(self):
+        """Request the worker to stop, the partial output is removed."""
+        self.requestInterruption()
 
     def run(self):
-        """Main processing logic executed in worker thread."""
+        """Write the export in the worker thread."""
         try:
-            # Ensure temp directory is in Python path
-            if APP_TEMP_DIR not in sys.path:
-                sys.path.insert(0, APP_TEMP_DIR)
-            
-            # Import protobuf module
-            importlib.import_module(self.module_name)
-            struct_dict = {}
-            
-            # Prepare CSV path
-            csv_name = os.path.basename(self.dlt_path)[:-4] + '.csv'
-            csv_path = f'{APP_TEMP_DIR}/{csv_name}'
-            
-            # Convert DLT to CSV
-            result = run_command(['dlt-viewer', '-v', '-s', '-csv', '-c', self.dlt_path, csv_path])
-            if result.returncode != 0:
-                self.error.emit("Failed to convert DLT to CSV")
-                return
+            completed = export_file(
+                self.struct_dict, self.output_path, self.export_format,
+                self._on_progress, self.isInterruptionRequested
+            )
+            if completed:
+                self.finished.emit(self.dlt_path, self.output_path)
+            else:
+                self.cancelled.emit(self.dlt_path)
+        except Exception as e:
+            self.error.emit(f"Export failed: {str(e)}")
+
+    def _on_progress(self, done, total):
+        """Emit progress at most once per frame."""
+        now = time.monotonic()
+        if now - self._last_emit < EMIT_INTERVAL and done < total:
+            return
+        self._last_emit = now
+        self.progress.emit(self.dlt_path, done, total)
+
+
+class DecodeRequest:
+    """Message types of one DLT file waiting for the decode process."""
+
+    def __init__(self, dlt_path, index, jobs, cache_key=None, on_done=None):
+        """
+        Initialize decode request.
+        
+        Args:
+            dlt_path: Path to DLT file
+            index: DLTIndex the message types are decoded from
+            jobs: List of (app_id, ctx_id, [message names]), one service
+                request each
+            cache_key: Decode cache key storing the results (None to skip)
+            on_done: Called without arguments once all jobs are merged
+        """
+        self.dlt_path = dlt_path
+        self.index = index
+        self.jobs = list(jobs)
+        self.cache_key = cache_key
+        self.on_done = on_done
+        self.records = 0  # Records indexed when the current job was sent
 
-            # Process CSV file
-            with open(csv_path, newline='', encoding='utf-8') as file:
-                # Detect CSV dialect
-                sample = file.read(1024)
-                file.seek(0)
-                try:
-                    dialect = csv.Sniffer().sniff(sample)
-                except csv.Error:
-                    dialect = csv.get_dialect('excel')
-                
-                reader = csv.reader(file, dialect)
-                for row in reader:
-                    try:
-                        parsed = self.parse_dlt_line(row)
-                        if not parsed:
-                            continue
-                            
-                        payload = parsed['Payload']
-                        app_id = parsed['APPID']
-                        ctx_id = parsed['CNTXID']
-                        
-                        # Initialize data structure
-                        if app_id not in struct_dict:
-                            struct_dict[app_id] = {}
-                        if ctx_id not in struct_dict[app_id]:
-                            struct_dict[app_id][ctx_id] = {}
-                        
-                        # Process protobuf payload
-                        if payload.startswith("$%.&") and "&*.%" in payload:
-                            remainder = payload[4:]
-                            sep_index = remainder.find("&*.%")
-                            message_name = remainder[:sep_index]
-                            decoded_payload = remainder[sep_index + len("&*.%"):]
-                            
-                            # Initialize message list
-                            if message_name not in struct_dict[app_id][ctx_id]:
-                                struct_dict[app_id][ctx_id][message_name] = []
-                            
-                            # Decode binary data
-                            binary_data = binascii.unhexlify(decoded_payload)
-                            decoded_struct = self.create_message_by_type(message_name)
-                            if not decoded_struct:
-                                continue
-                            
-                            # Parse protobuf and convert to dict
-                            decoded_struct.ParseFromString(binary_data)
-                            json_obj = MessageToDict(
-                                decoded_struct, 
-                                including_default_value_fields=True
-                            )
-                            
-                            # Store parsed data
-                            struct_dict[app_id][ctx_id][message_name].append({
-                                "timestamp": row[2],
-                                **json_obj
-                            })
-                    except Exception as e:
-                        print(f"[DLTWorker] Skipping row: {e}")
-                        continue
-
-            # Clean up temporary file
-            if os.path.exists(csv_path):
-                os.remove(csv_path)
-
-            self.finished.emit(self.dlt_path, struct_dict)
 
+class DecodeReplyWorker(QThread):
+    """Worker thread waiting for the reply of the decode process."""
+    finished = pyqtSignal(object, list)  # ({message_name: MessageColumns}, error_messages)
+    error = pyqtSignal(str)  # error_message
+
+    def __init__(self, service, request):
+        """
+        Initialize reply worker.
+        
+        Args:
+            service: DecodeService a request was sent to
+            request: DecodeRequest of the sent job
+        """
+        super().__init__()
+        self.service = service
+        self.request = request
+
+    def run(self):
+        """Block on the decode process pipe in the worker thread."""
+        errors = []
+        try:
+            results = self.service.reply(errors.append)
         except Exception as e:
-            self.error.emit(f"DLT processing failed: {str(e)}")
\ No newline at end of file
+            self.error.emit(str(e))
+            return
+        self.finished.emit(results, errors)
\ No newline at end of file
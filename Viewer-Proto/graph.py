@@ -1,36 +1,207 @@
 """Graph creation and management utilities."""
 import numpy as np
-from datetime import datetime
 import pyqtgraph as pg
-from pyqtgraph import PlotWidget, DateAxisItem
+from pyqtgraph import PlotWidget, DateAxisItem, AxisItem
 from animate import PlotAnimator
 from PyQt6.QtWidgets import (
-    QMessageBox, QInputDialog, QStyle, QToolButton, QHBoxLayout, QWidget,
-    QVBoxLayout, QListWidgetItem, QLabel, QSlider
+    QMessageBox, QInputDialog, QStyle, QHBoxLayout, QWidget,
+    QVBoxLayout, QListWidgetItem
 )
-from PyQt6.QtCore import Qt
 from utils import prompt_graph_name
-from dateutil.parser import parse as parse_dt
+from logic import ensure_decoded
+from dlt_columns import MessageColumns, AXIS_WALL_CLOCK, AXIS_UPTIME
+from dlt_reader import format_timestamp
+from dlt_tail import RingBuffer
+from lod import LODPyramid
 
+# Axis labels of the selectable x axes
+X_AXIS_LABELS = {
+    AXIS_WALL_CLOCK: "Wall clock",
+    AXIS_UPTIME: "ECU uptime (s)",
+}
 
-def try_parse_value(value):
-    """Attempt to parse value into float or timestamp.
+# Drawn points per horizontal pixel (first/min/max/last of each pixel)
+LOD_POINTS_PER_PIXEL = 4
+# Plot width assumed before the plot is laid out
+DEFAULT_VIEW_WIDTH = 1000
+# Point markers are hidden when points are closer than this (pixels)
+SYMBOL_SPACING_PX = 4
+# Positions of the playback seek slider across all plotted data
+SEEK_STEPS = 1000
+
+
+def point_symbol(points, width):
+    """Return marker symbol for a line, None when points are dense."""
+    return 'o' if points * SYMBOL_SPACING_PX <= width else None
+
+
+class LODLine:
+    """Keeps a plot line at the pyramid level of the visible x range.
+    
+    Each pan or zoom takes a slice of one precomputed level, so redraw
+    cost depends on the plot width, not on the series length.
+    """
+    
+    def __init__(self, plot_widget, line, pyramid):
+        """
+        Attach pyramid to a plot line.
+        
+        Args:
+            plot_widget: PlotWidget showing the line
+            line: PlotDataItem to update
+            pyramid: LODPyramid of the full series
+        """
+        self.view_box = plot_widget.getViewBox()
+        self.line = line
+        self.pyramid = pyramid
+        self.view_box.sigXRangeChanged.connect(self.refresh)
+        
+    def refresh(self, *_):
+        """Redraw the line for the current x range."""
+        x_min, x_max = self.view_box.viewRange()[0]
+        width = max(int(self.view_box.width()), 1)
+        x_values, y_values = self.pyramid.points(
+            x_min, x_max, LOD_POINTS_PER_PIXEL * width
+        )
+        self.line.setData(x=x_values, y=y_values)
+        symbol = point_symbol(len(x_values), width)
+        if self.line.opts['symbol'] != symbol:
+            self.line.setSymbol(symbol)
+            
+    def detach(self):
+        """Stop following the x range (the line gets other data)."""
+        self.view_box.sigXRangeChanged.disconnect(self.refresh)
+
+
+class LiveSeries:
+    """Plot line that keeps receiving points while its file is followed.
+    
+    The line switches to a bounded ring buffer history when the first
+    live points arrive, so each update costs the same regardless of how
+    long the file has been followed.
+    """
+    
+    def __init__(self, graph_key, line, animator, path, x_values, y_values,
+                 axis=AXIS_WALL_CLOCK, lod_line=None, times=None):
+        """
+        Initialize live series.
+        
+        Args:
+            graph_key: (dlt, app, ctx, graph_name) of the plot
+            line: PlotDataItem showing the series
+            animator: PlotAnimator of the series
+            path: Leaf field path inside the message
+            x_values: Points plotted so far (seed of the history)
+            y_values: Points plotted so far
+            axis: X axis of the plot (AXIS_WALL_CLOCK or AXIS_UPTIME)
+            lod_line: LODLine drawing the line until live points arrive
+            times: Wall clock times of the points if axis is not wall clock
+        """
+        self.graph_key = graph_key
+        self.line = line
+        self.animator = animator
+        self.path = path
+        self.axis = axis
+        self.lod_line = lod_line
+        self.history = None
+        self._seed = (x_values, y_values) if times is None else (x_values, y_values, times)
+
+    def append(self, columns):
+        """Append points of newly decoded messages.
+        
+        Args:
+            columns: MessageColumns holding only the new messages
+        """
+        if self.path not in columns.columns:
+            return
+        series = columns.series(self.path, self.axis, times=self.axis != AXIS_WALL_CLOCK)
+        if not len(series[0]):
+            return
+        if self.history is None:
+            self.history = RingBuffer(arrays=len(series))
+            self.history.extend(*self._seed)
+            self._seed = None
+            if self.lod_line is not None:
+                self.lod_line.detach()
+                self.lod_line = None
+        self.history.extend(*series)
+        x_view, y_view, *times_view = self.history.view()
+        self.line.setData(x=x_view, y=y_view)
+        self.animator.set_data(
+            x_view.copy(), y_view.copy(),
+            times=times_view[0].copy() if times_view else None
+        )
+        
+    def release(self):
+        """Drop the plotted history and stop following the x range."""
+        if self.lod_line is not None:
+            self.lod_line.detach()
+            self.lod_line = None
+        self.history = None
+        self._seed = None
+
+
+def update_live_graphs(self, key, columns):
+    """Feed newly decoded messages to the graphs plotting them.
+    
+    Args:
+        key: (dltpath, app_id, ctx_id, message_name)
+        columns: MessageColumns holding only the new messages
+    """
+    for series in self.live_series.get(key, []):
+        series.append(columns)
+
+
+def seek_playback(self, position):
+    """Move the playback cursor to a position of the seek slider.
+    
+    Args:
+        position: Slider value, 0 to SEEK_STEPS across all plotted data
+    """
+    time_range = self.playback.time_range()
+    if time_range is None:
+        return
+    first, last = time_range
+    self.playback.seek(first + (last - first) * position / SEEK_STEPS)
+
+
+def show_playback_cursor(self, cursor):
+    """Show the playback cursor on the seek slider and its label.
     
     Args:
-        value: Input value to parse
+        cursor: Wall clock data time (seconds since epoch)
+    """
+    time_range = self.playback.time_range()
+    position = 0
+    if time_range and time_range[1] > time_range[0]:
+        first, last = time_range
+        position = min(max(round((cursor - first) / (last - first) * SEEK_STEPS), 0), SEEK_STEPS)
+    self.seekSlider.blockSignals(True)
+    self.seekSlider.setValue(position)
+    self.seekSlider.blockSignals(False)
+    self.playbackLabel.setText(format_timestamp(cursor) if time_range else "")
+
+
+def prompt_x_axis(self, columns):
+    """Ask for the x axis of a new graph.
+    
+    ECU uptime is only offered if the messages carry ECU timestamps.
+    
+    Args:
+        columns: MessageColumns of the plotted message type
         
     Returns:
-        Parsed numeric value or None
+        AXIS_WALL_CLOCK, AXIS_UPTIME or None if cancelled
     """
-    try:
-        return float(value)
-    except (ValueError, TypeError):
-        try:
-            dt = datetime.strptime(value, "%H:%M:%S.%f")
-            dummy_date = datetime(1970, 1, 1, dt.hour, dt.minute, dt.second, dt.microsecond)
-            return dummy_date.timestamp()
-        except Exception:
-            return None
+    if not columns.has_uptimes():
+        return AXIS_WALL_CLOCK
+    label, ok = QInputDialog.getItem(
+        self, "X Axis", "Plot against:",
+        list(X_AXIS_LABELS.values()), editable=False
+    )
+    if not ok:
+        return None
+    return next(axis for axis, text in X_AXIS_LABELS.items() if text == label)
 
 
 def add_graph(self, identifiers, container, selected_key):
@@ -44,67 +215,49 @@ def add_graph(self, identifiers, container, selected_key):
     dltpath, app_id, ctx_id = identifiers
 
     try:
-        # Extract data based on selected key
+        # Decode the message type on first use, the graph is created
+        # once its columns arrived
+        ensure_decoded(
+            self, dltpath, app_id, ctx_id, selected_key.split(" > ")[0],
+            lambda: create_graph(self, identifiers, container, selected_key)
+        )
+    except Exception as e:
+        QMessageBox.critical(self, "Graph Error", f"Failed to add graph:\n{e}")
+
+
+def create_graph(self, identifiers, container, selected_key):
+    """Prompt for the plotted field and mode and add the graph.
+    
+    Args:
+        identifiers: (dltpath, app_id, ctx_id)
+        container: List widget container
+        selected_key: Data key to visualize, its message type is decoded
+    """
+    dltpath, app_id, ctx_id = identifiers
+
+    try:
+        # Resolve message columns of the selected key
         keys = selected_key.split(" > ")
         base = self.struct_dictionary[dltpath][app_id][ctx_id]
 
         # Validate root key
         root_key = keys[0]
-        if root_key not in base or not isinstance(base[root_key], list):
+        columns = base.get(root_key)
+        if not isinstance(columns, MessageColumns):
             raise ValueError(f'No data found for "{root_key}"')
-        root_list = [item for item in base[root_key] if isinstance(item, dict)]
-        if not root_list:
+        if not len(columns):
             raise ValueError(f'No entries under "{root_key}"')
 
-        # Traverse nested structure
-        pairs = [(item, item) for item in root_list]
-        for key in keys[1:]:
-            new_pairs = []
-            for root_item, curr in pairs:
-                # Handle dictionaries
-                if isinstance(curr, dict) and key in curr:
-                    val = curr[key]
-                    if isinstance(val, dict):
-                        new_pairs.append((root_item, val))
-                    elif isinstance(val, list):
-                        for elem in val:
-                            if isinstance(elem, dict):
-                                new_pairs.append((root_item, elem))
-                # Handle lists
-                elif isinstance(curr, list):
-                    for elem in curr:
-                        if isinstance(elem, dict) and key in elem:
-                            val = elem[key]
-                            if isinstance(val, dict):
-                                new_pairs.append((root_item, val))
-                            elif isinstance(val, list):
-                                for sub in val:
-                                    if isinstance(sub, dict):
-                                        new_pairs.append((root_item, sub))
-            pairs = new_pairs
-
-        if not pairs:
-            raise ValueError(f'No data at "{selected_key}"')
-
-        inner_data_list = [root_item for root_item, _ in pairs]
-        first_leaf = pairs[0][1]
-
         # Find plottable fields
-        def is_number_list(x):
-            return isinstance(x, list) and all(isinstance(e, (int, float, str)) for e in x)
-
-        available_fields = []
-        for k, v in first_leaf.items():
-            if k == "timestamp" or k.startswith('@'):
-                continue
-            if isinstance(v, (int, float, str)) or is_number_list(v):
-                available_fields.append(k)
-
+        prefix = tuple(keys[1:])
+        available_fields = [
+            field for field in columns.fields(prefix)
+            if not field.startswith('@')
+        ]
         if not available_fields:
             raise ValueError(f'No plottable fields in "{selected_key}"')
 
         # Prompt for Y-axis field
-        x_field = "timestamp"
         y_field, ok_y = QInputDialog.getItem(
             self,
             "Select Data",
@@ -115,46 +268,10 @@ def add_graph(self, identifiers, container, selected_key):
         if not ok_y:
             return
 
-        # Extract data points
-        x_values, y_values = [], []
-        for root_item, leaf_item in pairs:
-            raw_x = root_item.get(x_field)
-            if raw_x is None:
-                continue
-
-            # Parse X value
-            try:
-                if isinstance(raw_x, str):
-                    dt = parse_dt(raw_x)
-                    x_val = dt.timestamp()
-                else:
-                    x_val = try_parse_value(raw_x)
-            except Exception:
-                continue
-            if x_val is None:
-                continue
-
-            raw_y = leaf_item.get(y_field)
-            if raw_y is None:
-                continue
-
-            # Handle single values and lists
-            def append_point(xv, y_elem):
-                try:
-                    yv = try_parse_value(y_elem)
-                except Exception:
-                    return
-                if yv is not None:
-                    x_values.append(xv)
-                    y_values.append(yv)
-
-            if isinstance(raw_y, list):
-                for elem in raw_y:
-                    append_point(x_val, elem)
-            else:
-                append_point(x_val, raw_y)
-
-        if not x_values or not y_values:
+        # Extract data points straight from the typed columns
+        field_path = prefix + (y_field,)
+        x_values, y_values = columns.series(field_path)
+        if not len(x_values) or not len(y_values):
             raise ValueError("No valid numeric data extracted")
 
         # Prompt for graph mode
@@ -167,20 +284,59 @@ def add_graph(self, identifiers, container, selected_key):
         )
         if not ok_mode:
             return
+            
+        if graph_mode == "New Graph":
+            x_axis = prompt_x_axis(self, columns)
+            if x_axis is None:
+                return
+        else:
+            existing_graphs = [
+                key for key in self.graph_canvas_mapping.keys() 
+                if key[0] == dltpath
+            ]
+            if not existing_graphs:
+                QMessageBox.information(
+                    self, "No Graphs", 
+                    "No existing graphs found. Creating new graph"
+                )
+                # Recursively create new graph
+                return create_graph(self, identifiers, container, selected_key)
+                
+            # Select existing graph
+            existing_names = [key[3] for key in existing_graphs]
+            selected_name, ok_sel = QInputDialog.getItem(
+                self, "Select Graph", "Choose graph:", existing_names, editable=False
+            )
+            if not ok_sel:
+                return
+                
+            # Find selected graph
+            target_key = next(
+                (k for k in existing_graphs if k[3] == selected_name), None
+            )
+            if not target_key:
+                raise ValueError("Selected graph not found")
+            x_axis = self.graph_axes.get(target_key, AXIS_WALL_CLOCK)
+            
+        # Vectorized x values of the chosen axis, the playback cursor maps
+        # to it through the wall clock times of the points
+        times = None
+        if x_axis != AXIS_WALL_CLOCK:
+            x_values, y_values, times = columns.series(field_path, x_axis, times=True)
+            if not len(x_values):
+                raise ValueError(f'No ECU timestamps in "{selected_key}"')
         
-        # Downsample large datasets
-        x_arr = np.array(x_values)
-        y_arr = np.array(y_values)
-        max_points = 10000
-        if len(x_arr) > max_points:
-            idx = np.linspace(0, len(x_arr) - 1, max_points).astype(int)
-            x_arr, y_arr = x_arr[idx], y_arr[idx]
+        # Min/max pyramid keeps every peak at any zoom level
+        pyramid = LODPyramid(x_values, y_values)
+        x_arr, y_arr = pyramid.points(
+            -np.inf, np.inf, LOD_POINTS_PER_PIXEL * DEFAULT_VIEW_WIDTH
+        )
 
         # Create plot item
         line = pg.PlotDataItem(
             x=x_arr, y=y_arr,
             pen=pg.mkPen(color='g', width=1),
-            symbol='o', symbolSize=3,
+            symbol=point_symbol(len(x_arr), DEFAULT_VIEW_WIDTH), symbolSize=3,
             symbolPen=None,
             symbolBrush=pg.mkBrush(0, 0, 0, 255),
             name=y_field
@@ -203,16 +359,16 @@ def add_graph(self, identifiers, container, selected_key):
                     continue
                 break
 
-            # Create plot widget
-            if isinstance(inner_data_list[0].get(x_field), str):
+            # Create plot widget, wall clock x values are epoch seconds
+            if x_axis == AXIS_WALL_CLOCK:
                 axis = DateAxisItem(orientation='bottom')
-                plot_widget = PlotWidget(axisItems={'bottom': axis})
             else:
-                plot_widget = PlotWidget()
+                axis = AxisItem(orientation='bottom')
+            plot_widget = PlotWidget(axisItems={'bottom': axis})
                 
             plot_widget.addLegend()
             plot_widget.addItem(line)
-            plot_widget.setLabel('bottom', x_field)
+            plot_widget.setLabel('bottom', X_AXIS_LABELS[x_axis])
             plot_widget.setLabel('left', "Data")
             plot_widget.setTitle(graph_name)
             plot_widget.showGrid(x=True, y=True)
@@ -222,40 +378,21 @@ def add_graph(self, identifiers, container, selected_key):
             
             # Store references
             self.graph_canvas_mapping[key] = plot_widget
+            self.graph_axes[key] = x_axis
             if not hasattr(self, 'animators'):
                 self.animators = {}
             self.animators[key] = []
             
-            # Create animator
-            animator = PlotAnimator(plot_widget, x_values, y_values)
-            self.animators[key].append(animator)
-            
-            # Create control buttons
-            btn_play = self._create_tool_button(
-                QStyle.StandardPixmap.SP_MediaPlay,
-                "Play Graph",
-                lambda: [a.play() for a in self.animators[key]]
+            # Create animator, replayed by the playback bar
+            animator = PlotAnimator(
+                plot_widget, x_values, y_values, pyramid, self.playback, times
             )
-            btn_pause = self._create_tool_button(
-                QStyle.StandardPixmap.SP_MediaPause,
-                "Pause Graph",
-                lambda: [a.pause() for a in self.animators[key]]
-            )
-            btn_reset = self._create_tool_button(
-                QStyle.StandardPixmap.SP_BrowserReload,
-                "Reset Graph",
-                lambda: [a.reset() for a in self.animators[key]]
-            )
-            
-            # Create speed slider
-            lbl_speed = QLabel("Speed:")
-            slider = QSlider(Qt.Orientation.Horizontal)
-            slider.setRange(10, 200)
-            slider.setValue(animator.speed)
-            slider.setTickPosition(QSlider.TickPosition.TicksBelow)
-            slider.setTickInterval(10)
-            slider.valueChanged.connect(
-                lambda val: [a.set_speed(val) for a in self.animators[key]]
+            self.animators[key].append(animator)
+            self.live_series.setdefault((dltpath, app_id, ctx_id, root_key), []).append(
+                LiveSeries(
+                    key, line, animator, field_path, x_values, y_values, x_axis,
+                    LODLine(plot_widget, line, pyramid), times
+                )
             )
             
             # Create delete button
@@ -272,11 +409,6 @@ def add_graph(self, identifiers, container, selected_key):
             header = QHBoxLayout(header_widget)
             header.setContentsMargins(15, 0, 15, 0)
             header.addStretch()
-            header.addWidget(btn_play)
-            header.addWidget(btn_pause)
-            header.addWidget(btn_reset)
-            header.addWidget(lbl_speed)
-            header.addWidget(slider)
             header.addWidget(delete_btn)
             
             # Create container widget
@@ -293,35 +425,7 @@ def add_graph(self, identifiers, container, selected_key):
             container.setItemWidget(item, item_widget)
             
         else:  # Add to existing graph
-            existing_graphs = [
-                key for key in self.graph_canvas_mapping.keys() 
-                if key[0] == dltpath
-            ]
-            if not existing_graphs:
-                QMessageBox.information(
-                    self, "No Graphs", 
-                    "No existing graphs found. Creating new graph"
-                )
-                # Recursively create new graph
-                return add_graph(self, identifiers, container, selected_key)
-                
-            # Select existing graph
-            existing_names = [key[3] for key in existing_graphs]
-            selected_name, ok_sel = QInputDialog.getItem(
-                self, "Select Graph", "Choose graph:", existing_names, editable=False
-            )
-            if not ok_sel:
-                return
-                
-            # Find selected graph
-            selected_key = next(
-                (k for k in existing_graphs if k[3] == selected_name), None
-            )
-            if not selected_key:
-                raise ValueError("Selected graph not found")
-                
-            # Add to existing plot
-            plot_widget = self.graph_canvas_mapping[selected_key]
+            plot_widget = self.graph_canvas_mapping[target_key]
             if not plot_widget.getPlotItem().legend:
                 plot_widget.addLegend()
             plot_widget.addItem(line)
@@ -329,16 +433,47 @@ def add_graph(self, identifiers, container, selected_key):
             # Create animator
             if not hasattr(self, 'animators'):
                 self.animators = {}
-            if selected_key not in self.animators:
-                self.animators[selected_key] = []
+            if target_key not in self.animators:
+                self.animators[target_key] = []
                 
-            animator = PlotAnimator(plot_widget, x_values, y_values)
-            self.animators[selected_key].append(animator)
+            animator = PlotAnimator(
+                plot_widget, x_values, y_values, pyramid, self.playback, times
+            )
+            self.animators[target_key].append(animator)
+            self.live_series.setdefault((dltpath, app_id, ctx_id, root_key), []).append(
+                LiveSeries(
+                    target_key, line, animator, field_path, x_values, y_values, x_axis,
+                    LODLine(plot_widget, line, pyramid), times
+                )
+            )
             
     except Exception as e:
         QMessageBox.critical(self, "Graph Error", f"Failed to add graph:\n{e}")
 
 
+def release_graph(self, key):
+    """Forget a graph and release its animators and plotted data.
+    
+    Args:
+        key: (dltpath, app_id, ctx_id, graph_name)
+        
+    Returns:
+        Plot widget of the graph, None if unknown
+    """
+    canvas = self.graph_canvas_mapping.pop(key, None)
+    self.graph_axes.pop(key, None)
+    for animator in getattr(self, 'animators', {}).pop(key, []):
+        animator.release()
+    for series_key, series in list(self.live_series.items()):
+        for item in series:
+            if item.graph_key == key:
+                item.release()
+        series[:] = [item for item in series if item.graph_key != key]
+        if not series:
+            del self.live_series[series_key]
+    return canvas
+
+
 def delete_selected_graph(self, identifiers, graph_name, container):
     """Remove graph from UI and internal mappings.
     
@@ -350,14 +485,10 @@ def delete_selected_graph(self, identifiers, graph_name, container):
     dltpath, app_id, ctx_id = identifiers
     key = (dltpath, app_id, ctx_id, graph_name)
     
-    # Remove from mappings
-    canvas = self.graph_canvas_mapping.pop(key, None)
+    # Remove from mappings and release plot data
+    canvas = release_graph(self, key)
     if not canvas:
         return
-        
-    # Remove from animators
-    if hasattr(self, 'animators') and key in self.animators:
-        del self.animators[key]
     
     # Remove from UI
     for row in range(container.count()):
@@ -0,0 +1,119 @@
+"""Min/max level of detail pyramid for plotting large series."""
+import numpy as np
+
+# Buckets merged into one bucket of the next level
+LOD_FACTOR = 4
+# Levels are built until they have at most this many buckets
+LOD_MIN_BUCKETS = 1024
+
+
+def sort_by_x(x_values, y_values):
+    """Return x/y values ordered by non-decreasing x.
+
+    Already ordered values are returned as they are, otherwise a stable
+    sort keeps the record order of equal x values.
+    """
+    if len(x_values) < 2 or not np.any(np.diff(x_values) < 0):
+        return x_values, y_values
+    order = np.argsort(x_values, kind="stable")
+    return x_values[order], y_values[order]
+
+
+class LODPyramid:
+    """Min/max decimation levels of one x/y series.
+
+    Level k splits the raw points into buckets of LOD_FACTOR ** k points
+    and keeps the positions of the minimum and maximum of each bucket,
+    so every peak survives at every level. Levels only store indices into
+    the raw arrays, the pyramid needs about 2/3 of the raw size.
+
+    Points are kept in x order, so visible ranges are found by binary
+    search. Series with decreasing x (ECU uptimes restart on resets and
+    differ between merged ECUs) are sorted by a stable sort first.
+    """
+
+    def __init__(self, x_values, y_values, factor=LOD_FACTOR):
+        """
+        Build pyramid.
+
+        Args:
+            x_values: float64 x values
+            y_values: float64 y values of same length
+            factor: Bucket size ratio between consecutive levels
+        """
+        self.x, self.y = sort_by_x(x_values, y_values)
+        self.factor = factor
+        self.levels = []  # (bucket_size, min_indices, max_indices)
+
+        size = 1
+        min_idx = max_idx = np.arange(len(y_values), dtype=np.int64)
+        while len(min_idx) > LOD_MIN_BUCKETS:
+            size *= factor
+            min_idx = self._reduce(min_idx, np.argmin)
+            max_idx = self._reduce(max_idx, np.argmax)
+            self.levels.append((size, min_idx, max_idx))
+
+    def _reduce(self, indices, arg_extreme):
+        """Merge factor consecutive buckets keeping the extreme point."""
+        buckets = -(-len(indices) // self.factor)
+        padded = np.pad(indices, (0, buckets * self.factor - len(indices)), mode="edge")
+        padded = padded.reshape(buckets, self.factor)
+        choice = arg_extreme(self.y[padded], axis=1)
+        return padded[np.arange(buckets), choice]
+
+    def __len__(self):
+        return len(self.x)
+
+    def points(self, x_min, x_max, max_points, limit=None):
+        """Return the points to draw for a visible x range.
+
+        Args:
+            x_min: Left edge of the visible range
+            x_max: Right edge of the visible range
+            max_points: Point budget (e.g. four per horizontal pixel)
+            limit: Only use the first limit points (e.g. replayed so far)
+
+        Returns:
+            Tuple (x, y) arrays with at most about max_points points,
+            including the points just outside the range so lines reach
+            the edges
+        """
+        count = len(self.x) if limit is None else min(limit, len(self.x))
+        first, end = 0, count
+        if count:
+            first = max(int(np.searchsorted(self.x, x_min, "left")) - 1, 0)
+            end = min(int(np.searchsorted(self.x, x_max, "right")) + 1, count)
+        if first >= end:
+            return self.x[:0], self.y[:0]
+        if end - first <= max_points or not self.levels:
+            return self.x[first:end], self.y[first:end]
+
+        # Coarsest detail that still fits the budget
+        size, min_idx, max_idx = self.levels[-1]
+        for level in self.levels:
+            if 2 * (end - first) <= level[0] * max_points:
+                size, min_idx, max_idx = level
+                break
+
+        lo = first // size
+        hi = -(-end // size)
+        min_idx = min_idx[lo:hi].copy()
+        max_idx = max_idx[lo:hi].copy()
+        # Buckets cut by the range or the limit keep the extremes of their
+        # points inside it, e.g. of the replayed part of the last bucket
+        # (one bucket covering the whole range is cut at both ends)
+        edges = {
+            0: (first, min((lo + 1) * size, end)),
+            len(min_idx) - 1: (max((hi - 1) * size, first), end),
+        }
+        for bucket, (start, stop) in edges.items():
+            y_values = self.y[start:stop]
+            min_idx[bucket] = start + int(np.argmin(y_values))
+            max_idx[bucket] = start + int(np.argmax(y_values))
+        min_first = min_idx <= max_idx
+        indices = np.empty(2 * len(min_idx) + 2, dtype=np.int64)
+        indices[1:-1:2] = np.where(min_first, min_idx, max_idx)
+        indices[2:-1:2] = np.where(min_first, max_idx, min_idx)
+        indices[0] = first  # Keep the exact extent of the range
+        indices[-1] = end - 1
+        return self.x[indices], self.y[indices]
\ No newline at end of file
@@ -1,15 +1,33 @@
 """Application business logic and workflows."""
 import os
-import json
-from PyQt6.QtCore import Qt
-from dlt_worker import DLTWorker
-from utils import APP_TEMP_DIR, run_command, SmoothListWidget
+from PyQt6.QtCore import Qt, QTimer
+from dlt_worker import (
+    DLTWorker, DLTClientWorker, DLTExportWorker, DecodeRequest, DecodeReplyWorker
+)
+from dlt_scheduler import PRIORITY_SELECTED
+from dlt_client import DLT_DAEMON_PORT
+from dlt_cache import decode_key
+from dlt_tail import DLTFollower
+from dlt_columns import column_keys
+from dlt_filter import RecordFilter
+from dlt_export import EXPORT_FORMATS, export_format_of
+from utils import APP_TEMP_DIR, run_command, SmoothListWidget, format_bytes
 from PyQt6.QtWidgets import (
     QPushButton, QTreeWidgetItem, QFileDialog, QMessageBox, 
     QVBoxLayout, QWidget, QComboBox, QAbstractItemView,
-    QHBoxLayout, QLabel, QStyle, QToolButton
+    QHBoxLayout, QLabel, QStyle, QToolButton, QInputDialog
 )
 
+# Poll interval of followed (growing) DLT files
+FOLLOW_INTERVAL_MS = 250
+# Save dialog filters of the export formats
+EXPORT_FILTERS = {
+    "ndjson": "NDJSON (*.ndjson)",
+    "npz": "NumPy arrays (*.npz)",
+    "parquet": "Parquet directory (*.parquet)",
+    "arrow": "Arrow IPC directory (*.arrow)",
+}
+
 
 def add_proto(main_window):
     """Add and compile protobuf file."""
@@ -67,24 +85,295 @@ def add_dlt(main_window):
         )
         return
         
-    # Prepare module name
+    ok, record_filter = prompt_record_filter(main_window)
+    if ok:
+        load_dlt(main_window, file_path, record_filter)
+
+
+def prompt_record_filter(main_window):
+    """Ask for the records to load, empty text loads everything.
+    
+    Returns:
+        Tuple (ok, RecordFilter or None), ok is False if cancelled
+    """
+    text = ""
+    while True:
+        text, ok = QInputDialog.getText(
+            main_window, "Record Filter",
+            "Only load matching records (empty loads all), e.g.\n"
+            "app=SWAV,ABCD ctx=SWC1 message=SineWavePoint\n"
+            "start=\"2025/06/09 07:58:00\" end=\"2025/06/09 08:00:00\"",
+            text=text
+        )
+        if not ok:
+            return False, None
+        try:
+            return True, RecordFilter.parse(text) or None
+        except ValueError as e:
+            QMessageBox.warning(main_window, "Invalid Filter", str(e))
+
+
+def proto_module_name(main_window):
+    """Return module name of the compiled proto shown in the proto label."""
     proto_text = main_window.protoLabel.text()
     proto_filename = proto_text[8:].replace(".proto", "")
-    module_name = f"{proto_filename}_pb2"
+    return f"{proto_filename}_pb2"
+
+
+def load_dlt(main_window, file_path, record_filter=None, priority=0):
+    """Queue a worker indexing a DLT file.
+    
+    Args:
+        main_window: Main application window
+        file_path: Path to DLT file
+        record_filter: RecordFilter of the records to load (all if None)
+        priority: Load priority, higher priorities start first
+    """
+    module_name = proto_module_name(main_window)
     
     # Start worker thread
     main_window.struct_dictionary[file_path] = {}
-    worker = DLTWorker(file_path, module_name)
+    main_window.dlt_modules[file_path] = module_name
+    main_window.dlt_filters[file_path] = record_filter
+    worker = DLTWorker(
+        file_path, module_name, record_filter=record_filter,
+        cache=main_window.decode_cache
+    )
     worker.finished.connect(main_window.on_dlt_processed)
+    worker.partial.connect(main_window.on_dlt_partial)
+    worker.progress.connect(main_window.on_dlt_progress)
+    worker.cancelled.connect(main_window.on_dlt_cancelled)
+    worker.failed.connect(main_window.on_dlt_failed)
     worker.error.connect(main_window.on_dlt_error)
-    worker.start()
+    main_window.dlt_workers[file_path] = worker
+    
+    # Show the file right away, it waits for a free slot if others load
+    create_dlt_item(main_window, file_path)
+    main_window.load_scheduler.submit(worker, priority)
+
+
+def connect_daemon(main_window):
+    """Receive messages of a DLT daemon into a capture file and follow it."""
+    if main_window.protoLabel.text() == "No Proto Added":
+        QMessageBox.critical(
+            main_window, "Missing Proto", 
+            "Please add logger.proto first"
+        )
+        return
+        
+    address, ok = QInputDialog.getText(
+        main_window, "Connect to DLT Daemon", "Host[:port]:",
+        text=f"localhost:{DLT_DAEMON_PORT}"
+    )
+    address = address.strip()
+    if not ok or not address:
+        return
+    host, _, port = address.partition(":")
+    try:
+        port = int(port) if port else DLT_DAEMON_PORT
+    except ValueError:
+        QMessageBox.critical(main_window, "Invalid Address", f"Invalid port in '{address}'")
+        return
+        
+    file_path, _ = QFileDialog.getSaveFileName(
+        main_window, "Save Capture As", f"{host}.dlt", "DLT Files (*.dlt)"
+    )
+    if not file_path:
+        return
+    if file_path in main_window.struct_dictionary:
+        QMessageBox.critical(
+            main_window, "Duplicate File", 
+            "This DLT file is already loaded"
+        )
+        return
+    ok, record_filter = prompt_record_filter(main_window)
+    if not ok:
+        return
+        
+    # Start with an empty capture, the follower picks up received records
+    try:
+        open(file_path, "wb").close()
+    except OSError as e:
+        on_dlt_error(main_window, f"Cannot create capture file:\n{e}")
+        return
+    client = DLTClientWorker(file_path, host, port)
+    client.status.connect(main_window.on_dlt_client_status)
+    client.error.connect(main_window.on_dlt_error)
+    main_window.dlt_clients[file_path] = client
+    client.start()
+    load_dlt(main_window, file_path, record_filter, PRIORITY_SELECTED)
+
+
+def on_dlt_client_status(self, dlt_path, message):
+    """Show connection state of a DLT daemon client."""
+    self.statusBar().showMessage(f"{os.path.basename(dlt_path)}: {message}", 5000)
 
 
-def on_dlt_processed(self, dlt_path, struct_dict):
+def stop_dlt_clients(main_window, timeout_ms=2000):
+    """Disconnect all DLT daemon clients.
+    
+    Args:
+        main_window: Main application window
+        timeout_ms: Maximum time to wait per client
+    """
+    clients = list(main_window.dlt_clients.values())
+    main_window.dlt_clients.clear()
+    for client in clients:
+        client.stop()
+    for client in clients:
+        client.wait(timeout_ms)
+
+
+def on_dlt_partial(self, dlt_path, batch):
+    """Merge message types found so far into the tree while loading.
+    
+    Args:
+        dlt_path: Path to DLT file
+        batch: Dictionary {app_id: {ctx_id: {message_name: key labels}}}
+    """
+    if dlt_path not in self.dlt_workers:
+        return  # Deleted or cancelled meanwhile
+    merge_message_batch(self, dlt_path, batch)
+
+
+def merge_message_batch(main_window, dlt_path, batch):
+    """Add newly seen contexts and message types to data and tree.
+    
+    Args:
+        main_window: Main application window
+        dlt_path: Path to DLT file
+        batch: Dictionary {app_id: {ctx_id: {message_name: key labels}}}
+    """
+    struct_dict = main_window.struct_dictionary.setdefault(dlt_path, {})
+    for app_id, ctx_dict in batch.items():
+        for ctx_id, messages in ctx_dict.items():
+            ctx_messages = struct_dict.setdefault(app_id, {}).setdefault(ctx_id, {})
+            for message_name in messages:
+                ctx_messages.setdefault(message_name, None)
+    merge_dlt_keys(main_window, dlt_path, {
+        app_id: {
+            ctx_id: [label for labels in messages.values() for label in labels]
+            for ctx_id, messages in ctx_dict.items()
+        }
+        for app_id, ctx_dict in batch.items()
+    })
+
+
+def on_dlt_progress(self, dlt_path, progress):
+    """Show load progress in the status bar."""
+    if dlt_path not in self.dlt_workers:
+        return
+    percent = 100 * progress.bytes_done // max(progress.total_bytes, 1)
+    self.statusBar().showMessage(
+        f"Loading {os.path.basename(dlt_path)}: {percent}% "
+        f"({progress.records} records, {progress.rate / 1e6:.1f} MB/s, "
+        f"ETA {progress.eta:.0f} s)"
+    )
+
+
+def on_dlt_cancelled(self, dlt_path):
+    """Forget a file whose load was cancelled."""
+    worker = self.dlt_workers.pop(dlt_path, None)
+    if worker:
+        worker.wait()
+    self.statusBar().showMessage(f"Cancelled {os.path.basename(dlt_path)}", 3000)
+
+
+def on_dlt_failed(self, dlt_path):
+    """Forget the worker of a load stopped by an error (already reported)."""
+    worker = self.dlt_workers.pop(dlt_path, None)
+    if worker:
+        worker.wait()
+    show_load_state(self, dlt_path, "failed")
+
+
+def on_load_queue_changed(self):
+    """Show running and waiting loads on their file items."""
+    queued = self.load_scheduler.queued()
+    positions = {dlt_path: position for position, dlt_path in enumerate(queued, 1)}
+    for dlt_path in self.dlt_workers:
+        if dlt_path in self.load_scheduler.running:
+            show_load_state(self, dlt_path, "loading")
+        elif dlt_path in positions:
+            show_load_state(self, dlt_path, f"queued #{positions[dlt_path]}")
+    running = len(self.load_scheduler.running)
+    if queued:
+        self.statusBar().showMessage(
+            f"Loading {running} file{'s' if running != 1 else ''}, {len(queued)} queued", 3000
+        )
+
+
+def show_load_state(main_window, dlt_path, state=""):
+    """Set the load state text of a file item (hidden when empty)."""
+    dlt_item = main_window.dlt_items.get(dlt_path)
+    if dlt_item is None:
+        return
+    state_label = main_window.treeWidget.itemWidget(dlt_item, 0).findChild(
+        QLabel, "loadStateLabel"
+    )
+    state_label.setText(f"({state})" if state else "")
+    state_label.setVisible(bool(state))
+
+
+def cancel_dlt_workers(main_window, timeout_ms=2000):
+    """Stop all running loads and exports, waiting at most timeout_ms for each.
+    
+    Args:
+        main_window: Main application window
+        timeout_ms: Maximum time to wait per worker
+    """
+    main_window.load_scheduler.clear()  # Never start waiting loads
+    workers = list(main_window.dlt_workers.values())
+    workers += main_window.export_workers.values()
+    main_window.dlt_workers.clear()
+    main_window.export_workers.clear()
+    for worker in workers:
+        worker.cancel()
+    for worker in workers:
+        worker.wait(timeout_ms)
+
+
+def on_dlt_processed(self, dlt_path, struct_dict, index):
     """Handle successfully processed DLT file."""
-    self.struct_dictionary[dlt_path] = struct_dict
+    worker = self.dlt_workers.pop(dlt_path, None)
+    if worker is None:
+        return  # Deleted while loading
+    worker.wait()
+    show_load_state(self, dlt_path)
     
-    # Create tree widget item
+    # Keep message types decoded meanwhile
+    merged = self.struct_dictionary.setdefault(dlt_path, {})
+    for app_id, ctx_dict in struct_dict.items():
+        for ctx_id, messages in ctx_dict.items():
+            ctx_messages = merged.setdefault(app_id, {}).setdefault(ctx_id, {})
+            for message_name, columns in messages.items():
+                if ctx_messages.get(message_name) is None:
+                    ctx_messages[message_name] = columns
+    self.dlt_indexes[dlt_path] = index
+    balance_memory(self)
+    
+    # Add AppID/CtxID hierarchy with stored index keys
+    keys = {}
+    for app_id, ctx_dict in struct_dict.items():
+        keys[app_id] = {}
+        for ctx_id in ctx_dict:
+            ctx_keys = index.keys.get(app_id, {}).get(ctx_id) if index else None
+            if ctx_keys is None:
+                ctx_keys = column_keys(struct_dict[app_id][ctx_id])
+            keys[app_id][ctx_id] = ctx_keys
+    merge_dlt_keys(self, dlt_path, keys)
+    follow_btn = follow_button(self, dlt_path)
+    follow_btn.setEnabled(True)
+    if dlt_path in self.dlt_clients:
+        follow_btn.setChecked(True)  # Capture of a daemon connection
+    
+    self.statusBar().showMessage(
+        f"Loaded {os.path.basename(dlt_path)} ({len(index)} records)", 3000
+    )
+
+
+def create_dlt_item(self, dlt_path):
+    """Create top level tree item of a DLT file."""
     dlt_item = QTreeWidgetItem(self.treeWidget)
     dlt_item.setData(0, 1, dlt_path)  # Store path in user data
     
@@ -96,14 +385,39 @@ def on_dlt_processed(self, dlt_path, struct_dict):
     
     # Add filename label
     lbl = QLabel(os.path.basename(dlt_path))
+    record_filter = self.dlt_filters.get(dlt_path)
+    if record_filter:
+        lbl.setToolTip(f"Filter: {record_filter}")
     hbox.addWidget(lbl)
     
-    # Add JSON export button
-    json_btn = QPushButton("JSON") 
-    json_btn.clicked.connect(
-        lambda _, d=dlt_path, s=struct_dict: self.convert_to_json(d, s)
+    # Add load state (queued/loading), hidden once loaded
+    state_label = QLabel()
+    state_label.setObjectName("loadStateLabel")
+    state_label.setToolTip("Select the file to load it next")
+    state_label.setVisible(False)
+    hbox.addWidget(state_label)
+    
+    # Add decoded data size, updated by balance_memory
+    memory_label = QLabel()
+    memory_label.setObjectName("memoryLabel")
+    memory_label.setVisible(False)
+    hbox.addWidget(memory_label)
+    
+    # Add export button (NDJSON or columnar formats)
+    export_btn = QPushButton("Export") 
+    export_btn.clicked.connect(lambda _, d=dlt_path: self.export_dlt(d))
+    hbox.addWidget(export_btn)
+    
+    # Add follow toggle, enabled once the file is indexed
+    follow_btn = QPushButton("Follow")
+    follow_btn.setObjectName("followButton")
+    follow_btn.setCheckable(True)
+    follow_btn.setEnabled(False)
+    follow_btn.setToolTip("Watch file for records appended by dlt-receive")
+    follow_btn.toggled.connect(
+        lambda checked, d=dlt_path: self.toggle_follow(d, checked)
     )
-    hbox.addWidget(json_btn)
+    hbox.addWidget(follow_btn)
     
     # Add delete button
     delete_btn = QToolButton()
@@ -117,67 +431,428 @@ def on_dlt_processed(self, dlt_path, struct_dict):
     hbox.addWidget(delete_btn)
     
     self.treeWidget.setItemWidget(dlt_item, 0, container)
+    self.dlt_items[dlt_path] = dlt_item
+    return dlt_item
+
+
+def follow_button(main_window, dlt_path):
+    """Return follow toggle button of a DLT file item."""
+    dlt_item = main_window.dlt_items[dlt_path]
+    return main_window.treeWidget.itemWidget(dlt_item, 0).findChild(
+        QPushButton, "followButton"
+    )
+
+
+def toggle_follow(main_window, dlt_path, enabled):
+    """Start or stop following a DLT file that is still being written.
     
-    # Add AppID/CtxID hierarchy
-    for app_id, ctx_dict in struct_dict.items():
-        app_item = QTreeWidgetItem(dlt_item, [f"AppID: {app_id}"])
-        for ctx_id in ctx_dict:
-            ctx_item = QTreeWidgetItem(app_item, [f"CtxID: {ctx_id}"])
-            ctx_item.setData(0, 1, (dlt_path, app_id, ctx_id))
+    Args:
+        main_window: Main application window
+        dlt_path: Path to DLT file
+        enabled: Whether to follow the file
+    """
+    if not enabled:
+        main_window.followers.pop(dlt_path, None)
+        if not main_window.followers and main_window.follow_timer:
+            main_window.follow_timer.stop()
+        return
+        
+    main_window.followers[dlt_path] = DLTFollower(
+        dlt_path,
+        main_window.dlt_indexes[dlt_path],
+        main_window.dlt_modules[dlt_path],
+        lambda msg: on_dlt_error(main_window, msg),
+        main_window.dlt_filters.get(dlt_path)
+    )
+    if main_window.follow_timer is None:
+        main_window.follow_timer = QTimer(main_window)
+        main_window.follow_timer.timeout.connect(main_window.poll_followed_files)
+    if not main_window.follow_timer.isActive():
+        main_window.follow_timer.start(FOLLOW_INTERVAL_MS)
+
+
+def poll_followed_files(main_window):
+    """Append records written since the last poll to data and live graphs."""
+    for dlt_path, follower in list(main_window.followers.items()):
+        struct_dict = main_window.struct_dictionary.get(dlt_path, {})
+        try:
+            update = follower.poll(struct_dict)
+        except OSError as e:
+            follow_button(main_window, dlt_path).setChecked(False)
+            on_dlt_error(main_window, f"Stopped following:\n{e}")
+            continue
+        if not update.records:
+            continue
             
-            # Create graph container
-            graph_container = SmoothListWidget()
-            graph_container.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove)
-            graph_container.setDefaultDropAction(Qt.DropAction.MoveAction)
-            graph_container.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
-            graph_container.setSpacing(10)
-            graph_container.setAutoScroll(True)
-            graph_container.setAutoScrollMargin(80)
-            graph_container.setStyleSheet("""
-                SmoothListWidget::item:selected { background: transparent; }
-            """)
+        if update.new_messages:
+            merge_message_batch(main_window, dlt_path, update.new_messages)
+        for (app_id, ctx_id, message_name), columns in update.columns.items():
+            struct_dict[app_id][ctx_id][message_name].extend(columns)
+            main_window.spill_store.touch((dlt_path, app_id, ctx_id, message_name))
+            main_window.update_live_graphs(
+                (dlt_path, app_id, ctx_id, message_name), columns
+            )
+        balance_memory(main_window)
+        main_window.statusBar().showMessage(
+            f"Following {os.path.basename(dlt_path)}: "
+            f"{len(follower.index)} records (+{update.records})"
+        )
+
+
+def merge_dlt_keys(self, dlt_path, keys):
+    """Add missing AppID/CtxID items and key labels of a DLT file.
+    
+    Only tree rows are created here, graph panels are built when their
+    context is first selected (see context_panel).
+    
+    Args:
+        dlt_path: Path to DLT file
+        keys: Dictionary {app_id: {ctx_id: [key labels]}}
+    """
+    dlt_item = self.dlt_items.get(dlt_path) or create_dlt_item(self, dlt_path)
+    app_items = {
+        dlt_item.child(i).data(0, 1): dlt_item.child(i)
+        for i in range(dlt_item.childCount())
+    }
+    for app_id, ctx_dict in keys.items():
+        app_item = app_items.get((dlt_path, app_id))
+        if app_item is None:
+            app_item = QTreeWidgetItem(dlt_item, [f"AppID: {app_id}"])
+            app_item.setData(0, 1, (dlt_path, app_id))
+            app_items[(dlt_path, app_id)] = app_item
             
-            # Create key selection combo
-            graph_combo = QComboBox()
-            seen_keys = set()
+        for ctx_id, labels in ctx_dict.items():
+            context = (dlt_path, app_id, ctx_id)
+            known = self.context_keys.get(context)
+            if known is None:
+                known = self.context_keys[context] = []
+                add_context_item(self, app_item, dlt_path, app_id, ctx_id)
+            known_labels = set(known)
+            new_labels = [label for label in dict.fromkeys(labels) if label not in known_labels]
+            known.extend(new_labels)
+            graph_widget = self.graph_mapping.get(context)
+            if graph_widget is not None and new_labels:
+                graph_widget.findChild(QComboBox).addItems(new_labels)
+
+
+def add_context_item(self, app_item, dlt_path, app_id, ctx_id):
+    """Create CtxID tree item.
+    
+    Returns:
+        Context tree item
+    """
+    ctx_item = QTreeWidgetItem(app_item, [f"CtxID: {ctx_id}"])
+    ctx_item.setData(0, 1, (dlt_path, app_id, ctx_id))
+    return ctx_item
+
+
+def context_panel(self, dlt_path, app_id, ctx_id):
+    """Return graph area of a context, creating it on first use.
+    
+    Returns:
+        Graph area widget
+    """
+    graph_widget = self.graph_mapping.get((dlt_path, app_id, ctx_id))
+    if graph_widget is not None:
+        return graph_widget
+        
+    # Create graph container
+    graph_container = SmoothListWidget()
+    graph_container.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove)
+    graph_container.setDefaultDropAction(Qt.DropAction.MoveAction)
+    graph_container.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+    graph_container.setSpacing(10)
+    graph_container.setAutoScroll(True)
+    graph_container.setAutoScrollMargin(80)
+    graph_container.setStyleSheet("""
+        SmoothListWidget::item:selected { background: transparent; }
+    """)
+    
+    # Create key selection combo
+    graph_combo = QComboBox()
+    graph_combo.addItems(self.context_keys.get((dlt_path, app_id, ctx_id), []))
+    
+    # Add graph button
+    add_btn = QPushButton(f"Add Graph for {ctx_id}")
+    add_btn.clicked.connect(
+        lambda _, dp=dlt_path, aid=app_id, cid=ctx_id, 
+        gc=graph_container, combo=graph_combo: 
+            self.add_graph((dp, aid, cid), gc, combo.currentText())
+    )
+    
+    # Create graph area
+    graph_widget = QWidget()
+    graph_layout = QVBoxLayout(graph_widget)
+    graph_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
+    graph_layout.addWidget(graph_combo)
+    graph_layout.addWidget(add_btn)
+    graph_layout.addWidget(graph_container)
+    graph_widget.setVisible(False)
+    
+    # Store references
+    self.grapharea.addWidget(graph_widget)
+    self.graph_mapping[(dlt_path, app_id, ctx_id)] = graph_widget
+    return graph_widget
+
+
+def ensure_decoded(main_window, dlt_path, app_id=None, ctx_id=None, message_name=None,
+                   on_done=None):
+    """Decode message types that were only indexed so far.
+    
+    Decoded columns replace the None placeholders in the struct
+    dictionary and are reused by later calls. Message types decoded in
+    an earlier session are read from the decode cache, others are
+    decoded in the decode process while the GUI keeps running. The
+    selected types count as recently used for the memory budget.
+    
+    Args:
+        main_window: Main application window
+        dlt_path: Path to DLT file
+        app_id: Limit decoding to this application id
+        ctx_id: Limit decoding to this context id
+        message_name: Limit decoding to this message type
+        on_done: Called without arguments once the selected types are
+            decoded (right away if they are already), not called if
+            decoding fails or the file is removed meanwhile
             
-            # Recursively collect keys
-            def collect_keys(path, node):
-                if isinstance(node, dict):
-                    for key, val in node.items():
-                        new_path = path + [key]
-                        label = " > ".join(new_path)
-                        if label not in seen_keys:
-                            seen_keys.add(label)
-                            graph_combo.addItem(label)
-                        collect_keys(new_path, val)
-                elif isinstance(node, list):
-                    for elem in node:
-                        if isinstance(elem, dict):
-                            collect_keys(path, elem)
+    Raises:
+        ValueError: If the file is still loading
+    """
+    struct_dict = main_window.struct_dictionary.get(dlt_path, {})
+    pending = []
+    for aid, ctx_dict in struct_dict.items():
+        if app_id not in (None, aid):
+            continue
+        for cid, messages in ctx_dict.items():
+            if ctx_id not in (None, cid):
+                continue
+            names = []
+            for name, columns in messages.items():
+                if message_name not in (None, name):
+                    continue
+                main_window.spill_store.touch((dlt_path, aid, cid, name))
+                if columns is None:
+                    names.append(name)
+            if names:
+                pending.append((aid, cid, names))
+                
+    if pending:
+        index = main_window.dlt_indexes.get(dlt_path)
+        if index is None:
+            raise ValueError("DLT file is still loading")
             
-            collect_keys([], struct_dict[app_id][ctx_id])
+        # Only cache files that are completely indexed and not growing
+        cache = main_window.decode_cache
+        cache_key = None
+        if (dlt_path not in main_window.followers
+                and index.end_offset == os.path.getsize(dlt_path)):
+            cache_key = decode_key(
+                dlt_path, main_window.dlt_modules[dlt_path],
+                record_filter=main_window.dlt_filters.get(dlt_path)
+            )
             
-            # Add graph button
-            add_btn = QPushButton(f"Add Graph for {ctx_id}")
-            add_btn.clicked.connect(
-                lambda _, dp=dlt_path, aid=app_id, cid=ctx_id, 
-                gc=graph_container, combo=graph_combo: 
-                    self.add_graph((dp, aid, cid), gc, combo.currentText())
+        jobs = []
+        for aid, cid, names in pending:
+            decoded = cache.load_messages(cache_key, aid, cid, names) if cache_key else {}
+            struct_dict[aid][cid].update(decoded)
+            missing = [name for name in names if name not in decoded]
+            if missing:
+                jobs.append((aid, cid, missing))
+        if jobs:
+            main_window.decode_requests.append(
+                DecodeRequest(dlt_path, index, jobs, cache_key, on_done)
+            )
+            start_next_decode(main_window)
+            return
+        balance_memory(main_window, (dlt_path,))
+    if on_done:
+        on_done()
+
+
+def start_next_decode(main_window):
+    """Send the next waiting decode job to the decode process."""
+    while main_window.decode_worker is None and main_window.decode_requests:
+        request = main_window.decode_requests[0]
+        app_id, ctx_id, names = request.jobs[0]
+        request.records = len(request.index)
+        try:
+            main_window.decode_service.request(
+                request.dlt_path, request.index, main_window.dlt_modules[request.dlt_path],
+                app_id, ctx_id, names, main_window.dlt_filters.get(request.dlt_path)
             )
+        except Exception as e:
+            main_window.decode_requests.pop(0)
+            on_dlt_error(main_window, f"Decoding failed:\n{e}")
+            continue
             
-            # Create graph area
-            graph_widget = QWidget()
-            graph_layout = QVBoxLayout(graph_widget)
-            graph_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-            graph_layout.addWidget(graph_combo)
-            graph_layout.addWidget(add_btn)
-            graph_layout.addWidget(graph_container)
-            graph_widget.setVisible(False)
+        worker = DecodeReplyWorker(main_window.decode_service, request)
+        worker.finished.connect(
+            lambda results, errors, w=worker: on_decode_reply(main_window, w, results, errors)
+        )
+        worker.error.connect(
+            lambda message, w=worker: on_decode_failed(main_window, w, message)
+        )
+        main_window.decode_worker = worker
+        worker.start()
+        main_window.statusBar().showMessage(
+            f"Decoding {', '.join(names)} of {app_id}/{ctx_id}..."
+        )
+
+
+def on_decode_reply(main_window, worker, results, errors):
+    """Merge decoded columns of a job and continue with the next one."""
+    if worker is not main_window.decode_worker:
+        return  # Abandoned on exit
+    worker.wait()
+    main_window.decode_worker = None
+    request = worker.request
+    for message in errors:
+        on_dlt_error(main_window, message)
+    if request not in main_window.decode_requests:
+        start_next_decode(main_window)  # File removed meanwhile
+        return
+        
+    app_id, ctx_id, names = request.jobs.pop(0)
+    if request.cache_key:
+        for name, columns in results.items():
+            main_window.decode_cache.store(request.cache_key, app_id, ctx_id, name, columns)
+            
+    # Follow polls skip these types until they are decoded, add the
+    # records they indexed meanwhile
+    follower = main_window.followers.get(request.dlt_path)
+    if follower is not None and len(request.index) > request.records:
+        for name, columns in follower.decode_since(
+                request.records, app_id, ctx_id, list(results)).items():
+            results[name].extend(columns)
             
-            # Store references
-            self.grapharea.addWidget(graph_widget)
-            self.graph_mapping[(dlt_path, app_id, ctx_id)] = graph_widget
+    messages = main_window.struct_dictionary[request.dlt_path][app_id][ctx_id]
+    for name, columns in results.items():
+        if messages.get(name) is None:  # Unless decoded by an earlier request
+            messages[name] = columns
+    if request.jobs:
+        start_next_decode(main_window)
+        return
+        
+    main_window.decode_requests.remove(request)
+    balance_memory(main_window, (request.dlt_path,))
+    main_window.statusBar().clearMessage()
+    start_next_decode(main_window)
+    if request.on_done:
+        request.on_done()
+
+
+def on_decode_failed(main_window, worker, message):
+    """Drop the decode request of a failed job and report the error."""
+    if worker is not main_window.decode_worker:
+        return  # Abandoned on exit
+    worker.wait()
+    main_window.decode_worker = None
+    main_window.statusBar().clearMessage()
+    if worker.request in main_window.decode_requests:
+        main_window.decode_requests.remove(worker.request)
+        on_dlt_error(main_window, f"Decoding failed:\n{message}")
+    start_next_decode(main_window)
+
+
+def cancel_decode_requests(main_window, dlt_path=None):
+    """Drop waiting decode requests of a file (of all files if None).
+    
+    A job already sent still runs, its reply is ignored.
+    """
+    main_window.decode_requests = [
+        request for request in main_window.decode_requests
+        if dlt_path not in (None, request.dlt_path)
+    ]
+
+
+def stop_decode_service(main_window):
+    """Abandon all decode requests and stop the decode process."""
+    cancel_decode_requests(main_window)
+    worker = main_window.decode_worker
+    main_window.decode_worker = None
+    if worker is not None:
+        main_window.decode_service.kill()  # Ends the wait for the reply
+        worker.wait()
+    main_window.decode_service.stop()
+
+
+def balance_memory(main_window, keep=()):
+    """Keep decoded columns within the memory budgets.
+    
+    Message types of inactive files are evicted beyond the decoded data
+    budget, resident columns beyond the memory budget move to disk.
+    Files count as active while selected, followed, loading or exporting.
+    
+    Args:
+        main_window: Main application window
+        keep: Further DLT paths to keep, e.g. of columns about to be used
+    """
+    store = main_window.spill_store
+    evicted = store.evict(
+        main_window.struct_dictionary, active_files(main_window) | set(keep)
+    )
+    spilled = store.balance(main_window.struct_dictionary)
+    if evicted:
+        main_window.statusBar().showMessage(
+            f"Released {evicted} message type{'s' if evicted != 1 else ''} of inactive files "
+            f"(decoded data budget {format_bytes(store.decoded_budget)})", 3000
+        )
+    elif spilled:
+        main_window.statusBar().showMessage(
+            f"Moved {spilled} message type{'s' if spilled != 1 else ''} to disk "
+            f"(memory budget {format_bytes(store.budget)})", 3000
+        )
+    show_memory_usage(main_window)
+
+
+def active_files(main_window):
+    """Return DLT paths whose decoded columns must stay loaded."""
+    active = set(main_window.followers) | set(main_window.dlt_workers)
+    active |= set(main_window.export_workers)
+    selected_item = main_window.treeWidget.currentItem()
+    data = selected_item.data(0, 1) if selected_item else None
+    if isinstance(data, str):
+        active.add(data)
+    elif isinstance(data, tuple):
+        active.add(data[0])
+    return active
+
+
+def show_memory_usage(main_window):
+    """Show decoded bytes on file items and context items of the tree."""
+    usage = main_window.spill_store.usage(main_window.struct_dictionary)
+    for dlt_path, dlt_item in main_window.dlt_items.items():
+        file_resident = file_spilled = 0
+        for i in range(dlt_item.childCount()):
+            app_item = dlt_item.child(i)
+            for j in range(app_item.childCount()):
+                ctx_item = app_item.child(j)
+                _, app_id, ctx_id = ctx_item.data(0, 1)
+                resident, spilled = usage.get((dlt_path, app_id, ctx_id), (0, 0))
+                file_resident += resident
+                file_spilled += spilled
+                size = f" ({format_bytes(resident + spilled)})" if resident + spilled else ""
+                ctx_item.setText(0, f"CtxID: {ctx_id}{size}")
+                ctx_item.setToolTip(0, memory_tooltip(resident, spilled))
+        memory_label = main_window.treeWidget.itemWidget(dlt_item, 0).findChild(
+            QLabel, "memoryLabel"
+        )
+        memory_label.setText(format_bytes(file_resident + file_spilled))
+        memory_label.setToolTip(memory_tooltip(file_resident, file_spilled))
+        memory_label.setVisible(bool(file_resident + file_spilled))
+    total = sum(resident + spilled for resident, spilled in usage.values())
+    header = main_window.treeWidget.headerItem()
+    header.setText(0, f"DLT Files ({format_bytes(total)} decoded)" if total else "DLT Files")
+    header.setToolTip(
+        0, f"Decoded data budget: {format_bytes(main_window.spill_store.decoded_budget)}"
+    )
+
+
+def memory_tooltip(resident, spilled):
+    """Return tooltip text of decoded bytes in memory and on disk."""
+    if not resident + spilled:
+        return "Not decoded yet"
+    return f"Decoded data: {format_bytes(resident)} in memory, {format_bytes(spilled)} on disk"
 
 
 def on_dlt_error(main_window, message):
@@ -185,28 +860,91 @@ def on_dlt_error(main_window, message):
     QMessageBox.critical(main_window, "Processing Error", message)
 
 
-def convert_to_json(self, dlt_path, struct_dict):
-    """Export structured data to JSON file."""
-    file_path, _ = QFileDialog.getSaveFileName(
-        self, "Save JSON", "", "JSON Files (*.json)"
+def export_dlt(self, dlt_path):
+    """Export decoded data of a DLT file in a background worker."""
+    if dlt_path in self.export_workers:
+        QMessageBox.information(self, "Export", "This DLT file is already being exported")
+        return
+    file_path, selected_filter = QFileDialog.getSaveFileName(
+        self, "Export", "", ";;".join(EXPORT_FILTERS.values())
     )
     if not file_path:
         return
         
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(struct_dict, f, indent=4, ensure_ascii=False)
-        QMessageBox.information(
-            self, "Export Success", 
-            f"File saved:\n{file_path}"
+        export_format = next(
+            (name for name, name_filter in EXPORT_FILTERS.items()
+             if name_filter == selected_filter),
+            None
+        ) or export_format_of(file_path)
+        if not file_path.lower().endswith(EXPORT_FORMATS[export_format]):
+            file_path += EXPORT_FORMATS[export_format]
+        ensure_decoded(
+            self, dlt_path,
+            on_done=lambda: start_export(self, dlt_path, file_path, export_format)
         )
     except Exception as e:
         QMessageBox.critical(
             self, "Export Error", 
-            f"Failed to save JSON:\n{e}"
+            f"Failed to export:\n{e}"
         )
 
 
+def start_export(self, dlt_path, file_path, export_format):
+    """Start the export worker once all message types are decoded."""
+    if dlt_path in self.export_workers:
+        QMessageBox.information(self, "Export", "This DLT file is already being exported")
+        return
+    worker = DLTExportWorker(
+        dlt_path, self.struct_dictionary.get(dlt_path, {}), file_path, export_format
+    )
+    worker.progress.connect(self.on_export_progress)
+    worker.finished.connect(self.on_export_finished)
+    worker.cancelled.connect(self.on_export_cancelled)
+    worker.error.connect(
+        lambda message, d=dlt_path: on_export_failed(self, d, message)
+    )
+    self.export_workers[dlt_path] = worker
+    worker.start()
+
+
+def on_export_progress(self, dlt_path, done, total):
+    """Show export progress in the status bar."""
+    percent = 100 * done // max(total, 1)
+    self.statusBar().showMessage(
+        f"Exporting {os.path.basename(dlt_path)}: {percent}% ({done}/{total} messages)"
+    )
+
+
+def on_export_finished(self, dlt_path, output_path):
+    """Report a written export."""
+    worker = self.export_workers.pop(dlt_path, None)
+    if worker:
+        worker.wait()
+    self.statusBar().clearMessage()
+    QMessageBox.information(
+        self, "Export Success", 
+        f"File saved:\n{output_path}"
+    )
+
+
+def on_export_cancelled(self, dlt_path):
+    """Forget a cancelled export."""
+    worker = self.export_workers.pop(dlt_path, None)
+    if worker:
+        worker.wait()
+    self.statusBar().showMessage(f"Export of {os.path.basename(dlt_path)} cancelled", 3000)
+
+
+def on_export_failed(main_window, dlt_path, message):
+    """Report a failed export."""
+    worker = main_window.export_workers.pop(dlt_path, None)
+    if worker:
+        worker.wait()
+    main_window.statusBar().clearMessage()
+    QMessageBox.critical(main_window, "Export Error", message)
+
+
 def on_selection_changed(self):
     """Handle tree widget selection change."""
     selected_item = self.treeWidget.currentItem()
@@ -217,10 +955,18 @@ def on_selection_changed(self):
     for widget in self.graph_mapping.values():
         widget.setVisible(False)
     
-    # Show selected graph widget
+    # Show selected graph widget, built on first selection
     data = selected_item.data(0, 1)
-    if data in self.graph_mapping:
-        self.graph_mapping[data].setVisible(True)
+    if data in self.context_keys:
+        context_panel(self, *data).setVisible(True)
+        self.playback.redraw()
+        
+    # Load a selected file that still waits first
+    if isinstance(data, str):
+        self.load_scheduler.prioritize(data)
+        
+    # Files left inactive may be released now
+    balance_memory(self)
 
 
 def delete_dlt(main_window, dlt_item):
@@ -243,13 +989,30 @@ def delete_dlt(main_window, dlt_item):
     if reply != QMessageBox.StandardButton.Yes:
         return
         
+    # Stop a load still in progress or drop it from the queue
+    worker = main_window.dlt_workers.pop(file_path, None)
+    if worker:
+        main_window.load_scheduler.cancel(file_path)
+        worker.wait()
+    client = main_window.dlt_clients.pop(file_path, None)
+    if client:
+        client.stop()
+        client.wait()
+    export_worker = main_window.export_workers.pop(file_path, None)
+    if export_worker:
+        export_worker.cancel()
+        export_worker.wait()
+    cancel_decode_requests(main_window, file_path)
+    main_window.decode_service.forget(file_path)
+    main_window.spill_store.release(file_path)
+        
     # Remove graph mappings
     keys_to_remove = [
         key for key in list(main_window.graph_canvas_mapping.keys())
         if key[0] == file_path
     ]
     for key in keys_to_remove:
-        main_window.graph_canvas_mapping.pop(key, None)
+        main_window.release_graph(key)
         
     # Remove graph widgets
     graph_keys = [
@@ -265,6 +1028,16 @@ def delete_dlt(main_window, dlt_item):
     # Remove data
     if file_path in main_window.struct_dictionary:
         del main_window.struct_dictionary[file_path]
+    main_window.dlt_indexes.pop(file_path, None)
+    main_window.dlt_modules.pop(file_path, None)
+    main_window.dlt_filters.pop(file_path, None)
+    for key in [key for key in main_window.context_keys if key[0] == file_path]:
+        del main_window.context_keys[key]
+    main_window.dlt_items.pop(file_path, None)
+    main_window.followers.pop(file_path, None)
+    for key in [key for key in main_window.live_series if key[0] == file_path]:
+        for series in main_window.live_series.pop(key):
+            series.release()
         
     # Remove from tree
     main_window.treeWidget.invisibleRootItem().removeChild(dlt_item)
\ No newline at end of file
@@ -4,10 +4,23 @@ import os
 from ui import setup_ui
 from logic import (
     add_proto, add_dlt, on_dlt_processed, on_dlt_error,
-    on_selection_changed, delete_dlt, convert_to_json
+    on_selection_changed, delete_dlt, export_dlt,
+    on_export_progress, on_export_finished, on_export_cancelled,
+    on_dlt_partial, on_dlt_progress, on_dlt_cancelled, on_dlt_failed,
+    on_load_queue_changed, cancel_dlt_workers,
+    toggle_follow, poll_followed_files,
+    connect_daemon, on_dlt_client_status, stop_dlt_clients, stop_decode_service
 )
-from graph import add_graph, delete_selected_graph
-from utils import cleanup_temp_files
+from graph import (
+    add_graph, delete_selected_graph, release_graph, update_live_graphs,
+    seek_playback, show_playback_cursor
+)
+from utils import APP_TEMP_DIR, cleanup_temp_files, config_int, create_tool_button
+from animate import PlaybackClock
+from dlt_cache import DECODE_CACHE_SIZE, DecodeCache
+from dlt_scheduler import LOAD_CONCURRENCY, LoadScheduler
+from dlt_service import DecodeService
+from dlt_spill import SpillStore
 from PyQt6.QtWidgets import QApplication, QMainWindow
 
 
@@ -18,25 +31,72 @@ class ProtoDashboard(QMainWindow):
         super().__init__()
         # Initialize data stores
         self.struct_dictionary = {}  # dlt_path: parsed_data
-        self.graph_mapping = {}  # (dlt, app, ctx): graph_widget
+        self.graph_mapping = {}  # (dlt, app, ctx): graph_widget, built on first selection
+        self.context_keys = {}  # (dlt, app, ctx): key labels of the graph combo
         self.graph_canvas_mapping = {}  # (dlt, app, ctx, name): plot_widget
+        self.graph_axes = {}  # (dlt, app, ctx, name): x axis of the plot
+        self.dlt_indexes = {}  # dlt_path: DLTIndex
+        self.dlt_modules = {}  # dlt_path: protobuf module name
+        self.dlt_filters = {}  # dlt_path: RecordFilter of the loaded records or None
+        self.dlt_workers = {}  # dlt_path: DLTWorker still loading or queued
+        self.export_workers = {}  # dlt_path: DLTExportWorker still writing
+        self.dlt_items = {}  # dlt_path: top level tree item
+        self.followers = {}  # dlt_path: DLTFollower
+        self.live_series = {}  # (dlt, app, ctx, message): [LiveSeries]
+        self.dlt_clients = {}  # dlt_path: DLTClientWorker receiving into the file
+        self.decode_cache = DecodeCache(  # Decoded columns kept across sessions
+            max_bytes=config_int("PROTO_DASHBOARD_CACHE_MB", DECODE_CACHE_SIZE >> 20) << 20
+        )
+        self.decode_service = DecodeService([APP_TEMP_DIR])  # Decode process, started on first use
+        self.spill_store = SpillStore(os.path.join(APP_TEMP_DIR, "spill"))  # Columns beyond the memory budget
+        self.decode_requests = []  # DecodeRequests waiting for the decode process
+        self.decode_worker = None  # DecodeReplyWorker of the job in the decode process
+        self.follow_timer = None
+        self.playback = PlaybackClock(self)  # Data time cursor replaying all graphs
+        self.load_scheduler = LoadScheduler(  # Bounds concurrent loads
+            config_int("PROTO_DASHBOARD_LOADS", LOAD_CONCURRENCY), parent=self
+        )
         
         # Connect logic methods
         self.add_proto = lambda: add_proto(self)
         self.add_dlt = lambda: add_dlt(self)
-        self.on_dlt_processed = lambda path, data: on_dlt_processed(self, path, data)
+        self.connect_daemon = lambda: connect_daemon(self)
+        self.on_dlt_client_status = lambda path, msg: on_dlt_client_status(self, path, msg)
+        self.on_dlt_processed = lambda path, data, index: on_dlt_processed(self, path, data, index)
+        self.on_dlt_partial = lambda path, batch: on_dlt_partial(self, path, batch)
+        self.on_dlt_progress = lambda path, progress: on_dlt_progress(self, path, progress)
+        self.on_dlt_cancelled = lambda path: on_dlt_cancelled(self, path)
+        self.on_dlt_failed = lambda path: on_dlt_failed(self, path)
+        self.on_load_queue_changed = lambda: on_load_queue_changed(self)
         self.on_dlt_error = lambda msg: on_dlt_error(self, msg)
         self.on_selection_changed = lambda: on_selection_changed(self)
         self.delete_dlt = lambda item: delete_dlt(self, item)
         self.add_graph = lambda ids, cont, key: add_graph(self, ids, cont, key)
+        self.release_graph = lambda key: release_graph(self, key)
         self.delete_selected_graph = lambda ids, name, cont: delete_selected_graph(self, ids, name, cont)
-        self.convert_to_json = lambda path, data: convert_to_json(self, path, data)
+        self.export_dlt = lambda path: export_dlt(self, path)
+        self.on_export_progress = lambda path, done, total: on_export_progress(self, path, done, total)
+        self.on_export_finished = lambda path, output: on_export_finished(self, path, output)
+        self.on_export_cancelled = lambda path: on_export_cancelled(self, path)
+        self.toggle_follow = lambda path, enabled: toggle_follow(self, path, enabled)
+        self.poll_followed_files = lambda: poll_followed_files(self)
+        self.update_live_graphs = lambda key, columns: update_live_graphs(self, key, columns)
+        self.seek_playback = lambda position: seek_playback(self, position)
+        self.show_playback_cursor = lambda cursor: show_playback_cursor(self, cursor)
+        self._create_tool_button = lambda pixmap, tooltip, slot: create_tool_button(self, pixmap, tooltip, slot)
+        self._delete_graph = lambda path, app_id, ctx_id, name, container: delete_selected_graph(
+            self, (path, app_id, ctx_id), name, container
+        )
         
         # Setup UI
         setup_ui(self)
+        self.load_scheduler.changed.connect(self.on_load_queue_changed)
     
     def closeEvent(self, event):
         """Handle application close event."""
+        cancel_dlt_workers(self)
+        stop_dlt_clients(self)
+        stop_decode_service(self)
         cleanup_temp_files()
         event.accept()
 
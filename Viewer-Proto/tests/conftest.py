@@ -0,0 +1,51 @@
+"""Make the viewer modules importable from the tests."""
+import os
+import sys
+import struct
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dlt_reader import (  # noqa: E402
+    DLT_STORAGE_MAGIC, STORAGE_HEADER, STANDARD_HEADER, ECU_TIMESTAMP, EXTENDED_HEADER,
+    HTYP_UEH, HTYP_WTMS, MSIN_VERB, TYPE_STRG
+)
+
+# Payload codecs of the records written by the dlt_file fixture
+CODECS = ("msgpack:MP:Sample", "msgpack:MQ:Pair")
+
+
+def dlt_record(timestamp, ecu_ticks, app_id, ctx_id, text):
+    """Return a storage record with one verbose string argument."""
+    data = text.encode("ascii") + b"\0"
+    payload = struct.pack("<IH", TYPE_STRG, len(data)) + data
+    extended = EXTENDED_HEADER.pack(
+        MSIN_VERB, 1, app_id.encode("ascii"), ctx_id.encode("ascii")
+    )
+    length = STANDARD_HEADER.size + ECU_TIMESTAMP.size + len(extended) + len(payload)
+    seconds = int(timestamp)
+    return (
+        STORAGE_HEADER.pack(DLT_STORAGE_MAGIC, seconds, round((timestamp - seconds) * 1e6), b"ECU1")
+        + STANDARD_HEADER.pack(HTYP_UEH | HTYP_WTMS | 0x20, 0, length)
+        + ECU_TIMESTAMP.pack(ecu_ticks) + extended + payload
+    )
+
+
+@pytest.fixture
+def dlt_file(tmp_path):
+    """Write a DLT file of MessagePack payloads in two contexts.
+
+    Contexts C0 and C1 alternate, each record holds a Sample message
+    (numeric, repeated and text fields) or a Pair message (list values).
+    """
+    msgpack = pytest.importorskip("msgpack")
+    path = tmp_path / "trace.dlt"
+    with open(path, "wb") as f:
+        for i in range(400):
+            if i % 3:
+                message = {"value": i * 0.5, "values": list(range(i % 4)), "name": f"s{i}"}
+                text = "MP" + msgpack.packb(message).hex()
+            else:
+                text = "MQ" + msgpack.packb([i, -i]).hex()
+            f.write(dlt_record(1750000000.0 + i * 0.25, i * 10, "APP", f"C{i % 2}", text))
+    return str(path)
\ No newline at end of file
@@ -0,0 +1,20 @@
+"""Tests of the persistent decode cache."""
+from dlt_cache import DecodeCache
+from dlt_columns import ColumnBuilder
+
+
+def build(count):
+    """Build MessageColumns of count numeric messages."""
+    builder = ColumnBuilder()
+    for i in range(count):
+        builder.append(float(i), {"value": i * 0.5})
+    return builder.build()
+
+
+def test_replaced_entries_keep_the_size_exact(tmp_path):
+    cache = DecodeCache(str(tmp_path), max_bytes=1 << 30)
+    for count in (100, 1000, 1000, 10):
+        assert cache.store("key", "APP", "CTX", "Sample", build(count))
+        cache.store("key", "APP", "CTX", "Other", build(count))
+        assert cache._size == sum(size for _, size, _ in cache._entries())
+    assert len(cache.load("key", "APP", "CTX", "Sample")) == 10
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""Tests of the DLT TCP client against the replay server over loopback."""
+import asyncio
+from dlt_client import DLTClient, replay_server
+from dlt_index import MappedDLTFile
+
+
+async def receive_replay(dlt_path, client):
+    """Serve a DLT file on a free port and run a client until the stream ends."""
+    port = asyncio.get_running_loop().create_future()
+    server = asyncio.create_task(replay_server(dlt_path, port=0, ready=port.set_result))
+    try:
+        client.port = await port
+        await asyncio.wait_for(client.run(reconnect=False), 30)
+    finally:
+        server.cancel()
+        await asyncio.gather(server, return_exceptions=True)
+
+
+def records(dlt_path):
+    """Return (app_id, ctx_id, uptime, payload) of every record."""
+    with MappedDLTFile(dlt_path) as dlt_file:
+        index = dlt_file.index
+        return [
+            (index.app_id(i), index.ctx_id(i), index.uptime(i), bytes(dlt_file.payload(i)))
+            for i in range(len(index))
+        ]
+
+
+def test_client_captures_replayed_records(dlt_file, tmp_path):
+    capture_path = str(tmp_path / "capture.dlt")
+    client = DLTClient("127.0.0.1", capture_path)
+    asyncio.run(receive_replay(dlt_file, client))
+    assert client.received == 400
+    assert records(capture_path) == records(dlt_file)
+
+
+class SlowClient(DLTClient):
+    """Client whose capture file is slower than the socket."""
+
+    max_queued = 0
+
+    async def _store(self, queue, capture):
+        get = queue.get
+
+        async def slow_get():
+            await asyncio.sleep(0.001)
+            self.max_queued = max(self.max_queued, queue.qsize())
+            return await get()
+        queue.get = slow_get
+        await super()._store(queue, capture)
+
+
+def test_bounded_queue_holds_back_a_fast_server(dlt_file, tmp_path):
+    capture_path = str(tmp_path / "capture.dlt")
+    client = SlowClient("127.0.0.1", capture_path, queue_size=4)
+    asyncio.run(receive_replay(dlt_file, client))
+    assert client.max_queued == 4  # Full, the receiver waited
+    assert records(capture_path) == records(dlt_file)
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""Tests of the column store layout of decoded messages."""
+import numpy as np
+from dlt_columns import ColumnBuilder, MessageColumns
+
+
+def build(messages, first=0):
+    """Build MessageColumns of message dictionaries."""
+    builder = ColumnBuilder()
+    for i, message in enumerate(messages, first):
+        builder.append(float(i), message)
+    return builder.build()
+
+
+def phone_book(count, phones=1):
+    """Return message dictionaries with a repeated message group."""
+    return [
+        {"name": f"n{i}", "phones": [{"number": f"{i}-{j}", "type": j} for j in range(phones)]}
+        for i in range(count)
+    ]
+
+
+def without_timestamps(rows):
+    """Drop the formatted timestamps of exported rows."""
+    return [{key: value for key, value in row.items() if key != "timestamp"} for row in rows]
+
+
+def test_single_element_group_keeps_offsets():
+    columns = build(phone_book(3))
+    assert columns.columns[("phones", "number")].offsets is not None
+    assert columns.columns[("name",)].offsets is None
+    assert without_timestamps(columns.rows()) == phone_book(3)
+
+
+def test_single_element_group_concat_and_extend():
+    parts = [build(phone_book(2)), build(phone_book(3, phones=2), first=2)]
+    expected = phone_book(2) + phone_book(3, phones=2)
+
+    merged = MessageColumns.concat(parts)
+    assert without_timestamps(merged.rows()) == expected
+
+    grown = build(phone_book(2))
+    grown.extend(build(phone_book(3, phones=2), first=2))
+    assert without_timestamps(grown.rows()) == expected
+
+    single = MessageColumns.concat([build(phone_book(2)), build(phone_book(1), first=2)])
+    assert single.columns[("phones", "type")].offsets is not None
+    assert without_timestamps(single.rows()) == phone_book(2) + phone_book(1)
+
+
+def test_array_round_trip_keeps_group_offsets():
+    columns = build(phone_book(3))
+    restored = MessageColumns.from_arrays(*columns.to_arrays())
+    assert list(restored.rows()) == list(columns.rows())
+    assert np.array_equal(
+        restored.columns[("phones", "type")].offsets,
+        columns.columns[("phones", "type")].offsets
+    )
\ No newline at end of file
@@ -0,0 +1,35 @@
+"""Tests of the serial and parallel file decoders."""
+import pytest
+from conftest import dlt_record
+from dlt_decode import decode_dlt_file, decode_file_parallel
+
+CODECS = ("msgpack:MQ:Pair",)
+
+
+def write_pairs(path, headers):
+    """Write 2000 MessagePack list records with header records in between."""
+    msgpack = pytest.importorskip("msgpack")
+    with open(path, "wb") as f:
+        for i in range(2000):
+            message = headers.get(i, [i, -i])
+            text = "MQ" + msgpack.packb(message).hex()
+            f.write(dlt_record(1750000000.0 + i, i, "APP", "CTX", text))
+    return str(path)
+
+
+@pytest.mark.parametrize("headers", [
+    {0: ["a", "b"]},
+    {0: ["a", "b"], 1200: ["c", "d"]},  # Changed in a later range
+])
+def test_parallel_decode_names_fields_of_header(tmp_path, headers):
+    dlt_path = write_pairs(tmp_path / "pairs.dlt", headers)
+    serial, serial_index = decode_dlt_file(dlt_path, None, codecs=CODECS, max_workers=1)
+    parallel, parallel_index = decode_file_parallel(dlt_path, None, max_workers=4, codecs=CODECS)
+
+    expected = serial["APP"]["CTX"]["Pair"]
+    columns = parallel["APP"]["CTX"]["Pair"]
+    names = sorted(name for header in headers.values() for name in header)
+    assert sorted(path[0] for path in columns.columns) == names
+    assert list(columns.columns) == list(expected.columns)
+    assert list(columns.rows()) == list(expected.rows())
+    assert list(parallel_index.message_codes) == list(serial_index.message_codes)
\ No newline at end of file
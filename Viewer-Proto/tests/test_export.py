@@ -0,0 +1,40 @@
+"""Tests of the NDJSON and columnar exports."""
+import json
+import numpy as np
+from dlt_columns import ColumnBuilder
+from dlt_export import export_file, load_tables
+
+
+def struct_dict(messages):
+    """Return decoded data of one message type of message dictionaries."""
+    builder = ColumnBuilder()
+    for i, message in enumerate(messages):
+        builder.append(1750000000.0 + i, message)
+    return {"APP": {"CTX": {"Contact": builder.build()}}}
+
+
+# Fields named like the record metadata, one phone per message
+CONTACTS = [
+    {"message": f"m{i}", "app_id": i, "timestamp": "field", "phones": [{"number": f"n{i}"}]}
+    for i in range(3)
+]
+
+
+def test_ndjson_keeps_metadata_and_single_element_groups(tmp_path):
+    file_path = str(tmp_path / "out.ndjson")
+    assert export_file(struct_dict(CONTACTS), file_path)
+    with open(file_path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert [line["data"] for line in lines] == CONTACTS
+    assert {line["app_id"] for line in lines} == {"APP"}
+    assert {line["ctx_id"] for line in lines} == {"CTX"}
+    assert {line["message"] for line in lines} == {"Contact"}
+    assert lines[0]["timestamp"] != "field"
+
+
+def test_npz_single_element_group_offsets(tmp_path):
+    file_path = str(tmp_path / "out.npz")
+    assert export_file(struct_dict(CONTACTS), file_path)
+    table = load_tables(file_path)[("APP", "CTX", "Contact")]
+    assert table["phones.number"].tolist() == ["n0", "n1", "n2"]
+    assert np.array_equal(table["phones.number.offsets"], [0, 1, 2, 3])
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""Tests of record filters on scanned and stored indexes."""
+from conftest import CODECS
+from dlt_codecs import PayloadDecoder
+from dlt_decode import decode_messages, deferred_struct_dict, scan_dlt_file
+from dlt_filter import RecordFilter
+from dlt_index import MappedDLTFile
+
+START = 1750000000.0
+
+
+def decode_struct_dict(dlt_path, index, struct_dict, record_filter):
+    """Decode every listed message type like the viewer does on use."""
+    decoder = PayloadDecoder(None, codecs=CODECS)
+    with MappedDLTFile(dlt_path, index) as dlt_file:
+        return {
+            (app_id, ctx_id, name): list(columns.rows())
+            for app_id, ctx_dict in struct_dict.items()
+            for ctx_id, names in ctx_dict.items()
+            for name, columns in decode_messages(
+                dlt_file, decoder, app_id, ctx_id, list(names), record_filter
+            ).items()
+        }
+
+
+def test_stored_index_reload_matches_filtered_scan(dlt_file):
+    record_filter = RecordFilter(ctx_ids=["C1"], start=START + 10.0, end=START + 12.0)
+    scanned = scan_dlt_file(dlt_file, None, codecs=CODECS, record_filter=record_filter)
+    stored = scan_dlt_file(dlt_file, None, codecs=CODECS)  # As saved next to the file
+
+    scan_struct = deferred_struct_dict(scanned)
+    reload_struct = deferred_struct_dict(stored, record_filter)
+    assert reload_struct == scan_struct == {"APP": {"C1": {"Sample": None, "Pair": None}}}
+    assert (decode_struct_dict(dlt_file, stored, reload_struct, record_filter)
+            == decode_struct_dict(dlt_file, scanned, scan_struct, record_filter))
+
+
+def test_stored_index_reload_drops_types_outside_window(dlt_file):
+    # Records 40 to 42: only C1 record 41 (a Sample) is inside
+    record_filter = RecordFilter(ctx_ids=["C1"], start=START + 10.0, end=START + 10.5)
+    scanned = scan_dlt_file(dlt_file, None, codecs=CODECS, record_filter=record_filter)
+    stored = scan_dlt_file(dlt_file, None, codecs=CODECS)
+    assert deferred_struct_dict(stored, record_filter) == deferred_struct_dict(scanned)
+    assert deferred_struct_dict(scanned) == {"APP": {"C1": {"Sample": None}}}
+
+    outside = RecordFilter(start=START + 1000.0)
+    assert deferred_struct_dict(stored, outside) == {}
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""Tests of the min/max level of detail pyramid."""
+import numpy as np
+from lod import LODPyramid
+
+
+def test_restarting_x_is_sliced_by_range():
+    # ECU uptime of two runs, the second after a reset
+    x = np.concatenate([np.arange(5000.0), np.arange(3000.0) + 0.5])
+    y = np.concatenate([np.zeros(5000), np.ones(3000)])
+    y[4000] = 9.0
+    pyramid = LODPyramid(x, y)
+    assert np.all(np.diff(pyramid.x) >= 0)
+
+    x_visible, y_visible = pyramid.points(3900.0, 4100.0, 1000)
+    assert len(x_visible) == 203
+    assert x_visible[0] == 3899.0 and x_visible[-1] == 4101.0
+    assert y_visible.max() == 9.0
+
+    x_visible, y_visible = pyramid.points(100.0, 200.0, 1000)
+    assert sorted(set(y_visible)) == [0.0, 1.0]  # Points of both runs
+
+
+def test_decimated_points_keep_peaks():
+    x = np.arange(100000.0)
+    y = np.sin(x / 1000.0)
+    y[54321] = 5.0
+    x_visible, y_visible = LODPyramid(x, y).points(0.0, 99999.0, 2000)
+    assert len(x_visible) <= 2 * 2000 + 2
+    assert y_visible.max() == 5.0 and x_visible[np.argmax(y_visible)] == 54321.0
+
+
+def test_limit_inside_bucket_keeps_replayed_extremes():
+    x = np.arange(100000.0)
+    y = np.zeros(100000)
+    y[51210] = 5.0  # Replayed
+    y[51250] = 9.0  # Same bucket at every level, not replayed yet
+    limit = 51232
+    x_visible, y_visible = LODPyramid(x, y).points(-np.inf, np.inf, 1000, limit)
+    assert len(x_visible) <= 2 * 1000 + 2
+    assert x_visible.max() == limit - 1
+    assert y_visible.max() == 5.0 and x_visible[np.argmax(y_visible)] == 51210.0
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""Tests of the schema compiled column builder."""
+import numpy as np
+from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+from google.protobuf.json_format import MessageToDict
+from dlt_columns import ColumnBuilder, MessageColumns
+from dlt_schema import MessageSchema, SchemaColumnBuilder
+
+
+def phone_book_class():
+    """Return a message class with a repeated message field."""
+    file_proto = descriptor_pb2.FileDescriptorProto(
+        name="phone_book_test.proto", package="test", syntax="proto3"
+    )
+    phone = file_proto.message_type.add(name="Phone")
+    phone.field.add(name="number", number=1, type=9, label=1)
+    phone.field.add(name="type", number=2, type=5, label=1)
+    book = file_proto.message_type.add(name="PhoneBook")
+    book.field.add(name="name", number=1, type=9, label=1)
+    book.field.add(name="phones", number=2, type=11, label=3, type_name=".test.Phone")
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(file_proto)
+    descriptor = pool.FindMessageTypeByName("test.PhoneBook")
+    if hasattr(message_factory, "GetMessageClass"):
+        return message_factory.GetMessageClass(descriptor)
+    return message_factory.MessageFactory(pool).GetPrototype(descriptor)
+
+
+def phone_books(message_class, count, phones=1, first=0):
+    """Return messages with the given number of phones each."""
+    messages = []
+    for i in range(first, first + count):
+        message = message_class(name=f"n{i}")
+        for j in range(phones):
+            message.phones.add(number=f"{i}-{j}", type=j + 1)
+        messages.append(message)
+    return messages
+
+
+def schema_columns(message_class, messages, first=0):
+    """Build MessageColumns with the schema compiled builder."""
+    builder = SchemaColumnBuilder(MessageSchema(message_class.DESCRIPTOR))
+    for i, message in enumerate(messages, first):
+        builder.append(float(i), message)
+    return builder.build()
+
+
+def dict_columns(messages, first=0):
+    """Build MessageColumns from message dictionaries."""
+    builder = ColumnBuilder()
+    for i, message in enumerate(messages, first):
+        builder.append(float(i), MessageToDict(message))
+    return builder.build()
+
+
+def layout(columns):
+    """Return offsets of all leaves."""
+    return {
+        path: None if column.offsets is None else column.offsets.tolist()
+        for path, column in columns.columns.items()
+    }
+
+
+def test_single_element_group_matches_dictionary_builder():
+    message_class = phone_book_class()
+    messages = phone_books(message_class, 3)
+    columns = schema_columns(message_class, messages)
+    assert columns.columns[("phones", "number")].offsets is not None
+    assert layout(columns) == layout(dict_columns(messages))
+    assert list(columns.rows()) == list(dict_columns(messages).rows())
+
+
+def test_single_element_group_concat_and_extend():
+    message_class = phone_book_class()
+    first = phone_books(message_class, 2)
+    second = phone_books(message_class, 2, first=2)
+    whole = schema_columns(message_class, first + second)
+
+    # Parallel chunks
+    merged = MessageColumns.concat([
+        schema_columns(message_class, first), schema_columns(message_class, second, 2)
+    ])
+    assert layout(merged) == layout(whole)
+    assert list(merged.rows()) == list(whole.rows())
+
+    # Followed file
+    grown = schema_columns(message_class, first)
+    grown.extend(schema_columns(message_class, second, 2))
+    assert layout(grown) == layout(whole)
+    assert list(grown.rows()) == list(whole.rows())
+    assert np.array_equal(grown.timestamps, whole.timestamps)
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""Tests of the shared memory transfer of the decode service."""
+import numpy as np
+from dlt_columns import ColumnBuilder
+from dlt_index import DLTIndex
+from dlt_service import receive_columns, receive_index, share_columns, share_index
+
+
+def add_records(index, first, count, app_id="APP"):
+    """Append count records with increasing offsets."""
+    for i in range(first, first + count):
+        index.append(i * 100, i * 100 + 20, 80, 1750000000.0 + i, app_id, f"C{i % 3}", 0x35, 0x41)
+        index.set_message_name(i, f"M{i % 2}")
+    index.end_offset = (first + count) * 100
+
+
+def assert_same_index(copy, index):
+    for name, _ in DLTIndex.ARRAYS:
+        assert getattr(copy, name) == getattr(index, name), name
+    assert copy.ids == index.ids
+    assert copy.message_names == index.message_names
+    assert copy.end_offset == index.end_offset
+    assert copy.code_of("C2") == index.code_of("C2")
+
+
+def test_index_is_sent_incrementally():
+    index = DLTIndex()
+    add_records(index, 0, 10)
+    copy = receive_index(None, *share_index(index))
+    assert_same_index(copy, index)
+
+    add_records(index, 10, 5, app_id="NEW")
+    shm_name, layout, meta = share_index(index, 10)
+    assert all(shape == (5,) for _, _, shape, _ in layout)
+    copy = receive_index(copy, shm_name, layout, meta)
+    assert_same_index(copy, index)
+
+
+def test_columns_round_trip():
+    builder = ColumnBuilder()
+    for i in range(4):
+        builder.append(float(i), {"value": i * 0.5, "tags": list(range(i))})
+    results = {"Empty": ColumnBuilder().build(), "Point": builder.build()}
+    received = receive_columns(*share_columns(results))
+    assert list(received) == ["Empty", "Point"]
+    assert list(received["Point"].rows()) == list(results["Point"].rows())
+    assert np.array_equal(received["Point"].timestamps, results["Point"].timestamps)
\ No newline at end of file
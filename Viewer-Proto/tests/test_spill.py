@@ -0,0 +1,116 @@
+"""Tests of spilling decoded columns to disk."""
+import gc
+import os
+import numpy as np
+from conftest import CODECS
+from dlt_cache import DecodeCache
+from dlt_codecs import PayloadDecoder
+from dlt_columns import ColumnBuilder, MessageColumns
+from dlt_decode import decode_messages, scan_dlt_file
+from dlt_index import MappedDLTFile
+from dlt_spill import SpillStore
+
+KEY = ("trace.dlt", "APP", "CTX", "Sample")
+
+
+def build(count, first=0):
+    """Build MessageColumns of count numeric and text messages."""
+    builder = ColumnBuilder()
+    for i in range(first, first + count):
+        builder.append(float(i), {"value": i * 0.5, "values": [i, i + 1], "name": f"s{i}"})
+    return builder.build()
+
+
+def versions(store):
+    """Return the version directories of the spilled message type."""
+    path = store._key_dir(KEY)
+    return sorted(os.listdir(path)) if os.path.isdir(path) else []
+
+
+def test_respill_keeps_files_of_live_snapshots(tmp_path):
+    store = SpillStore(str(tmp_path))
+    first = store.spill(KEY, build(100))
+    snapshot = first.snapshot()
+    second = store.spill(KEY, MessageColumns.concat([first, build(50, first=100)]))
+    assert len(versions(store)) == 2
+
+    del first
+    gc.collect()
+    store.collect()
+    assert len(versions(store)) == 2  # Still mapped by the snapshot
+    assert list(snapshot.rows()) == list(build(100).rows())
+
+    del snapshot
+    gc.collect()
+    store.collect()
+    assert len(versions(store)) == 1
+    assert list(second.rows()) == list(MessageColumns.concat([build(100), build(50, first=100)]).rows())
+
+    del second
+    gc.collect()
+    store.collect()
+    assert versions(store) == []
+
+
+def test_spilled_columns_grow_on_disk(tmp_path):
+    store = SpillStore(str(tmp_path))
+    columns = store.spill(KEY, build(1000))
+    for first in range(1000, 5000, 100):
+        columns.extend(build(100, first=first))
+    assert columns.resident_nbytes(objects=False) == 0  # Only text stays in memory
+    assert columns.mapped_nbytes() >= 5000 * 8 * 4  # Timestamps, uptimes and values
+    assert len(versions(store)) == 1
+    assert list(columns.rows()) == list(build(5000).rows())
+    assert store.balance({KEY[0]: {KEY[1]: {KEY[2]: {KEY[3]: columns}}}}) == 0
+
+
+def decode_all(dlt_path, index):
+    """Decode every message type of an indexed file like the viewer does."""
+    decoder = PayloadDecoder(None, codecs=CODECS)
+    with MappedDLTFile(dlt_path, index) as dlt_file:
+        return {
+            app_id: {
+                ctx_id: decode_messages(dlt_file, decoder, app_id, ctx_id)
+                for ctx_id in ctx_dict
+            }
+            for app_id, ctx_dict in index.messages.items()
+        }
+
+
+def assert_same_columns(columns, expected):
+    assert np.array_equal(columns.timestamps, expected.timestamps)
+    assert np.array_equal(columns.uptimes, expected.uptimes)
+    assert list(columns.columns) == list(expected.columns)
+    for path, column in columns.columns.items():
+        other = expected.columns[path]
+        assert column.values.dtype == other.values.dtype, path
+        assert np.array_equal(column.values, other.values), path
+        assert (column.offsets is None) == (other.offsets is None), path
+        if column.offsets is not None:
+            assert np.array_equal(column.offsets, other.offsets), path
+    assert list(columns.rows()) == list(expected.rows())
+
+
+def test_evicted_types_decode_again_identically(dlt_file, tmp_path):
+    index = scan_dlt_file(dlt_file, None, codecs=CODECS)
+    expected = decode_all(dlt_file, index)
+    struct_dictionary = {dlt_file: decode_all(dlt_file, index)}
+    cache = DecodeCache(str(tmp_path / "cache"))
+
+    store = SpillStore(str(tmp_path / "spill"), budget=0, decoded_budget=0)
+    assert store.balance(struct_dictionary) == 4
+    cache.store_struct_dict("key", struct_dictionary[dlt_file])
+    assert store.evict(struct_dictionary, keep={"other.dlt"}) == 4
+    assert all(
+        columns is None for messages in struct_dictionary[dlt_file]["APP"].values()
+        for columns in messages.values()
+    )
+    gc.collect()
+    store.collect()
+    assert os.listdir(store.directory) == []
+
+    redecoded = decode_all(dlt_file, index)
+    for ctx_id, messages in expected["APP"].items():
+        for message_name, columns in messages.items():
+            assert_same_columns(redecoded["APP"][ctx_id][message_name], columns)
+            assert_same_columns(cache.load("key", "APP", ctx_id, message_name), columns)
\ No newline at end of file
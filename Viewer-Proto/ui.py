@@ -1,9 +1,11 @@
 """User interface setup."""
 from PyQt6.QtWidgets import (
-    QLabel, QHBoxLayout, QPushButton, 
+    QLabel, QHBoxLayout, QPushButton, QSlider, QStyle,
     QTreeWidget, QVBoxLayout, QWidget, QSplitter
 )
 from PyQt6.QtCore import Qt
+from animate import REAL_TIME_SPEED
+from graph import SEEK_STEPS
 from utils import add_header_plus_button
 
 
@@ -33,6 +35,12 @@ def setup_ui(main_window):
     dashboard_layout.addWidget(main_window.addProtoBtn)
     dashboard_layout.addWidget(main_window.protoLabel)
     
+    # Live capture from a DLT daemon
+    main_window.connectBtn = QPushButton("Connect to Daemon")
+    main_window.connectBtn.setToolTip("Receive messages of a DLT daemon over TCP")
+    main_window.connectBtn.clicked.connect(main_window.connect_daemon)
+    dashboard_layout.addWidget(main_window.connectBtn)
+    
     # DLT tree widget
     main_window.treeWidget = QTreeWidget()
     main_window.treeWidget.setHeaderLabel("DLT Files")
@@ -47,6 +55,7 @@ def setup_ui(main_window):
     graph_widget = QWidget()
     main_window.grapharea = QVBoxLayout(graph_widget)
     main_window.grapharea.setContentsMargins(5, 5, 5, 5)
+    setup_playback_bar(main_window)
     
     # Add to splitter
     splitter.addWidget(dashboard_widget)
@@ -56,4 +65,47 @@ def setup_ui(main_window):
     # Connect signals
     main_window.treeWidget.itemSelectionChanged.connect(
         main_window.on_selection_changed
-    )
\ No newline at end of file
+    )
+
+
+def setup_playback_bar(main_window):
+    """Add the controls of the playback clock replaying all graphs."""
+    playback = main_window.playback
+    btn_play = main_window._create_tool_button(
+        QStyle.StandardPixmap.SP_MediaPlay, "Play Graphs", lambda: playback.play()
+    )
+    btn_pause = main_window._create_tool_button(
+        QStyle.StandardPixmap.SP_MediaPause, "Pause Graphs", lambda: playback.pause()
+    )
+    btn_reset = main_window._create_tool_button(
+        QStyle.StandardPixmap.SP_BrowserReload, "Reset Graphs", lambda: playback.reset()
+    )
+    
+    # Seek slider across the data of all graphs
+    main_window.seekSlider = QSlider(Qt.Orientation.Horizontal)
+    main_window.seekSlider.setRange(0, SEEK_STEPS)
+    main_window.seekSlider.setToolTip("Data time shown by all graphs")
+    main_window.seekSlider.valueChanged.connect(main_window.seek_playback)
+    main_window.playbackLabel = QLabel()
+    playback.moved.connect(main_window.show_playback_cursor)
+    
+    # Speed slider
+    lbl_speed = QLabel("Speed:")
+    slider = QSlider(Qt.Orientation.Horizontal)
+    slider.setRange(REAL_TIME_SPEED, 100 * REAL_TIME_SPEED)
+    slider.setValue(playback.speed)
+    slider.setTickPosition(QSlider.TickPosition.TicksBelow)
+    slider.setTickInterval(10 * REAL_TIME_SPEED)
+    slider.setToolTip("Replay speed (1x to 100x real time)")
+    slider.setMaximumWidth(200)
+    slider.valueChanged.connect(playback.set_speed)
+    
+    bar = QHBoxLayout()
+    bar.addWidget(btn_play)
+    bar.addWidget(btn_pause)
+    bar.addWidget(btn_reset)
+    bar.addWidget(main_window.seekSlider)
+    bar.addWidget(main_window.playbackLabel)
+    bar.addWidget(lbl_speed)
+    bar.addWidget(slider)
+    main_window.grapharea.addLayout(bar)
\ No newline at end of file
@@ -6,10 +6,11 @@ import atexit
 import sys
 import signal
 import subprocess
+import multiprocessing
 import re
 from PyQt6.QtWidgets import (
     QListWidget, QAbstractItemView, QTreeWidget, 
-    QHeaderView, QInputDialog, QMessageBox
+    QHeaderView, QInputDialog, QMessageBox, QPushButton, QToolButton
 )
 from PyQt6.QtCore import (
     Qt, QEvent, QObject, QEasingCurve, 
@@ -209,6 +210,51 @@ def add_header_plus_button(
     return button
 
 
+def create_tool_button(parent, pixmap, tooltip: str, slot: callable) -> QToolButton:
+    """Create auto-raised tool button with a standard icon.
+    
+    Args:
+        parent: Widget providing the style
+        pixmap: QStyle.StandardPixmap of the icon
+        tooltip: Button tooltip
+        slot: Slot to connect
+        
+    Returns:
+        Created button
+    """
+    button = QToolButton()
+    button.setIcon(parent.style().standardIcon(pixmap))
+    button.setToolTip(tooltip)
+    button.setAutoRaise(True)
+    button.clicked.connect(slot)
+    return button
+
+
+def format_bytes(nbytes):
+    """Return a byte count as short human readable text (e.g. 3.2 MiB)."""
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if nbytes < 1024 or unit == "GiB":
+            return f"{nbytes:.0f} {unit}" if unit == "B" else f"{nbytes:.1f} {unit}"
+        nbytes /= 1024
+
+
+def config_int(name, default):
+    """Return an integer setting from an environment variable.
+    
+    Args:
+        name: Environment variable name
+        default: Value if the variable is unset or not an integer
+    """
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        print(f"Ignoring {name}={value!r}, expected an integer")
+        return default
+
+
 def ensure_temp_dir():
     """Create application temp directory if needed."""
     os.makedirs(APP_TEMP_DIR, exist_ok=True)
@@ -216,6 +262,9 @@ def ensure_temp_dir():
 
 def cleanup_temp_files():
     """Remove all temporary files on exit."""
+    # Decode pool processes re-import this module, only the GUI owns the dir
+    if multiprocessing.parent_process() is not None:
+        return
     if os.path.exists(APP_TEMP_DIR):
         try:
             shutil.rmtree(APP_TEMP_DIR)